@@ -0,0 +1,394 @@
+"""
+Bitboard backend for Janggi Korean Chess
+An alternative to the 11x10 list of piece objects used by JanggiGame. The 90 playable squares are numbered 0-89, row
+by row from a1 (square = (y - 1) * 9 + (x - 1)), and the position is kept as one Python int per color and piece type
+with bit n set when a piece stands on square n. Slides, jumps, leg blocking and occupancy tests become mask operations
+against tables built once at import time. The rules are the ones implemented by the piece classes in JanggiGame,
+quirks included, and JanggiBitboardGame offers the same make_move / is_in_check / get_game_state behavior.
+"""
+
+from JanggiGame import JanggiGame, BLUE, RED, COLOR_NAMES, GENERAL, GUARD, HORSE, ELEPHANT, CHARIOT, CANNON, \
+    SOLDIER, TYPE_NAMES, ORTHOGONAL_RAYS, LINE_BETWEEN, PALACE_STEPS, PALACE_DIAGONALS, HORSE_MOVES, ELEPHANT_MOVES, \
+    SOLDIER_STEPS
+
+
+def square_of(coord):
+    """
+    Converts a (y, x) board coordinate into a 0-89 square number
+    """
+    return (coord[0] - 1) * 9 + coord[1] - 1
+
+
+def coord_of(square):
+    """
+    Converts a 0-89 square number back into a (y, x) board coordinate
+    """
+    return square // 9 + 1, square % 9 + 1
+
+
+def mask_of(coords):
+    """
+    Returns the mask with the bits of every passed (y, x) coordinate set
+    """
+    mask = 0
+    for coord in coords:
+        mask |= 1 << square_of(coord)
+    return mask
+
+
+def bits_of(mask):
+    """
+    Returns the square numbers of every bit set in mask, lowest first
+    """
+    squares = []
+    while mask:
+        low = mask & -mask
+        squares.append(low.bit_length() - 1)
+        mask ^= low
+    return squares
+
+
+# The masks below are the move tables from JanggiGame converted to bits, so both backends share one copy of the rules.
+# Rays run up (-y), down (+y), left (-x) and right (+x). Down and right walk towards higher square numbers, so the
+# nearest piece along them is the lowest set bit, for up and left it is the highest set bit.
+TOWARDS_HIGHER = (False, True, False, True)
+RAY_MASKS = [[mask_of(ray) for ray in ORTHOGONAL_RAYS[coord_of(square)]] for square in range(90)]
+PALACE_STEP_MASKS = [mask_of(PALACE_STEPS.get(coord_of(square), ())) for square in range(90)]
+# Palace diagonal moves as (destination, mask of the squares between). The chariot needs those squares empty, the
+# cannon only jumps corner to corner and needs the center occupied.
+CHARIOT_DIAGONALS = [[(square_of(d_coord), mask_of(between))
+                      for d_coord, between in PALACE_DIAGONALS[coord_of(square)].items()] for square in range(90)]
+CANNON_DIAGONALS = [[(square_of(d_coord), mask_of(between))
+                     for d_coord, between in PALACE_DIAGONALS[coord_of(square)].items() if between]
+                    for square in range(90)]
+HORSE_MASKS = [[(square_of(d_coord), mask_of((leg,))) for d_coord, leg in HORSE_MOVES[coord_of(square)]]
+               for square in range(90)]
+ELEPHANT_MASKS = [[(square_of(d_coord), mask_of(legs)) for d_coord, legs in ELEPHANT_MOVES[coord_of(square)]]
+                  for square in range(90)]
+HORSE_LEG_MASKS = dict(((o_square, d_square), legs) for o_square in range(90)
+                       for d_square, legs in HORSE_MASKS[o_square])
+ELEPHANT_LEG_MASKS = dict(((o_square, d_square), legs) for o_square in range(90)
+                          for d_square, legs in ELEPHANT_MASKS[o_square])
+SOLDIER_STEP_MASKS = [[mask_of(SOLDIER_STEPS[COLOR_NAMES[color]][coord_of(square)]) for square in range(90)]
+                      for color in (BLUE, RED)]
+# SOLDIER_ATTACKERS[color][square] is the mask of squares a soldier of color could step to square from
+SOLDIER_ATTACKERS = [[0] * 90, [0] * 90]
+for _color in (BLUE, RED):
+    for _square in range(90):
+        for _target in bits_of(SOLDIER_STEP_MASKS[_color][_square]):
+            SOLDIER_ATTACKERS[_color][_target] |= 1 << _square
+# BETWEEN[(a, b)] holds the squares strictly between two squares on the same row, column or palace diagonal, used to
+# find where a Chariot or Cannon check can be blocked
+BETWEEN = {}
+for _square in range(90):
+    for _table in (LINE_BETWEEN, PALACE_DIAGONALS):
+        for _d_coord, _between in _table[coord_of(_square)].items():
+            BETWEEN[(_square, square_of(_d_coord))] = mask_of(_between)
+
+
+def nearest(mask, direction):
+    """
+    Returns the square of the first set bit of mask met when walking in direction
+    """
+    if TOWARDS_HIGHER[direction]:
+        return (mask & -mask).bit_length() - 1
+    return mask.bit_length() - 1
+
+
+class JanggiBitboardGame:
+    """
+    Janggi game kept as bitboards. Offers the same make_move / is_in_check / in_checkmate / get_game_state /
+    get_player_turn / generate_legal_moves interface as JanggiGame, but nothing here walks the board square by square.
+    """
+
+    def __init__(self, game=None):
+        """
+        Copies the position of the passed JanggiGame, or of a freshly set up JanggiGame if none is passed
+        """
+        if game is None:
+            game = JanggiGame()
+        self.__pieces = [[0] * 7, [0] * 7]
+        self.__occupied = [0, 0]
+        self.__squares = [None] * 90
+        self.__general_squares = [None, None]
+        for color, piece_list in ((BLUE, game.get_blue_active_pieces()), (RED, game.get_red_active_pieces())):
+            for piece in piece_list:
+                square = square_of(piece.get_coordinates())
+                piece_type = piece.get_piece_type()
+                self.__pieces[color][piece_type] |= 1 << square
+                self.__occupied[color] |= 1 << square
+                self.__squares[square] = (color, piece_type)
+                if piece_type == GENERAL:
+                    self.__general_squares[color] = square
+        self.__color_turn = COLOR_NAMES.index(game.get_player_turn())
+        self.__game_state = game.get_game_state()
+
+    def get_player_turn(self):
+        """
+        Returns who's turn it is
+        """
+        return COLOR_NAMES[self.__color_turn]
+
+    def get_game_state(self):
+        """
+        returns gamestate, indicating if the game is finished or if a player has won
+        """
+        return self.__game_state
+
+    def get_piece_name(self, y_coord, x_coord):
+        """
+        Returns the name of the piece at the passed coordinate in the same form as get_name on the piece classes, or
+        None for an empty square.
+        """
+        occupant = self.__squares[square_of((y_coord, x_coord))]
+        if occupant is None:
+            return None
+        return COLOR_NAMES[occupant[0]] + " " + TYPE_NAMES[occupant[1]]
+
+    def get_targets(self, square):
+        """
+        Returns the mask of squares the piece on square has a path to, teammates included and the pass move left out.
+        This is the bitboard version of calling has_path_to on every square.
+        """
+        color, piece_type = self.__squares[square]
+        occupied = self.__occupied[BLUE] | self.__occupied[RED]
+        if piece_type == CHARIOT:
+            targets = 0
+            for direction in range(4):
+                ray = RAY_MASKS[square][direction]
+                blockers = ray & occupied
+                if blockers:
+                    ray ^= RAY_MASKS[nearest(blockers, direction)][direction]
+                targets |= ray
+            for d_square, must_be_empty in CHARIOT_DIAGONALS[square]:
+                if not occupied & must_be_empty:
+                    targets |= 1 << d_square
+            return targets
+        if piece_type == CANNON:
+            cannons = self.__pieces[BLUE][CANNON] | self.__pieces[RED][CANNON]
+            targets = 0
+            for direction in range(4):
+                blockers = RAY_MASKS[square][direction] & occupied
+                if not blockers:
+                    continue
+                screen = nearest(blockers, direction)
+                if cannons >> screen & 1:
+                    continue
+                beyond = RAY_MASKS[screen][direction]
+                blockers = beyond & occupied
+                if blockers:
+                    beyond ^= RAY_MASKS[nearest(blockers, direction)][direction]
+                targets |= beyond
+            for d_square, screen_bit in CANNON_DIAGONALS[square]:
+                if occupied & screen_bit:
+                    targets |= 1 << d_square
+            # A cannon can never land on another cannon
+            return targets & ~cannons
+        if piece_type == HORSE:
+            targets = 0
+            for d_square, leg in HORSE_MASKS[square]:
+                if not occupied & leg:
+                    targets |= 1 << d_square
+            return targets
+        if piece_type == ELEPHANT:
+            targets = 0
+            for d_square, legs in ELEPHANT_MASKS[square]:
+                if not occupied & legs:
+                    targets |= 1 << d_square
+            return targets
+        if piece_type == SOLDIER:
+            return SOLDIER_STEP_MASKS[color][square]
+        return PALACE_STEP_MASKS[square]
+
+    def get_attackers(self, square, color):
+        """
+        Returns the mask of color's pieces with a path to square, worked out backwards from square with the same
+        tables so we never have to generate every attacker's moves.
+        """
+        pieces = self.__pieces[color]
+        occupied = self.__occupied[BLUE] | self.__occupied[RED]
+        cannons = self.__pieces[BLUE][CANNON] | self.__pieces[RED][CANNON]
+        target_is_cannon = cannons >> square & 1
+        attackers = 0
+        for direction in range(4):
+            blockers = RAY_MASKS[square][direction] & occupied
+            if not blockers:
+                continue
+            first = nearest(blockers, direction)
+            attackers |= pieces[CHARIOT] & (1 << first)
+            if cannons >> first & 1 or target_is_cannon:
+                continue
+            blockers = RAY_MASKS[first][direction] & occupied
+            if blockers:
+                attackers |= pieces[CANNON] & (1 << nearest(blockers, direction))
+        # Palace diagonals read the same in both directions
+        for o_square, must_be_empty in CHARIOT_DIAGONALS[square]:
+            if not occupied & must_be_empty:
+                attackers |= pieces[CHARIOT] & (1 << o_square)
+        if not target_is_cannon:
+            for o_square, screen_bit in CANNON_DIAGONALS[square]:
+                if occupied & screen_bit:
+                    attackers |= pieces[CANNON] & (1 << o_square)
+        # A jump from square reaches o_square exactly when the jump from o_square reaches square, but the legs
+        # that matter are the ones next to the attacker
+        for o_square, leg in HORSE_MASKS[square]:
+            if pieces[HORSE] >> o_square & 1 and not occupied & HORSE_LEG_MASKS[(o_square, square)]:
+                attackers |= 1 << o_square
+        for o_square, legs in ELEPHANT_MASKS[square]:
+            if pieces[ELEPHANT] >> o_square & 1 and not occupied & ELEPHANT_LEG_MASKS[(o_square, square)]:
+                attackers |= 1 << o_square
+        attackers |= SOLDIER_ATTACKERS[color][square] & pieces[SOLDIER]
+        attackers |= PALACE_STEP_MASKS[square] & (pieces[GENERAL] | pieces[GUARD])
+        return attackers
+
+    def is_in_check(self, defending_color):
+        """
+        Returns True if the defending color's general is attacked
+        """
+        defender = COLOR_NAMES.index(defending_color)
+        return self.get_attackers(self.__general_squares[defender], 1 - defender) != 0
+
+    def move_piece(self, o_square, d_square):
+        """
+        Moves the piece on o_square to d_square, updating every mask, and returns the captured (color, type) or None.
+        A pass (o_square == d_square) changes nothing.
+        """
+        if o_square == d_square:
+            return None
+        color, piece_type = self.__squares[o_square]
+        captured = self.__squares[d_square]
+        change = (1 << o_square) | (1 << d_square)
+        self.__pieces[color][piece_type] ^= change
+        self.__occupied[color] ^= change
+        if captured is not None:
+            self.__pieces[captured[0]][captured[1]] ^= 1 << d_square
+            self.__occupied[captured[0]] ^= 1 << d_square
+        self.__squares[d_square] = self.__squares[o_square]
+        self.__squares[o_square] = None
+        if piece_type == GENERAL:
+            self.__general_squares[color] = d_square
+        return captured
+
+    def unmove_piece(self, o_square, d_square, captured):
+        """
+        Reverses move_piece
+        """
+        if o_square == d_square:
+            return
+        color, piece_type = self.__squares[d_square]
+        change = (1 << o_square) | (1 << d_square)
+        self.__pieces[color][piece_type] ^= change
+        self.__occupied[color] ^= change
+        if captured is not None:
+            self.__pieces[captured[0]][captured[1]] ^= 1 << d_square
+            self.__occupied[captured[0]] ^= 1 << d_square
+        self.__squares[o_square] = self.__squares[d_square]
+        self.__squares[d_square] = captured
+        if piece_type == GENERAL:
+            self.__general_squares[color] = o_square
+
+    def is_safe_move(self, o_square, d_square):
+        """
+        Trial makes the move and returns True if it does not leave the mover's general attacked
+        """
+        color = self.__squares[o_square][0]
+        captured = self.move_piece(o_square, d_square)
+        safe = not self.get_attackers(self.__general_squares[color], 1 - color)
+        self.unmove_piece(o_square, d_square, captured)
+        return safe
+
+    def generate_legal_moves(self, color):
+        """
+        Returns every legal move for the passed color as (origin, destination) coordinate tuples, pass moves included
+        """
+        mover = COLOR_NAMES.index(color)
+        own = self.__occupied[mover]
+        moves = []
+        for o_square in bits_of(own):
+            o_coord = coord_of(o_square)
+            for d_square in [o_square] + bits_of(self.get_targets(o_square) & ~own):
+                if self.is_safe_move(o_square, d_square):
+                    moves.append((o_coord, coord_of(d_square)))
+        return moves
+
+    def is_valid_move(self, o_coord, d_coord):
+        """
+        Same rules as JanggiGame.is_valid_move: the piece must have a path to the destination, must not attack a
+        teammate, and must not leave its general in check.
+        """
+        o_square, d_square = square_of(o_coord), square_of(d_coord)
+        if self.__squares[o_square] is None:
+            return False
+        if o_square != d_square:
+            color = self.__squares[o_square][0]
+            if self.__occupied[color] >> d_square & 1 or not self.get_targets(o_square) >> d_square & 1:
+                return False
+        return self.is_safe_move(o_square, d_square)
+
+    def in_checkmate(self, defending_color):
+        """
+        Mirrors JanggiGame.in_checkmate: try the general's palace moves, then every defender move onto a square that
+        captures a checker or an enemy cannon screen or blocks its path, then every move of a friendly piece a checking
+        cannon is jumping.
+        """
+        defender = COLOR_NAMES.index(defending_color)
+        own = self.__occupied[defender]
+        general_square = self.__general_squares[defender]
+        for d_square in bits_of(PALACE_STEP_MASKS[general_square] & ~own):
+            if self.is_safe_move(general_square, d_square):
+                return False
+
+        occupied = self.__occupied[BLUE] | self.__occupied[RED]
+        block_squares = 0
+        screens = []
+        for checker in bits_of(self.get_attackers(general_square, 1 - defender)):
+            block_squares |= 1 << checker
+            piece_type = self.__squares[checker][1]
+            if piece_type == CHARIOT:
+                block_squares |= BETWEEN[(checker, general_square)]
+            elif piece_type == CANNON:
+                line = BETWEEN[(checker, general_square)]
+                screen = (line & occupied).bit_length() - 1
+                screens.append(screen)
+                # own squares are filtered out below, so an enemy screen stays in as a square to capture on
+                block_squares |= line
+            elif piece_type == HORSE:
+                block_squares |= HORSE_LEG_MASKS[(checker, general_square)]
+            elif piece_type == ELEPHANT:
+                block_squares |= ELEPHANT_LEG_MASKS[(checker, general_square)]
+
+        for o_square in bits_of(own):
+            for d_square in bits_of(self.get_targets(o_square) & block_squares & ~own):
+                if self.is_safe_move(o_square, d_square):
+                    return False
+
+        for screen in screens:
+            if own >> screen & 1:
+                for d_square in bits_of(self.get_targets(screen) & ~own):
+                    if self.is_safe_move(screen, d_square):
+                        return False
+        return True
+
+    def make_move(self, origin, destination):
+        """
+        Same behavior as JanggiGame.make_move: takes "a1" style coordinates, returns False for anything that is not a
+        legal move for the player to move, otherwise makes the move, hands over the turn and checks for checkmate.
+        """
+        if self.__game_state != "UNFINISHED":
+            return False
+        o_coord = JanggiGame.str_coord(origin)
+        d_coord = JanggiGame.str_coord(destination)
+        if o_coord[0] is False or d_coord[0] is False:
+            return False
+        o_square, d_square = square_of(o_coord), square_of(d_coord)
+        if self.__squares[o_square] is None or self.__squares[o_square][0] != self.__color_turn:
+            return False
+        if not self.is_valid_move(o_coord, d_coord):
+            return False
+
+        self.move_piece(o_square, d_square)
+        mover = self.__color_turn
+        self.__color_turn = 1 - mover
+        if self.is_in_check(COLOR_NAMES[1 - mover]) and self.in_checkmate(COLOR_NAMES[1 - mover]):
+            self.__game_state = COLOR_NAMES[mover].upper() + "_WON"
+        return True
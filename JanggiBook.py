@@ -0,0 +1,207 @@
+"""
+Opening book for Janggi Korean Chess
+Builds a table of the moves played from each opening position in a corpus of games, keyed by
+JanggiGame.position_hash(), and saves it as a compact binary file that is read through mmap. Looking a position up is
+a binary search over the file's sorted records, nothing is loaded or parsed up front, and every process that opens
+the same book shares one copy of it in the page cache.
+
+A book file is an 8 byte header, BOOK_MAGIC then the record count as a little endian uint32, followed by 12 byte
+records sorted by position hash:
+    uint64 position hash, uint8 origin square, uint8 destination square, uint16 number of games that played the move
+Squares are indexes into ALL_SQUARES ((y - 1) * 9 + x - 1, a1 is 0 and i10 is 89).
+
+Game files are read with JanggiReplay.read_games, one game per line of "origin destination" moves.
+
+Run from the console, ex: python JanggiBook.py build games.txt book.bin --plies 16
+                          python JanggiBook.py probe book.bin --moves "e7 e6" "c1 d3"
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+
+from JanggiGame import JanggiGame, ALL_SQUARES
+from JanggiEngine import coord_to_string
+from JanggiReplay import read_games
+
+BOOK_MAGIC = b"JBK1"
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<QBBH")
+HASH = struct.Struct("<Q")
+MAX_WEIGHT = 0xFFFF
+
+SQUARE_INDEXES = dict((coord, index) for index, coord in enumerate(ALL_SQUARES))
+
+
+def collect_moves(lines, max_plies=16):
+    """
+    Replays every game of an iterable of game file lines on one reused JanggiGame and counts the moves played from
+    each position in the first max_plies plies. Returns a dictionary of (position hash, origin square, destination
+    square) to number of games. A game stops counting at its first illegal move.
+    """
+    counts = {}
+    game = JanggiGame()
+    for line_number, moves in read_games(lines):
+        game.reset()
+        for origin, destination in moves[:max_plies]:
+            if destination is None:
+                break
+            position_hash = game.position_hash()
+            o_square = SQUARE_INDEXES.get(game.str_coord(origin))
+            d_square = SQUARE_INDEXES.get(game.str_coord(destination))
+            # the checkmate search is only needed to end the game, and an ended game refuses the next move anyway
+            if o_square is None or d_square is None or not game.make_move_sq(o_square, d_square, False):
+                break
+            key = (position_hash, o_square, d_square)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def write_book(path, counts, min_games=1):
+    """
+    Writes a collect_moves dictionary to a book file, leaving out moves played in fewer than min_games games.
+    Returns the number of records written.
+    """
+    records = sorted(key for key in counts if counts[key] >= min_games)
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(BOOK_MAGIC, len(records)))
+        for position_hash, o_square, d_square in records:
+            weight = min(counts[(position_hash, o_square, d_square)], MAX_WEIGHT)
+            book_file.write(RECORD.pack(position_hash, o_square, d_square, weight))
+    return len(records)
+
+
+def build_book(game_paths, book_path, max_plies=16, min_games=1):
+    """
+    Builds a book file from game files ("-" for standard input) and returns the number of records written
+    """
+    counts = {}
+    for path in game_paths:
+        if path == "-":
+            found = collect_moves(sys.stdin, max_plies)
+        else:
+            with open(path) as game_file:
+                found = collect_moves(game_file, max_plies)
+        for key in found:
+            counts[key] = counts.get(key, 0) + found[key]
+    return write_book(book_path, counts, min_games)
+
+
+class OpeningBook:
+    """
+    A book file opened read only through mmap. Can be used as a context manager to close it.
+    """
+
+    def __init__(self, path):
+        """
+        Maps the book file at path. Raises ValueError if it is not a book file.
+        """
+        with open(path, "rb") as book_file:
+            self.__data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.__data) < HEADER.size:
+            self.close()
+            raise ValueError("not an opening book: " + path)
+        magic, self.__count = HEADER.unpack_from(self.__data, 0)
+        if magic != BOOK_MAGIC or len(self.__data) != HEADER.size + self.__count * RECORD.size:
+            self.close()
+            raise ValueError("not an opening book: " + path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the file
+        """
+        self.__data.close()
+
+    def get_record_count(self):
+        """
+        Returns the number of (position, move) records in the book
+        """
+        return self.__count
+
+    def get_moves(self, position_hash):
+        """
+        Returns the book moves of the position with the passed hash as a list of ((o_coord, d_coord), games) pairs,
+        most played first. Empty if the position is not in the book.
+        """
+        data = self.__data
+        # binary search for the first record of the position
+        low = 0
+        high = self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if HASH.unpack_from(data, HEADER.size + middle * RECORD.size)[0] < position_hash:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        while low < self.__count:
+            record_hash, o_square, d_square, weight = RECORD.unpack_from(data, HEADER.size + low * RECORD.size)
+            if record_hash != position_hash:
+                break
+            moves.append(((ALL_SQUARES[o_square], ALL_SQUARES[d_square]), weight))
+            low += 1
+        moves.sort(key=lambda entry: -entry[1])
+        return moves
+
+    def choose_move(self, game, generator=None):
+        """
+        Returns a book move for the side to move in game as an (origin, destination) pair of strings for make_move,
+        or None if the position is not in the book. With a random generator passed the move is drawn weighted by how
+        many games played it, otherwise the most played move is returned. Moves that the side to move cannot play in
+        the game (a hash collision) are never returned.
+        """
+        moves = [(move, weight) for move, weight in game.get_book_moves(self)
+                 if game.is_valid_turn_move(move[0], move[1])]
+        if not moves:
+            return None
+        if generator is None:
+            move = moves[0][0]
+        else:
+            move = generator.choices([move for move, weight in moves], [weight for move, weight in moves])[0]
+        return coord_to_string(move[0]), coord_to_string(move[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or look up a Janggi opening book")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a book file from game files")
+    build.add_argument("games", nargs="+", help='game files, one game per line ("-" for standard input)')
+    build.add_argument("book", help="book file to write")
+    build.add_argument("--plies", type=int, default=16, help="plies of each game to put in the book")
+    build.add_argument("--min-games", type=int, default=1, help="leave out moves played in fewer games")
+    probe = commands.add_parser("probe", help="print the book moves of a position")
+    probe.add_argument("book", help="book file to read")
+    probe.add_argument("--moves", nargs="*", default=[], help='moves leading to the position, ex: "e7 e6" "c1 d3"')
+    probe.add_argument("--seed", type=int, default=None, help="also draw a weighted random move with this seed")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        records = build_book(args.games, args.book, args.plies, args.min_games)
+        print("%d records written to %s in %.3fs" % (records, args.book, time.perf_counter() - start),
+              file=sys.stderr)
+        return
+
+    game = JanggiGame()
+    for move in args.moves:
+        origin, destination = move.split()
+        if not game.make_move(origin, destination):
+            raise ValueError("invalid move: " + move)
+    with OpeningBook(args.book) as book:
+        for (o_coord, d_coord), games in game.get_book_moves(book):
+            print(coord_to_string(o_coord), coord_to_string(d_coord), games)
+        if args.seed is not None:
+            print("drawn:", book.choose_move(game, random.Random(args.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+Computer player for Janggi Korean Chess
+Iterative deepening negamax with alpha-beta pruning over a JanggiGame. Each iteration searches one ply deeper than the
+last and leaves its principal variation, killer moves, history scores and transposition table entries behind to order
+the moves of the next one, so most of the tree is cut off early. A quiescence search over captures settles the leaves.
+Moves are made and taken back in place with push_move / pop_move, the game passed in is left exactly as it was. An
+engine given an opening book (JanggiBook.OpeningBook) plays the book's most played move without searching while the
+game is still in the book, one given endgame tablebases (JanggiTablebase.Tablebases) scores the positions they cover
+exactly instead of searching below them.
+
+Run from the console, ex: python JanggiEngine.py --depth 4 --book book.bin --tablebases tablebases --moves "e7 e6"
+"""
+
+import argparse
+import time
+
+from JanggiGame import JanggiGame, PIECE_VALUES
+from JanggiEvaluation import SQUARE_VALUES, evaluate
+from JanggiTransposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+MATE_SCORE = 100000
+# Scores past this are "mate in n", used to adjust them by ply when they go in and out of the transposition table
+MATE_BOUND = MATE_SCORE - 1000
+INFINITY = MATE_SCORE + 1
+MAX_DEPTH = 64
+# How many nodes go by between looks at the clock
+TIME_CHECK_NODES = 1024
+# Positions with at most this many pieces on the board are looked up in the tablebases, if the engine has any
+TABLEBASE_PIECES = 5
+
+COLUMN_LETTERS = "abcdefghi"
+
+
+def coord_to_string(coord):
+    """
+    Converts a (y, x) coordinate into the "a1" style string make_move accepts
+    """
+    return COLUMN_LETTERS[coord[1] - 1] + str(coord[0])
+
+
+def opponent(color):
+    """
+    Returns the other player's color
+    """
+    if color == "blue":
+        return "red"
+    return "blue"
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time limit runs out, unwinding back to the iterative deepening loop
+    """
+    pass
+
+
+class JanggiEngine:
+    """
+    Search engine. Keeps its transposition table, killer moves and history scores between calls to search, so an
+    engine kept around for a whole game reuses what it learned on earlier moves.
+    """
+
+    def __init__(self, table_megabytes=16, book=None, tablebases=None):
+        """
+        Creates an engine with a transposition table of the passed size, an optional opening book and optional
+        endgame tablebases
+        """
+        self.__table = TranspositionTable(table_megabytes)
+        self.__book = book
+        self.__tablebases = tablebases
+        self.__killers = [[None, None] for i in range(MAX_DEPTH + 1)]
+        self.__history = {}
+        self.__game = None
+        self.__nodes = 0
+        self.__deadline = None
+        self.__principal_variation = []
+        self.__score = 0
+        self.__completed_depth = 0
+
+    def new_game(self):
+        """
+        Forgets everything learned in earlier searches (transposition table, killer moves and history scores), so
+        the next search plays as a freshly created engine would
+        """
+        self.__table.clear()
+        self.__killers = [[None, None] for i in range(MAX_DEPTH + 1)]
+        self.__history = {}
+
+    def get_transposition_table(self):
+        """
+        Returns the engine's transposition table
+        """
+        return self.__table
+
+    def get_nodes(self):
+        """
+        Returns the number of nodes visited by the last search
+        """
+        return self.__nodes
+
+    def get_score(self):
+        """
+        Returns the score of the last completed iteration, from the point of view of the side to move
+        """
+        return self.__score
+
+    def get_completed_depth(self):
+        """
+        Returns the depth of the last completed iteration
+        """
+        return self.__completed_depth
+
+    def get_principal_variation(self):
+        """
+        Returns the expected line of play found by the last completed iteration as (origin, destination) strings
+        """
+        return [(coord_to_string(o_coord), coord_to_string(d_coord)) for o_coord, d_coord in self.__principal_variation]
+
+    def search(self, game, depth=None, time_limit=None):
+        """
+        Finds the best move for the side to move in game. Searches one ply deeper at a time until depth is reached or
+        time_limit seconds have passed, whichever comes first (with neither, depth 4). The move of the deepest finished
+        iteration is returned as an (origin, destination) pair of strings ready for make_move, or None when the game
+        is over. A position found in the opening book or the tablebases is not searched, the book or tablebase move is
+        returned at depth 0.
+        """
+        if game.get_game_state() != "UNFINISHED":
+            return None
+        if self.__book is not None:
+            book_move = self.__book.choose_move(game)
+            if book_move is not None:
+                self.__nodes = 0
+                self.__score = 0
+                self.__completed_depth = 0
+                self.__principal_variation = [(game.str_coord(book_move[0]), game.str_coord(book_move[1]))]
+                return book_move
+        if self.__tablebases is not None and count_pieces(game) <= TABLEBASE_PIECES:
+            tablebase_move = self.__tablebases.best_move(game)
+            if tablebase_move is not None:
+                self.__nodes = 0
+                self.__score = tablebase_score(self.__tablebases.probe(game), 0)
+                self.__completed_depth = 0
+                self.__principal_variation = [(game.str_coord(tablebase_move[0]),
+                                               game.str_coord(tablebase_move[1]))]
+                return tablebase_move
+        if depth is None:
+            if time_limit is None:
+                depth = 4
+            else:
+                depth = MAX_DEPTH
+        depth = min(depth, MAX_DEPTH)
+
+        self.__game = game
+        # evaluate reads the game's running score, so have the game keep one while we search
+        square_values = game.get_square_values()
+        if square_values is None:
+            game.set_square_values(SQUARE_VALUES)
+        self.__nodes = 0
+        self.__principal_variation = []
+        self.__score = 0
+        self.__completed_depth = 0
+        self.__killers = [[None, None] for i in range(MAX_DEPTH + 1)]
+        # age the history scores so the last move's ordering still helps but does not dominate
+        for move in self.__history:
+            self.__history[move] //= 8
+        self.__table.new_search()
+        if time_limit is None:
+            self.__deadline = None
+        else:
+            self.__deadline = time.perf_counter() + time_limit
+
+        color = game.get_player_turn()
+        best_move = None
+        try:
+            root_moves = game.generate_legal_moves(color)
+            if not root_moves:
+                return None
+            best_move = root_moves[0]
+            for iteration_depth in range(1, depth + 1):
+                score, line = self.search_root(root_moves, iteration_depth)
+                best_move = line[0]
+                self.__score = score
+                self.__principal_variation = line
+                self.__completed_depth = iteration_depth
+                # searching deeper cannot change a forced mate
+                if abs(score) > MATE_BOUND:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.__game = None
+            if square_values is None:
+                game.set_square_values(None)
+        return coord_to_string(best_move[0]), coord_to_string(best_move[1])
+
+    def search_root(self, root_moves, depth):
+        """
+        Searches every root move to the passed depth, best guess first, and returns the best score with its principal
+        variation. The root moves list is re-sorted so the best move leads the next iteration.
+        """
+        game = self.__game
+        color = game.get_player_turn()
+        if self.__principal_variation:
+            previous_best = self.__principal_variation[0]
+            root_moves.sort(key=lambda move: move != previous_best)
+        else:
+            root_moves.sort(key=lambda move: -self.score_move(move, None, 0))
+        alpha = -INFINITY
+        beta = INFINITY
+        best_line = None
+        for move in root_moves:
+            o_coord, d_coord = move
+            game.push_move(o_coord, d_coord)
+            try:
+                if best_line is None:
+                    score, line = self.negamax(depth - 1, -beta, -alpha, 1)
+                else:
+                    # principal variation search: prove the rest are no better with a null window first
+                    score, line = self.negamax(depth - 1, -alpha - 1, -alpha, 1)
+                    if -score > alpha:
+                        score, line = self.negamax(depth - 1, -beta, -alpha, 1)
+            finally:
+                game.pop_move()
+            score = -score
+            if best_line is None or score > alpha:
+                alpha = score
+                best_line = [move] + line
+        root_moves.remove(best_line[0])
+        root_moves.insert(0, best_line[0])
+        self.__table.store(game.position_hash(), depth, alpha, EXACT, best_line[0])
+        return alpha, best_line
+
+    def negamax(self, depth, alpha, beta, ply):
+        """
+        Alpha-beta search of the current position to the passed depth. Returns the score for the side to move and the
+        principal variation below this node as a list of (origin, destination) coordinate pairs.
+        """
+        self.count_node()
+        game = self.__game
+        if depth <= 0 or ply >= MAX_DEPTH:
+            return self.quiescence(alpha, beta, ply), []
+
+        # a position that already came up, in the game or earlier on this line, can be repeated for ever by the side
+        # that is worse off, so score it as a draw. Left out of the table, its score depends on the path to it.
+        if game.repetition_count() > 1:
+            return 0, []
+
+        if self.__tablebases is not None and count_pieces(game) <= TABLEBASE_PIECES:
+            result = self.__tablebases.probe(game)
+            if result is not None:
+                return tablebase_score(result, ply), []
+
+        position_hash = game.position_hash()
+        entry = self.__table.probe(position_hash)
+        table_move = None
+        if entry is not None:
+            table_move = entry[3]
+            if entry[0] >= depth:
+                score = score_from_table(entry[1], ply)
+                if entry[2] == EXACT or (entry[2] == LOWER_BOUND and score >= beta) or \
+                        (entry[2] == UPPER_BOUND and score <= alpha):
+                    if table_move is None:
+                        return score, []
+                    return score, [table_move]
+
+        color = game.get_player_turn()
+        board = game.get_board()
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        best_line = []
+        for move in self.ordered_moves(color, table_move, ply):
+            o_coord, d_coord = move
+            game.push_move(o_coord, d_coord)
+            if game.is_in_check(color):
+                game.pop_move()
+                continue
+            try:
+                if best_move is None:
+                    score, line = self.negamax(depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    score, line = self.negamax(depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < -score < beta:
+                        score, line = self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.pop_move()
+            score = -score
+            if score > best_score:
+                best_score = score
+                best_move = move
+                best_line = [move] + line
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if board[d_coord[0]][d_coord[1]] is None:
+                    self.record_cutoff(move, depth, ply)
+                break
+
+        if best_move is None:
+            # a pass is always possible when not in check, so having no legal move at all is checkmate
+            return -MATE_SCORE + ply, []
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.__table.store(position_hash, depth, score_to_table(best_score, ply), bound, best_move)
+        return best_score, best_line
+
+    def quiescence(self, alpha, beta, ply):
+        """
+        Searches captures only until the position is quiet, so the static evaluation is never taken in the middle of
+        an exchange. The side to move may always decline to capture and keep the static score (stand pat).
+        """
+        game = self.__game
+        color = game.get_player_turn()
+        stand_pat = evaluate(game, color)
+        if stand_pat >= beta or ply >= MAX_DEPTH:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        board = game.get_board()
+        if color == "blue":
+            pieces = game.get_blue_active_pieces()
+        else:
+            pieces = game.get_red_active_pieces()
+        captures = []
+        for piece in list(pieces):
+            o_coord = piece.get_coordinates()
+            attacker_value = PIECE_VALUES[piece.get_piece_type()]
+            for d_coord in piece.generate_pseudo_moves(board):
+                victim = board[d_coord[0]][d_coord[1]]
+                if victim is not None and victim is not piece:
+                    order = PIECE_VALUES[victim.get_piece_type()] * 16 - attacker_value // 100
+                    captures.append((order, o_coord, d_coord))
+        captures.sort(reverse=True)
+
+        for order, o_coord, d_coord in captures:
+            self.count_node()
+            game.push_move(o_coord, d_coord)
+            if game.is_in_check(color):
+                game.pop_move()
+                continue
+            try:
+                score = -self.quiescence(-beta, -alpha, ply + 1)
+            finally:
+                game.pop_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def ordered_moves(self, color, table_move, ply):
+        """
+        Returns the pseudo legal moves of the passed color (legality is checked as they are made) best guess first:
+        the transposition table move, then captures of the most valuable victim by the least valuable attacker, then
+        killer moves, then quiet moves by history score. Passes go last.
+        """
+        game = self.__game
+        board = game.get_board()
+        if color == "blue":
+            pieces = game.get_blue_active_pieces()
+        else:
+            pieces = game.get_red_active_pieces()
+        scored = []
+        for piece in list(pieces):
+            o_coord = piece.get_coordinates()
+            for d_coord in piece.generate_pseudo_moves(board):
+                move = (o_coord, d_coord)
+                if move == table_move:
+                    order = 1 << 30
+                else:
+                    order = self.score_move(move, piece, ply)
+                scored.append((order, move))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [move for order, move in scored]
+
+    def score_move(self, move, piece, ply):
+        """
+        Ordering score of a move, higher is searched first
+        """
+        o_coord, d_coord = move
+        board = self.__game.get_board()
+        if piece is None:
+            piece = board[o_coord[0]][o_coord[1]]
+        if o_coord == d_coord:
+            return -(1 << 30)
+        victim = board[d_coord[0]][d_coord[1]]
+        if victim is not None:
+            return (1 << 28) + PIECE_VALUES[victim.get_piece_type()] * 16 - PIECE_VALUES[piece.get_piece_type()] // 100
+        killers = self.__killers[ply]
+        if move == killers[0]:
+            return 1 << 27
+        if move == killers[1]:
+            return (1 << 27) - 1
+        return self.__history.get(move, 0)
+
+    def record_cutoff(self, move, depth, ply):
+        """
+        Remembers a quiet move that caused a beta cutoff as a killer for this ply and raises its history score
+        """
+        killers = self.__killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.__history[move] = self.__history.get(move, 0) + depth * depth
+
+    def count_node(self):
+        """
+        Counts a node, looking at the clock every TIME_CHECK_NODES nodes and raising SearchTimeout when time is up
+        """
+        self.__nodes += 1
+        if self.__deadline is not None and self.__nodes % TIME_CHECK_NODES == 0:
+            if time.perf_counter() >= self.__deadline:
+                raise SearchTimeout()
+
+
+def score_to_table(score, ply):
+    """
+    Mate scores count plies from the root, the table stores them counted from the node instead
+    """
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """
+    Reverses score_to_table
+    """
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def count_pieces(game):
+    """
+    Returns the number of pieces on the board, generals included
+    """
+    return len(game.get_blue_active_pieces()) + len(game.get_red_active_pieces())
+
+
+def tablebase_score(result, ply):
+    """
+    Turns a tablebase probe result into a search score at the passed ply, mates scored like the ones the search
+    finds itself
+    """
+    if result[0] == "WIN":
+        return MATE_SCORE - ply - result[1]
+    if result[0] == "LOSS":
+        return -MATE_SCORE + ply + result[1]
+    return 0
+
+
+def search(game, depth=None, time_limit=None):
+    """
+    Finds the best move for the side to move with a new JanggiEngine, see JanggiEngine.search. Keep a JanggiEngine
+    around instead when searching many moves of the same game so its tables carry over.
+    """
+    return JanggiEngine().search(game, depth, time_limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Janggi engine, prints the best move of a position")
+    parser.add_argument("--depth", type=int, default=None, help="plies to search")
+    parser.add_argument("--time", type=float, default=None, help="seconds to search")
+    parser.add_argument("--moves", nargs="*", default=[], help='moves leading to the position, ex: "e7 e6" "c1 d3"')
+    parser.add_argument("--book", default=None, help="opening book file built with JanggiBook.py")
+    parser.add_argument("--tablebases", default=None, help="directory of tablebases built with JanggiTablebase.py")
+    args = parser.parse_args()
+
+    game = JanggiGame()
+    for move in args.moves:
+        origin, destination = move.split()
+        if not game.make_move(origin, destination):
+            raise ValueError("invalid move: " + move)
+    book = None
+    if args.book is not None:
+        from JanggiBook import OpeningBook
+        book = OpeningBook(args.book)
+    tablebases = None
+    if args.tablebases is not None:
+        from JanggiTablebase import Tablebases
+        tablebases = Tablebases(args.tablebases)
+    engine = JanggiEngine(book=book, tablebases=tablebases)
+    start = time.perf_counter()
+    best_move = engine.search(game, args.depth, args.time)
+    seconds = time.perf_counter() - start
+    if best_move is None:
+        print("game over:", game.get_game_state())
+        return
+    print("best move:", best_move[0], best_move[1])
+    print("depth %d, score %d, %d nodes, %.0f nodes/s" % (engine.get_completed_depth(), engine.get_score(),
+                                                         engine.get_nodes(), engine.get_nodes() / max(seconds, 1e-9)))
+    print("principal variation:", " ".join(o + "-" + d for o, d in engine.get_principal_variation()))
+
+
+if __name__ == "__main__":
+    main()
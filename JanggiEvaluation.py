@@ -0,0 +1,139 @@
+"""
+Static evaluation for Janggi Korean Chess
+Scores positions from material and piece square tables. Every piece is worth its PIECE_VALUES material plus a bonus for
+the square it stands on:
+    general, guard     the palace center, then the squares next to it, over the palace corners
+    soldier            how far it has advanced, more inside the enemy palace, less on the last row where it can only
+                       step sideways
+    horse, elephant,   how many enemy palace squares the piece reaches from its square (REACHABLE_SQUARES, legs and
+    chariot, cannon    screens aside), horses and elephants also lose a little on the edge files
+
+SQUARE_VALUES holds those values signed, blue pieces counting up and red pieces down, in the form
+JanggiGame.set_square_values takes. A game given them keeps a running total that push_move and pop_move update with a
+couple of lookups, so evaluate costs the same at every leaf of a search however many pieces are on the board, instead
+of walking both active pieces lists.
+
+Run from the console, ex: python JanggiEvaluation.py --moves "e7 e6" "c1 d3"
+"""
+
+import argparse
+
+from JanggiGame import JanggiGame, ALL_SQUARES, COLOR_NAMES, TYPE_NAMES, PIECE_VALUES, PALACE_CENTERS, \
+    BLUE_PALACE_SQUARES, RED_PALACE_SQUARES, REACHABLE_SQUARES, GENERAL, GUARD, HORSE, ELEPHANT, SOLDIER
+
+# General and guard bonus on the palace center, and on the squares orthogonally next to it
+PALACE_CENTER_BONUS = (20, 15)
+PALACE_SIDE_BONUS = (10, 5)
+
+# Soldier bonus by row counted from its own side's back row, 1 to 10. Soldiers start on row 4.
+SOLDIER_ADVANCE_BONUS = (0, 0, 0, 0, 0, 10, 20, 30, 40, 40, 20)
+SOLDIER_PALACE_BONUS = 30
+
+# Bonus per enemy palace square a piece reaches, indexed by piece type code
+PALACE_CONTROL_BONUS = (0, 0, 5, 3, 3, 3, 0)
+EDGE_FILE_PENALTY = 10
+
+
+def square_value(piece_type, color, coord):
+    """
+    Returns what a piece of the passed type and color is worth on coord, material included, from its own side's point
+    of view
+    """
+    y, x = coord
+    if color == "blue":
+        row = 11 - y
+        enemy_palace = RED_PALACE_SQUARES
+    else:
+        row = y
+        enemy_palace = BLUE_PALACE_SQUARES
+    value = PIECE_VALUES[piece_type]
+
+    if piece_type == GENERAL or piece_type == GUARD:
+        center = PALACE_CENTERS.get(coord)
+        if center == coord:
+            value += PALACE_CENTER_BONUS[piece_type]
+        elif center is not None and abs(center[0] - y) + abs(center[1] - x) == 1:
+            value += PALACE_SIDE_BONUS[piece_type]
+    elif piece_type == SOLDIER:
+        value += SOLDIER_ADVANCE_BONUS[row]
+        if coord in enemy_palace:
+            value += SOLDIER_PALACE_BONUS
+    else:
+        piece_code = piece_type * 2 + COLOR_NAMES.index(color)
+        value += PALACE_CONTROL_BONUS[piece_type] * len(REACHABLE_SQUARES[piece_code][coord] & enemy_palace)
+        if (piece_type == HORSE or piece_type == ELEPHANT) and (x == 1 or x == 9):
+            value -= EDGE_FILE_PENALTY
+    return value
+
+
+def build_square_values():
+    """
+    Builds the signed piece square values, a list indexed by piece code of {coord: value} dictionaries
+    """
+    square_values = []
+    for piece_type in range(len(TYPE_NAMES)):
+        for color in COLOR_NAMES:
+            sign = 1
+            if color == "red":
+                sign = -1
+            square_values.append(dict((coord, sign * square_value(piece_type, color, coord))
+                                      for coord in ALL_SQUARES))
+    return square_values
+
+
+SQUARE_VALUES = build_square_values()
+
+
+def count_score(game, square_values=SQUARE_VALUES):
+    """
+    Adds the square values of every piece in game up from scratch, blue's total minus red's
+    """
+    score = 0
+    for piece in game.get_blue_active_pieces() + game.get_red_active_pieces():
+        score += square_values[piece.get_piece_code()][piece.get_coordinates()]
+    return score
+
+
+def evaluate(game, color):
+    """
+    Static evaluation of the position from the point of view of the passed color. Reads the game's running score
+    when it keeps one (see JanggiGame.set_square_values), otherwise counts SQUARE_VALUES up from scratch.
+    """
+    if game.get_square_values() is None:
+        score = count_score(game)
+    else:
+        score = game.get_square_score()
+    if color == "blue":
+        return score
+    return -score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the static evaluation of a Janggi position")
+    parser.add_argument("--moves", nargs="*", default=[], help='moves leading to the position, ex: "e7 e6" "c1 d3"')
+    parser.add_argument("--fen", default=None, help="start from this position instead (see JanggiGame.to_fen)")
+    args = parser.parse_args()
+
+    if args.fen is None:
+        game = JanggiGame()
+    else:
+        game = JanggiGame.from_fen(args.fen)
+    game.set_square_values(SQUARE_VALUES)
+    for move in args.moves:
+        origin, destination = move.split()
+        if not game.make_move(origin, destination):
+            raise ValueError("invalid move: " + move)
+    for color in COLOR_NAMES:
+        if color == "blue":
+            pieces = game.get_blue_active_pieces()
+        else:
+            pieces = game.get_red_active_pieces()
+        for piece in pieces:
+            y, x = piece.get_coordinates()
+            print("%-14s %-3s %5d" % (piece.get_name(), "abcdefghi"[x - 1] + str(y),
+                                      abs(SQUARE_VALUES[piece.get_piece_code()][(y, x)])))
+    print("score for the side to move (%s): %d" % (game.get_player_turn(), evaluate(game, game.get_player_turn())))
+
+
+if __name__ == "__main__":
+    main()
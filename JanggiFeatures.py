@@ -0,0 +1,105 @@
+"""
+Batch feature extraction for Janggi Korean Chess
+Turns a batch of positions into one stacked NumPy array of shape (batch, PLANE_COUNT, 10, 9), ready to feed a model.
+Plane [row][column] is rank row + 1, file column + 1 of the board, so a1 is [0][0] and i10 is [9][8].
+    planes 0 to 13   one per piece code (type code * 2 + color code, see JanggiGame): 1 where such a piece stands
+    plane 14         all 1 when red is to move, all 0 when blue is
+    plane 15         all 1 when the side to move is in check
+
+Positions go in as JanggiGame instances or as 92 byte JanggiGame.to_bytes snapshots. Either way the batch is packed
+into a single (batch, 92) byte array first and every plane is then filled by whole array operations over the batch,
+no Python code runs per square.
+
+Run from the console, ex: python JanggiFeatures.py positions.txt features.npy (one FEN position per line)
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from JanggiGame import JanggiGame
+
+PIECE_PLANES = 14
+SIDE_TO_MOVE_PLANE = 14
+IN_CHECK_PLANE = 15
+PLANE_COUNT = 16
+SNAPSHOT_BYTES = 92
+
+# Snapshot byte values of the piece planes, a square holds piece code + 1 (0 for empty)
+PLANE_CODES = np.arange(1, PIECE_PLANES + 1, dtype=np.uint8).reshape(1, PIECE_PLANES, 1)
+
+
+def pack_snapshots(snapshots):
+    """
+    Packs an iterable of to_bytes snapshots (or an array of them already packed) into a (batch, 92) uint8 array
+    """
+    if isinstance(snapshots, np.ndarray):
+        packed = snapshots.astype(np.uint8, copy=False)
+    else:
+        data = b"".join(snapshots)
+        if len(data) % SNAPSHOT_BYTES:
+            raise ValueError("snapshots must be %d bytes each" % SNAPSHOT_BYTES)
+        packed = np.frombuffer(data, dtype=np.uint8)
+    return packed.reshape(-1, SNAPSHOT_BYTES)
+
+
+def encode_snapshots(snapshots, in_check=None, dtype=np.float32):
+    """
+    Returns the (batch, PLANE_COUNT, 10, 9) feature array of a batch of to_bytes snapshots. in_check is a sequence
+    with one bool per position telling whether its side to move is in check. Snapshots do not record it, so when it
+    is left out each position is rebuilt with JanggiGame.from_bytes to find out, which is much slower than the
+    encoding itself. Keep it next to the snapshots (or use encode_games) when speed matters.
+    """
+    packed = pack_snapshots(snapshots)
+    if in_check is None:
+        in_check = [game.is_in_check(game.get_player_turn())
+                    for game in (JanggiGame.from_bytes(row.tobytes()) for row in packed)]
+    in_check = np.asarray(in_check, dtype=bool)
+    if in_check.shape != (len(packed),):
+        raise ValueError("in_check needs one value per position")
+
+    features = np.empty((len(packed), PLANE_COUNT, 90), dtype=dtype)
+    # compare every square of every position with every piece code at once, (batch, 1, 90) against (1, 14, 1)
+    np.equal(packed[:, np.newaxis, :90], PLANE_CODES, out=features[:, :PIECE_PLANES])
+    features[:, SIDE_TO_MOVE_PLANE] = packed[:, 90:91]
+    features[:, IN_CHECK_PLANE] = in_check[:, np.newaxis]
+    return features.reshape(len(packed), PLANE_COUNT, 10, 9)
+
+
+def encode_games(games, dtype=np.float32):
+    """
+    Returns the (batch, PLANE_COUNT, 10, 9) feature array of a batch of JanggiGame instances. Each game only hands
+    over its snapshot and whether it is in check, its board list is never walked.
+    """
+    snapshots = []
+    in_check = []
+    for game in games:
+        snapshots.append(game.to_bytes())
+        in_check.append(game.is_in_check(game.get_player_turn()))
+    return encode_snapshots(snapshots, in_check, dtype)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode Janggi positions as a stacked NumPy feature array")
+    parser.add_argument("positions", help='file with one FEN position per line ("-" for standard input)')
+    parser.add_argument("output", help="where to save the (batch, planes, 10, 9) array with numpy.save")
+    parser.add_argument("--dtype", default="float32", help="element type of the array (default float32)")
+    args = parser.parse_args()
+
+    if args.positions == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.positions) as position_file:
+            lines = position_file.read().splitlines()
+    games = [JanggiGame.from_fen(line.strip()) for line in lines if line.strip() and not line.startswith("#")]
+    start = time.perf_counter()
+    features = encode_games(games, np.dtype(args.dtype))
+    seconds = time.perf_counter() - start
+    np.save(args.output, features)
+    print("%d positions encoded to %s in %.3fs" % (len(games), str(features.shape), seconds), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,28 +10,222 @@ restrictions (ex: cannon cannot jump over a another cannon). The Game is won whe
 to avoid check at the end of their turn.
 """
 
+import random
+import sys
+
+# Piece color and type codes. Pieces carry these as small ints and the hot paths compare them instead of strings,
+# get_name() is only used to display pieces.
+BLUE = 0
+RED = 1
+COLOR_NAMES = ("blue", "red")
+COLOR_CODES = {"blue": BLUE, "red": RED}
+
+GENERAL = 0
+GUARD = 1
+HORSE = 2
+ELEPHANT = 3
+CHARIOT = 4
+CANNON = 5
+SOLDIER = 6
+TYPE_NAMES = ("general", "guard", "horse", "elephant", "chariot", "cannon", "soldier")
+
+# Material values indexed by piece type code, the usual Janggi point counts times 100. The general is never captured
+# so it counts for nothing.
+PIECE_VALUES = (0, 300, 500, 300, 1300, 700, 200)
+
+# Move tables, built once at import time. Coordinates are (y, x) tuples, y from 1 to 10 and x from 1 to 9, matching
+# the board list. Every piece answers has_path_to, can_be_blocked_at and generate_pseudo_moves with lookups into these
+# instead of working out coordinate differences and palace membership on every call.
+ALL_SQUARES = tuple((y, x) for y in range(1, 11) for x in range(1, 10))
+# Coordinate of every square by name ("a1" to "i10"), for str_coord
+STRING_COORDS = dict(("abcdefghi"[x - 1] + str(y), (y, x)) for y, x in ALL_SQUARES)
+# Coordinate of every square by square index (0-89) and by its own (y, x) tuple, for make_move_sq
+SQUARE_COORDS = dict(list(enumerate(ALL_SQUARES)) + [(coord, coord) for coord in ALL_SQUARES])
+BLUE_PALACE_SQUARES = frozenset((y, x) for y in (8, 9, 10) for x in (4, 5, 6))
+RED_PALACE_SQUARES = frozenset((y, x) for y in (1, 2, 3) for x in (4, 5, 6))
+PALACE_CENTERS = dict([(coord, (9, 5)) for coord in BLUE_PALACE_SQUARES] +
+                      [(coord, (2, 5)) for coord in RED_PALACE_SQUARES])
+
+
+def on_board(coord):
+    """
+    Returns True if coord is one of the 90 playable squares
+    """
+    return 1 <= coord[0] <= 10 and 1 <= coord[1] <= 9
+
+
+def build_orthogonal_tables():
+    """
+    ORTHOGONAL_RAYS[coord] holds the 4 rays (up, down, left, right) leading away from coord to the edge of the board,
+    nearest square first. LINE_BETWEEN[coord][d_coord] holds the squares strictly between two squares on the same
+    row or column.
+    """
+    rays = {}
+    between = {}
+    for coord in ALL_SQUARES:
+        coord_rays = []
+        between[coord] = {}
+        for step_y, step_x in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            ray = []
+            d_coord = (coord[0] + step_y, coord[1] + step_x)
+            while on_board(d_coord):
+                between[coord][d_coord] = tuple(ray)
+                ray.append(d_coord)
+                d_coord = (d_coord[0] + step_y, d_coord[1] + step_x)
+            coord_rays.append(tuple(ray))
+        rays[coord] = tuple(coord_rays)
+    return rays, between
+
+
+def build_palace_tables():
+    """
+    PALACE_STEPS[coord] holds the one step palace moves of the General and Guard: from the center to any other palace
+    square, or from anywhere else to the center or an orthogonal neighbor in the palace.
+    PALACE_DIAGONALS[coord][d_coord] holds the squares between two points joined by a palace diagonal, empty between a
+    corner and the center, the center itself between opposite corners.
+    """
+    steps = {}
+    diagonals = dict((coord, {}) for coord in ALL_SQUARES)
+    for palace in (BLUE_PALACE_SQUARES, RED_PALACE_SQUARES):
+        for coord in palace:
+            center = PALACE_CENTERS[coord]
+            steps[coord] = frozenset(d_coord for d_coord in palace if d_coord != coord and (
+                coord == center or d_coord == center or abs(d_coord[0] - coord[0]) + abs(d_coord[1] - coord[1]) == 1))
+            if coord[0] != center[0] and coord[1] != center[1]:
+                diagonals[coord][center] = ()
+                diagonals[center][coord] = ()
+                diagonals[coord][(2 * center[0] - coord[0], 2 * center[1] - coord[1])] = (center,)
+    return steps, diagonals
+
+
+def build_jump_tables():
+    """
+    HORSE_MOVES[coord] lists (destination, leg) for every horse move from coord, the leg being the orthogonal square
+    that must be empty. ELEPHANT_MOVES[coord] lists (destination, (first leg, second leg)) the same way.
+    """
+    horse = {}
+    elephant = {}
+    for coord in ALL_SQUARES:
+        horse[coord] = []
+        elephant[coord] = []
+        for leg_y, leg_x in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            leg = (coord[0] + leg_y, coord[1] + leg_x)
+            for side in (-1, 1):
+                # The diagonal step taken after the leg, away from the piece
+                if leg_y == 0:
+                    diagonal = (side, leg_x)
+                else:
+                    diagonal = (leg_y, side)
+                d_coord = (leg[0] + diagonal[0], leg[1] + diagonal[1])
+                if on_board(d_coord):
+                    horse[coord].append((d_coord, leg))
+                e_coord = (leg[0] + 2 * diagonal[0], leg[1] + 2 * diagonal[1])
+                if on_board(e_coord):
+                    elephant[coord].append((e_coord, (leg, d_coord)))
+        horse[coord] = tuple(horse[coord])
+        elephant[coord] = tuple(elephant[coord])
+    return horse, elephant
+
+
+def build_soldier_steps():
+    """
+    SOLDIER_STEPS[color][coord] holds the squares a soldier can step to: one forwards or sideways, and while inside
+    either palace also to the center from a corner, anywhere in the palace from the center, or one square back.
+    """
+    steps = {"blue": {}, "red": {}}
+    for color, forward in (("blue", -1), ("red", 1)):
+        for coord in ALL_SQUARES:
+            targets = {(coord[0] + forward, coord[1]), (coord[0], coord[1] - 1), (coord[0], coord[1] + 1)}
+            center = PALACE_CENTERS.get(coord)
+            if center is not None:
+                if coord == center:
+                    targets.update(d_coord for d_coord in PALACE_CENTERS if PALACE_CENTERS[d_coord] == center)
+                elif coord[0] != center[0] and coord[1] != center[1]:
+                    targets.add(center)
+                if PALACE_CENTERS.get((coord[0] - forward, coord[1])) == center:
+                    targets.add((coord[0] - forward, coord[1]))
+            targets.discard(coord)
+            steps[color][coord] = frozenset(d_coord for d_coord in targets if on_board(d_coord))
+    return steps
+
+
+ORTHOGONAL_RAYS, LINE_BETWEEN = build_orthogonal_tables()
+PALACE_STEPS, PALACE_DIAGONALS = build_palace_tables()
+HORSE_MOVES, ELEPHANT_MOVES = build_jump_tables()
+HORSE_LEGS = dict((coord, dict(HORSE_MOVES[coord])) for coord in ALL_SQUARES)
+ELEPHANT_LEGS = dict((coord, dict(ELEPHANT_MOVES[coord])) for coord in ALL_SQUARES)
+SOLDIER_STEPS = build_soldier_steps()
+
+
+def build_reach_tables():
+    """
+    REACHABLE_SQUARES[piece code][coord] holds every square a piece of that type and color standing on coord could
+    move to on an empty board, ignoring legs, screens and everything else that can get in the way. It is the filter
+    in front of has_path_to on the hot paths: is_in_check and get_attackers (and through it get_checkers and
+    in_checkmate) only ask has_path_to of the pieces whose entry holds the target square, so removing the table puts
+    them back to calling has_path_to for every piece on every check test. static_exchange uses it the same way to
+    pick its candidate capturers, and JanggiEvaluation to count enemy palace squares a piece bears on.
+    """
+    reach = []
+    for piece_type in range(len(TYPE_NAMES)):
+        for color in COLOR_NAMES:
+            squares = {}
+            for coord in ALL_SQUARES:
+                if piece_type == GENERAL or piece_type == GUARD:
+                    targets = PALACE_STEPS.get(coord, ())
+                elif piece_type == HORSE:
+                    targets = HORSE_LEGS[coord]
+                elif piece_type == ELEPHANT:
+                    targets = ELEPHANT_LEGS[coord]
+                elif piece_type == SOLDIER:
+                    targets = SOLDIER_STEPS[color][coord]
+                else:
+                    targets = list(LINE_BETWEEN[coord]) + list(PALACE_DIAGONALS[coord])
+                squares[coord] = frozenset(targets)
+            reach.append(squares)
+    return reach
+
+
+REACHABLE_SQUARES = build_reach_tables()
+
+
+def exchange_order(piece):
+    """
+    Sort key putting pieces in the order static_exchange captures with them, least valuable first and generals last
+    """
+    return piece.get_piece_type() == GENERAL, PIECE_VALUES[piece.get_piece_type()]
+
 
 class Game_Piece:
     """
     Object represents a generic Janggi Game Piece. Pieces have a location the Board (a list in the game class,
     a team affiliation and their coordinate locations on the board. Pieces have specific operations depending on
      their classification but that is not dealt with here. This class contains getter setters and prototype function
-     and various helper functions to help pieces find navigate the board
+     and various helper functions to help pieces find navigate the board. Pieces use __slots__ and know their type
+     and color as the integer codes above, so we can hold many positions worth of them cheaply.
     """
 
+    __slots__ = ("__player_color", "__color_code", "__piece_code", "__coordinates")
+    # Overwritten with the piece's type code by each piece class
+    PIECE_TYPE = None
+
     def __init__(self, player_color, coordinate):
         """
         Game piece constructor, sets coordinates and piece color
         """
         self.__player_color = player_color
+        self.__color_code = COLOR_CODES[player_color]
+        if self.PIECE_TYPE is None:
+            self.__piece_code = None
+        else:
+            self.__piece_code = self.PIECE_TYPE * 2 + self.__color_code
         self.__coordinates = coordinate
 
     def has_path_to(self, d_coord, board):
         """
-        All pieces must be able to detect a path to somewhere else on the board. This is generally accomplished by
-        comparing pieces coordinate variable to a Destination Coordinate (Denoted d_coord). The difference between
-        the x and y from origin coordinates (sometimes denoted o_coord) to d_coord will be compared to the piece's
-        movement profile to determine if the piece had a path to the destination. Path detection generally used in
+        All pieces must be able to detect a path to somewhere else on the board. Each piece looks the origin and
+        Destination Coordinate (Denoted d_coord) up in the move tables built at import time to see if d_coord is part
+        of the piece's movement profile, then checks the board for pieces in the way. Path detection generally used in
         valid_move function for path detecting phase of determining if a move is valid. Used to detect check as well.
         """
         return False
@@ -42,6 +236,24 @@ class Game_Piece:
         """
         return self.__player_color
 
+    def get_color_code(self):
+        """
+        Returns the player color as BLUE or RED
+        """
+        return self.__color_code
+
+    def get_piece_type(self):
+        """
+        Returns the piece type code, GENERAL through SOLDIER
+        """
+        return self.PIECE_TYPE
+
+    def get_piece_code(self):
+        """
+        Returns a single small int for the piece's type and color, type * 2 + color, from 0 to 13
+        """
+        return self.__piece_code
+
     def set_coordinates(self, new_coordinates):
         """
         Set location of game_piece to passed coordinate tuple
@@ -74,21 +286,53 @@ class Game_Piece:
         """
         Takes coordinate, returns if in the blue palace.
         """
-        if d_coord == (10, 4) or d_coord == (9, 4) or d_coord == (8, 4) or d_coord == (10, 5) or d_coord == (9, 5) or \
-                d_coord == (8, 5) or d_coord == (10, 6) or d_coord == (9, 6) or d_coord == (8, 6):
-            return True
-        else:
-            return False
+        return d_coord in BLUE_PALACE_SQUARES
 
     def in_the_red_palace(self, d_coord):
         """
         Takes coordinate, returns if in the red palace.
         """
-        if d_coord == (1, 4) or d_coord == (2, 4) or d_coord == (3, 4) or d_coord == (1, 5) or d_coord == (2, 5) or \
-                d_coord == (3, 5) or d_coord == (1, 6) or d_coord == (2, 6) or d_coord == (3, 6):
-            return True
-        else:
-            return False
+        return d_coord in RED_PALACE_SQUARES
+
+    def generate_pseudo_moves(self, board):
+        """
+        Returns the list of destination coordinates this piece has a path to, ignoring whether the move would leave
+        its own general in check. Squares held by a teammate are left out, except for the piece's own square, which is
+        always included as the "pass" move. Overwritten for each piece type.
+        """
+        return [self.get_coordinates()]
+
+    def generate_attacks(self, board):
+        """
+        Returns the squares other than its own this piece has a path to, occupied or not. Overwritten for each piece
+        type.
+        """
+        return []
+
+    def is_open_to(self, d_coord, board):
+        """
+        Move generation helper, returns True if d_coord is either empty or held by an enemy piece.
+        """
+        occupant = board[d_coord[0]][d_coord[1]]
+        return occupant is None or occupant.get_color_code() != self.get_color_code()
+
+    def get_palace_center(self, coord):
+        """
+        Returns the center square of the palace coord lies in, or None if coord is outside both palaces.
+        """
+        return PALACE_CENTERS.get(coord)
+
+    def palace_step_moves(self, board):
+        """
+        Move generation helper for the General and Guard, which share the same movement: one step along the palace
+        lines, looked up in PALACE_STEPS.
+        """
+        o_coord = self.get_coordinates()
+        moves = [o_coord]
+        for d_coord in PALACE_STEPS.get(o_coord, ()):
+            if self.is_open_to(d_coord, board):
+                moves.append(d_coord)
+        return moves
 
 
 class General(Game_Piece):
@@ -97,6 +341,9 @@ class General(Game_Piece):
     Palace. General represented on board of Game object. General has basic movement.
     """
 
+    __slots__ = ()
+    PIECE_TYPE = GENERAL
+
     def __init__(self, player_color, coordinate):
         """
         Calls super constructor
@@ -111,43 +358,28 @@ class General(Game_Piece):
 
     def has_path_to(self, d_coord, board):  # [y][x]
         """
-        Determines movement for generals, will depend on  mostly on palace constraints
-        Can move 1 in any direction, but if in palace corner squares or center, can move 1,1 in any direction or
-        only towards the center depending on orientation.
+        Determines movement for generals, restricted to their palace. Can move 1 along any palace line, so 1 in any
+        direction from the center, to the center from the corners, otherwise 1 orthogonally. The General never leaves
+        its own palace, so PALACE_STEPS from its square only holds squares in its own palace.
         """
         # If we select the same square our piece is on as the destination, that square is "in range" of our piece.
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
+        return d_coord in PALACE_STEPS.get(o_coord, ())
 
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-        piece_color = self.get_player_color()
-        if piece_color == "blue":
-            d_in_palace = self.in_the_blue_palace(d_coord)
-        else:
-            d_in_palace = self.in_the_red_palace(d_coord)
-
-        if d_in_palace is False:
-            return False
-
-        # We have ensured our destination is not outside our own palace. So if we are in the center, any move is valid.
-        if piece_color == "blue" and self.get_coordinates() == (9, 5):
-            return True
-        elif piece_color == "blue" and self.get_coordinates() != (9, 5) and d_coord == (9, 5):
-            return True
-        if piece_color == "red" and self.get_coordinates() == (2, 5):
-            return True
-        elif piece_color == "red" and self.get_coordinates() != (2, 5) and d_coord == (2, 5):
-            return True
-        # That should handle all of the Diagonal movements
+    def generate_pseudo_moves(self, board):
+        """
+        Lists the squares the General can move to, one step within its own palace (including the palace diagonals)
+        or passing on its own square.
+        """
+        return self.palace_step_moves(board)
 
-        if y_dif == 0 and (x_dif == 1 or x_dif == -1):
-            return True
-        elif x_dif == 0 and (y_dif == 1 or y_dif == -1):
-            return True
-        else:
-            return False
+    def generate_attacks(self, board):
+        """
+        Attacks every palace step from its square, nothing can get in the way
+        """
+        return list(PALACE_STEPS.get(self.get_coordinates(), ()))
 
 
 class Guard(Game_Piece):
@@ -156,6 +388,9 @@ class Guard(Game_Piece):
     object. Guard can move 1 space x or why, and move along palace diagonals
     """
 
+    __slots__ = ()
+    PIECE_TYPE = GUARD
+
     def __init__(self, player_color, coordinate):
         """
         Calls super constructor
@@ -170,42 +405,25 @@ class Guard(Game_Piece):
 
     def has_path_to(self, d_coord, board):  # [y][x]
         """
-        Will use basically the same movement constraints present for the general.
+        Will use the same movement constraints present for the general.
         """
         # If we select the same square, we are passing our turn, which is a valid move
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
+        return d_coord in PALACE_STEPS.get(o_coord, ())
 
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-        piece_color = self.get_player_color()
-
-        if piece_color == "blue":
-            d_in_palace = self.in_the_blue_palace(d_coord)
-        else:
-            d_in_palace = self.in_the_red_palace(d_coord)
-
-        if d_in_palace is False:
-            return False
-
-        # We have ensured our destination is not outside our own palace. So if we are in the center, any move is valid.
-        if piece_color == "blue" and self.get_coordinates() == (9, 5):
-            return True
-        elif piece_color == "blue" and self.get_coordinates() != (9, 5) and d_coord == (9, 5):
-            return True
-        if piece_color == "red" and self.get_coordinates() == (2, 5):
-            return True
-        elif piece_color == "red" and self.get_coordinates() != (2, 5) and d_coord == (2, 5):
-            return True
-        # That should handle all of the Diagonal movements
+    def generate_pseudo_moves(self, board):
+        """
+        Guards move exactly like the General, so we share its palace step generator.
+        """
+        return self.palace_step_moves(board)
 
-        if y_dif == 0 and (x_dif == 1 or x_dif == -1):
-            return True
-        elif x_dif == 0 and (y_dif == 1 or y_dif == -1):
-            return True
-        else:
-            return False
+    def generate_attacks(self, board):
+        """
+        Attacks every palace step from its square, nothing can get in the way
+        """
+        return list(PALACE_STEPS.get(self.get_coordinates(), ()))
 
 
 class Horse(Game_Piece):
@@ -214,6 +432,9 @@ class Horse(Game_Piece):
     horses cannot jump over a piece one square in front of them.
     """
 
+    __slots__ = ()
+    PIECE_TYPE = HORSE
+
     def __init__(self, player_color, coordinate):
         """
         Calls game_piece super constructor
@@ -229,46 +450,43 @@ class Horse(Game_Piece):
 
     def has_path_to(self, d_coord, board):  # [y][x]
         """
-        Horses can move 2,(1 or -1), -2,(1 or -1), (1 or -1),-2 or (1 or -1), 2 if they are not being blocked
-        There are 8 horse movements and four ways to block any of these movements (4 checks)
+        Horses can move 2,(1 or -1), -2,(1 or -1), (1 or -1),-2 or (1 or -1), 2 if they are not being blocked.
+        HORSE_LEGS gives us the one square each of those 8 movements can be blocked at.
         """
         # If we select the same square, we are moving to our own square,
         # which means we have path to because we can "pass"
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
-            return True
-
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-        if y_dif == -2 and (x_dif == 1 or x_dif == -1) and self.get_at_relative((-1, 0), board) is None:
-            return True
-        if y_dif == 2 and (x_dif == 1 or x_dif == -1) and self.get_at_relative((1, 0), board) is None:
-            return True
-        if x_dif == 2 and (y_dif == 1 or y_dif == -1) and self.get_at_relative((0, 1), board) is None:
-            return True
-        if x_dif == -2 and (y_dif == 1 or y_dif == -1) and self.get_at_relative((0, -1), board) is None:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
-
-        return False
+        leg = HORSE_LEGS[o_coord].get(d_coord)
+        return leg is not None and board[leg[0]][leg[1]] is None
 
     def can_be_blocked_at(self, d_coord):
         """
         This function is only called when the piece is already confirmed to have a valid path to d_coord
         Function returns the square Horse can be blocked at depending on movement.
         """
-        square_list = []
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        if y_dif == -2 and (x_dif == 1 or x_dif == -1):
-            square_list.append((self.get_coordinates()[0] + (-1), self.get_coordinates()[1]))
-        elif y_dif == 2 and (x_dif == 1 or x_dif == -1):
-            square_list.append((self.get_coordinates()[0] + 1, self.get_coordinates()[1]))
-        elif x_dif == 2 and (y_dif == 1 or y_dif == -1):
-            square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + 1))
-        elif x_dif == -2 and (y_dif == 1 or y_dif == -1):
-            square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + (-1)))
+        leg = HORSE_LEGS[self.get_coordinates()].get(d_coord)
+        if leg is None:
+            return []
+        return [leg]
 
-        return square_list
+    def generate_pseudo_moves(self, board):
+        """
+        Lists the squares the Horse can reach, every move in HORSE_MOVES whose leg square is empty.
+        """
+        o_coord = self.get_coordinates()
+        moves = [o_coord]
+        for d_coord, leg in HORSE_MOVES[o_coord]:
+            if board[leg[0]][leg[1]] is None and self.is_open_to(d_coord, board):
+                moves.append(d_coord)
+        return moves
+
+    def generate_attacks(self, board):
+        """
+        Attacks the end of every move whose leg square is empty
+        """
+        return [d_coord for d_coord, leg in HORSE_MOVES[self.get_coordinates()] if board[leg[0]][leg[1]] is None]
 
 
 class Elephant(Game_Piece):
@@ -276,6 +494,9 @@ class Elephant(Game_Piece):
     Game piece represented as Elephant. piece represented on Board of Game object. Movement similar to horse.
     """
 
+    __slots__ = ()
+    PIECE_TYPE = ELEPHANT
+
     def __init__(self, player_color, coordinate):
         """
         Calls super constructor
@@ -292,76 +513,43 @@ class Elephant(Game_Piece):
         """
         Very similar to Horse, but now our moves are 3,(2 or -2), -3,(2 or -2), (2 or -2),-3 or (2 or -2), 3 and
         there are now 2 potential squares we must check to see if we are being blocked for each of the 8
-        movements.
+        movements, both found in ELEPHANT_LEGS.
         """
         # If we select the same square, we are moving to our own square,
         # which means we have path to because we can "pass"
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
-
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-        if y_dif == -3 and x_dif == 2:
-            if self.get_at_relative((-2, 1), board) is None and self.get_at_relative((-1, 0), board) is None:
-                return True
-        if y_dif == -3 and x_dif == -2:
-            if self.get_at_relative((-2, -1), board) is None and self.get_at_relative((-1, 0), board) is None:
-                return True
-        if y_dif == -2 and x_dif == 3:
-            if self.get_at_relative((-1, 2), board) is None and self.get_at_relative((0, 1), board) is None:
-                return True
-        if y_dif == 2 and x_dif == 3:
-            if self.get_at_relative((1, 2), board) is None and self.get_at_relative((0, 1), board) is None:
-                return True
-        if y_dif == 3 and x_dif == 2:
-            if self.get_at_relative((2, 1), board) is None and self.get_at_relative((1, 0), board) is None:
-                return True
-        if y_dif == 3 and x_dif == -2:
-            if self.get_at_relative((2, -1), board) is None and self.get_at_relative((1, 0), board) is None:
-                return True
-        if y_dif == 2 and x_dif == -3:
-            if self.get_at_relative((1, -2), board) is None and self.get_at_relative((0, -1), board) is None:
-                return True
-        if y_dif == -2 and x_dif == -3:
-            if self.get_at_relative((-1, -2), board) is None and self.get_at_relative((0, -1), board) is None:
-                return True
-        return False
+        legs = ELEPHANT_LEGS[o_coord].get(d_coord)
+        if legs is None:
+            return False
+        return board[legs[0][0]][legs[0][1]] is None and board[legs[1][0]][legs[1][1]] is None
 
     def can_be_blocked_at(self, d_coord):
         """
         This function is only called when the piece is already confirmed to have a valid path to d_coord
         Functions return squares enemy piece could move to in order to block move to d_coord
         """
-        square_list = []
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        if y_dif == -3 and x_dif == 2:
-            square_list.append((self.get_coordinates()[0] + (-1), self.get_coordinates()[1]))
-            square_list.append((self.get_coordinates()[0] + (-2), self.get_coordinates()[1] + (1)))
-        elif y_dif == -3 and x_dif == -2:
-            square_list.append((self.get_coordinates()[0] + (-2), self.get_coordinates()[1] + (-1)))
-            square_list.append((self.get_coordinates()[0] + (-1), self.get_coordinates()[1]))
-        elif y_dif == -2 and x_dif == 3:
-            square_list.append((self.get_coordinates()[0] + (-1), self.get_coordinates()[1] + (2)))
-            square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + 1))
-        elif y_dif == 2 and x_dif == 3:
-            square_list.append((self.get_coordinates()[0] + (1), self.get_coordinates()[1] + (2)))
-            square_list.append((self.get_coordinates()[0] + (0), self.get_coordinates()[1] + 1))
-        elif y_dif == 3 and x_dif == 2:
-            square_list.append((self.get_coordinates()[0] + (2), self.get_coordinates()[1] + (1)))
-            square_list.append((self.get_coordinates()[0] + (1), self.get_coordinates()[1]))
-        elif y_dif == 3 and x_dif == -2:
-            square_list.append((self.get_coordinates()[0] + (2), self.get_coordinates()[1] + (-1)))
-            square_list.append((self.get_coordinates()[0] + (1), self.get_coordinates()[1]))
-        elif y_dif == 2 and x_dif == -3:
-            square_list.append((self.get_coordinates()[0] + (1), self.get_coordinates()[1] + (-2)))
-            square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + (-1)))
-        elif y_dif == -2 and x_dif == -3:
-            square_list.append((self.get_coordinates()[0] + (-1), self.get_coordinates()[1] + (-2)))
-            square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + (-1)))
+        return list(ELEPHANT_LEGS[self.get_coordinates()].get(d_coord, ()))
 
-        return square_list
+    def generate_pseudo_moves(self, board):
+        """
+        Lists the squares the Elephant can reach, every move in ELEPHANT_MOVES whose two leg squares are empty.
+        """
+        o_coord = self.get_coordinates()
+        moves = [o_coord]
+        for d_coord, legs in ELEPHANT_MOVES[o_coord]:
+            if board[legs[0][0]][legs[0][1]] is None and board[legs[1][0]][legs[1][1]] is None and \
+                    self.is_open_to(d_coord, board):
+                moves.append(d_coord)
+        return moves
+
+    def generate_attacks(self, board):
+        """
+        Attacks the end of every move with both leg squares empty
+        """
+        return [d_coord for d_coord, legs in ELEPHANT_MOVES[self.get_coordinates()]
+                if board[legs[0][0]][legs[0][1]] is None and board[legs[1][0]][legs[1][1]] is None]
 
 
 class Chariot(Game_Piece):
@@ -369,6 +557,9 @@ class Chariot(Game_Piece):
     Game piece represented as Chariot. Piece represented on Board of Game object. Movement similar to rook.
     """
 
+    __slots__ = ()
+    PIECE_TYPE = CHARIOT
+
     def __init__(self, player_color, coordinate):
         """
         Calls super constructor
@@ -381,128 +572,79 @@ class Chariot(Game_Piece):
         """
         return self.get_player_color() + " chariot"
 
-    def palace_moves(self, d_coord, board):
-        """
-        5 starting positions per palace, 2 variations for each of the 4 corners. 18 total conditions.
-        """
-        # We know that we are in either the red palace seeking a destination in red or vice versa. So any move
-        # we make from the center to any of the 8 squares we could be in, are always in range.
-        if self.get_coordinates() == (2, 5) or self.get_coordinates() == (9, 5):
-            return True
-
-        if self.get_coordinates() == (8, 4) and d_coord == (9, 5):
-            return True
-        if self.get_coordinates() == (8, 4) and d_coord == (10, 6) and board[9][5] is None:
-            return True
-
-        if self.get_coordinates() == (8, 6) and d_coord == (9, 5):
-            return True
-        if self.get_coordinates() == (8, 6) and d_coord == (10, 4) and board[9][5] is None:
-            return True
-
-        if self.get_coordinates() == (10, 4) and d_coord == (9, 5):
-            return True
-        if self.get_coordinates() == (10, 4) and d_coord == (8, 6) and board[9][5] is None:
-            return True
-
-        if self.get_coordinates() == (10, 6) and d_coord == (9, 5):
-            return True
-        if self.get_coordinates() == (10, 6) and d_coord == (8, 4) and board[9][5] is None:
-            return True
-        #
-        if self.get_coordinates() == (1, 4) and d_coord == (2, 5):
-            return True
-        if self.get_coordinates() == (1, 4) and d_coord == (3, 6) and board[2][5] is None:
-            return True
-
-        if self.get_coordinates() == (1, 6) and d_coord == (2, 5):
-            return True
-        if self.get_coordinates() == (1, 6) and d_coord == (3, 4) and board[2][5] is None:
-            return True
-
-        if self.get_coordinates() == (3, 4) and d_coord == (2, 5):
-            return True
-        if self.get_coordinates() == (3, 4) and d_coord == (1, 6) and board[2][5] is None:
-            return True
-
-        if self.get_coordinates() == (3, 6) and d_coord == (2, 5):
-            return True
-        if self.get_coordinates() == (3, 6) and d_coord == (1, 4) and board[2][5] is None:
-            return True
-
     def has_path_to(self, d_coord, board):  # [y][x]
         """
         With chariots, we must see if we are being blocked by checking if something is present in any
-        of the squares in between the chariot and its destination. I will accomplish this by by calculating
-         the x or y difference, and looping through those slots in x or y direction to determine if a piece
-         is in the way or not, if not, it is a valid move.
+        of the squares in between the chariot and its destination. LINE_BETWEEN gives us those squares for a
+        destination on the same row or column, PALACE_DIAGONALS for a destination along a palace diagonal. If neither
+        table has the destination it is out of range.
          """
 
         # If we select the same square, we are moving to our own square,
         # which means we have path to because we can "pass"
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
-            return True
-
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-
-        p_moves = False
-        if self.in_the_blue_palace(self.get_coordinates()) and self.in_the_blue_palace(d_coord):
-            p_moves = self.palace_moves(d_coord, board)
-        if self.in_the_red_palace(self.get_coordinates()) and self.in_the_red_palace(d_coord):
-            p_moves = self.palace_moves(d_coord, board)
-        if p_moves is True:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
 
-        # Chariot has 4 case depending on if its moving in -x, x, y, or -y.
-        # Chariots can only move on one axis
-        if y_dif != 0 and x_dif != 0:
-            return False
-        # if y difference is negative we iterate through the difference in that direction (-1 or +1 for the actual
-        # piece) to see if any other pieces are in between it and it's destination
-        if x_dif == 0 and y_dif < 0:
-            for y in range(-1, y_dif, -1):
-                if self.get_at_relative((y, 0), board) is not None:
-                    return False
-        elif x_dif == 0 and y_dif > 0:
-            for y in range(1, y_dif):
-                if self.get_at_relative((y, 0), board) is not None:
-                    return False
-        elif y_dif == 0 and x_dif > 0:
-            for x in range(1, x_dif):
-                if self.get_at_relative((0, x), board) is not None:
-                    return False
-        else:  # y_dif ==0 and x_dif < 0:
-            for x in range(-1, x_dif, -1):
-                if self.get_at_relative((0, x), board) is not None:
-                    return False
+        between = LINE_BETWEEN[o_coord].get(d_coord)
+        if between is None:
+            between = PALACE_DIAGONALS[o_coord].get(d_coord)
+            if between is None:
+                return False
+        for y, x in between:
+            if board[y][x] is not None:
+                return False
         # Nothing is in the way
         return True
 
     def can_be_blocked_at(self, d_coord):
         """
         This function is only called when the piece is already confirmed to have a valid path to d_coord
-        Loops through orgin to destination and returns all squares in between
+        Returns all squares in between origin and destination, palace diagonals included.
         """
-        square_list = []
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-
-        if x_dif == 0 and y_dif < 0:
-            for y in range(-1, y_dif, -1):
-                square_list.append((self.get_coordinates()[0] + (y), self.get_coordinates()[1]))
-        elif x_dif == 0 and y_dif > 0:
-            for y in range(1, y_dif):
-                square_list.append((self.get_coordinates()[0] + y, self.get_coordinates()[1]))
-        elif y_dif == 0 and x_dif > 0:
-            for x in range(1, x_dif):
-                square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + x))
-        elif y_dif == 0 and x_dif < 0:
-            for x in range(-1, x_dif, -1):
-                square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + x))
+        between = LINE_BETWEEN[self.get_coordinates()].get(d_coord)
+        if between is None:
+            between = PALACE_DIAGONALS[self.get_coordinates()].get(d_coord, ())
+        return list(between)
 
-        return square_list
+    def generate_pseudo_moves(self, board):
+        """
+        Slides outward along each of the 4 ORTHOGONAL_RAYS until we run off the board or hit a piece, which we can
+        capture if it is an enemy. Inside a palace the chariot can also slide along the diagonals through the center.
+        """
+        o_coord = self.get_coordinates()
+        moves = [o_coord]
+        for ray in ORTHOGONAL_RAYS[o_coord]:
+            for y, x in ray:
+                if board[y][x] is None:
+                    moves.append((y, x))
+                else:
+                    if board[y][x].get_color_code() != self.get_color_code():
+                        moves.append((y, x))
+                    break
+
+        for d_coord, between in PALACE_DIAGONALS[o_coord].items():
+            if (not between or board[between[0][0]][between[0][1]] is None) and self.is_open_to(d_coord, board):
+                moves.append(d_coord)
+        return moves
+
+    def generate_attacks(self, board):
+        """
+        Attacks along each ray up to and including the first piece it meets, and along the palace diagonals when
+        nothing stands on the center between
+        """
+        o_coord = self.get_coordinates()
+        attacked = []
+        for ray in ORTHOGONAL_RAYS[o_coord]:
+            for y, x in ray:
+                attacked.append((y, x))
+                if board[y][x] is not None:
+                    break
+
+        for d_coord, between in PALACE_DIAGONALS[o_coord].items():
+            if not between or board[between[0][0]][between[0][1]] is None:
+                attacked.append(d_coord)
+        return attacked
 
 
 class Cannon(Game_Piece):
@@ -510,6 +652,9 @@ class Cannon(Game_Piece):
     Game piece represented as Cannon. Piece represented on Board of Game object. Piece jumps other pieces
     """
 
+    __slots__ = ()
+    PIECE_TYPE = CANNON
+
     def __init__(self, player_color, coordinate):
         """
         Calls super constructor
@@ -522,100 +667,43 @@ class Cannon(Game_Piece):
         """
         return self.get_player_color() + " cannon"
 
-    def palace_moves(self, d_coord, board):
+    def get_line_to(self, d_coord):
         """
-        Handles the 4 palace moves a Cannon can make. Makes sure a piece is in the center of palace
+        Returns the squares between the cannon and d_coord along a row, column or palace diagonal, or None if there
+        is no such line.
         """
-
-        if self.get_coordinates() == (1, 4) and d_coord == (3, 6):
-            if board[2][5] is not None:
-                return True
-
-        if self.get_coordinates() == (1, 6) and d_coord == (3, 4):
-            if board[2][5] is not None:
-                return True
-
-        if self.get_coordinates() == (3, 6) and d_coord == (1, 4):
-            if board[2][5] is not None:
-                return True
-
-        if self.get_coordinates() == (3, 4) and d_coord == (1, 6):
-            if board[2][5] is not None:
-                return True
-
-        if self.get_coordinates() == (8, 4) and d_coord == (10, 6):
-            if board[9][5] is not None:
-                return True
-
-        if self.get_coordinates() == (8, 6) and d_coord == (10, 4):
-            if board[9][5] is not None:
-                return True
-
-        if self.get_coordinates() == (10, 6) and d_coord == (8, 4):
-            if board[9][5] is not None:
-                return True
-
-        if self.get_coordinates() == (10, 4) and d_coord == (8, 6):
-            if board[9][5] is not None:
-                return True
-
-        return False
+        between = LINE_BETWEEN[self.get_coordinates()].get(d_coord)
+        if between is None:
+            between = PALACE_DIAGONALS[self.get_coordinates()].get(d_coord)
+        return between
 
     def has_path_to(self, d_coord, board):  # [y][x]
         """
         Functions Similar to Chariot, will need to make sure that there is exactly one pieces between
-        target and destination, will detect in a manner similar to chariot, if more than one or No pieces
-        are between the target and the destination than the move is considered to be invalid
+        target and destination, if more than one or No pieces are between the target and the destination than the
+        move is considered to be invalid. Cannons can neither jump nor capture another cannon. Along the palace
+        diagonals the only jump is corner to corner over the center.
         """
         # If we select the same square, we are moving to our
         # own square, which means we have path to because we can "pass"
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
         if board[d_coord[0]][d_coord[1]] is not None:
-            if "cannon" in board[d_coord[0]][d_coord[1]].get_name():
+            if board[d_coord[0]][d_coord[1]].get_piece_type() == CANNON:
                 return False
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-
-        p_moves = False
-        if self.in_the_blue_palace(self.get_coordinates()) and self.in_the_blue_palace(d_coord):
-            p_moves = self.palace_moves(d_coord, board)
-        if self.in_the_red_palace(self.get_coordinates()) and self.in_the_red_palace(d_coord):
-            p_moves = self.palace_moves(d_coord, board)
-        if p_moves is True:
-            return True
 
-        # Cannon Also has 4 case depending on if its moving in -x, x, y, or -y.
-        if y_dif != 0 and x_dif != 0:
-            return False
-        # if y difference is negative we iterate through the difference in that direction (-1 or +1 for the actual
-        # piece) to see if any other pieces are in between it and it's destination
+        between = LINE_BETWEEN[o_coord].get(d_coord)
+        if between is None:
+            between = PALACE_DIAGONALS[o_coord].get(d_coord)
+            return between is not None and len(between) == 1 and board[between[0][0]][between[0][1]] is not None
+
         pieces_between = 0
-        if x_dif == 0 and y_dif < 0:
-            for y in range(-1, y_dif, -1):
-                if self.get_at_relative((y, 0), board) is not None:
-                    if "cannon" in self.get_at_relative((y, 0), board).get_name():
-                        return False
-                    pieces_between = pieces_between + 1
-        elif x_dif == 0 and y_dif > 0:
-            for y in range(1, y_dif):
-                if self.get_at_relative((y, 0), board) is not None:
-                    if "cannon" in self.get_at_relative((y, 0), board).get_name():
-                        return False
-                    pieces_between = pieces_between + 1
-        elif y_dif == 0 and x_dif > 0:
-            for x in range(1, x_dif):
-                if self.get_at_relative((0, x), board) is not None:
-                    if "cannon" in self.get_at_relative((0, x), board).get_name():
-                        return False
-                    pieces_between = pieces_between + 1
-        else:  # y_dif ==0 and x_dif < 0:
-            for x in range(-1, x_dif, -1):
-                if self.get_at_relative((0, x), board) is not None:
-                    if "cannon" in self.get_at_relative((0, x), board).get_name():
-                        return False
-                    pieces_between = pieces_between + 1
+        for y, x in between:
+            if board[y][x] is not None:
+                if board[y][x].get_piece_type() == CANNON:
+                    return False
+                pieces_between = pieces_between + 1
 
         if pieces_between == 1:
             return True
@@ -627,55 +715,78 @@ class Cannon(Game_Piece):
         To properly handle the can_be_blocked_at function (as well as returning this square for checkmate checks)
         We need to first get the coordinates of the piece we are jumping.
         """
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        if x_dif == 0 and y_dif < 0:
-            for y in range(-1, y_dif, -1):
-                if self.get_at_relative((y, 0), board) is not None:
-                    return (self.get_coordinates()[0] + y), self.get_coordinates()[1]
-        elif x_dif == 0 and y_dif > 0:
-            for y in range(1, y_dif):
-                if self.get_at_relative((y, 0), board) is not None:
-                    return (self.get_coordinates()[0] + y), self.get_coordinates()[1]
-        elif y_dif == 0 and x_dif > 0:
-            for x in range(1, x_dif):
-                if self.get_at_relative((0, x), board) is not None:
-                    return self.get_coordinates()[0], (self.get_coordinates()[1] + x)
-        elif y_dif == 0 and x_dif < 0:
-            for x in range(-1, x_dif, -1):
-                if self.get_at_relative((0, x), board) is not None:
-                    return self.get_coordinates()[0], (self.get_coordinates()[1] + x)
+        for y, x in self.get_line_to(d_coord) or ():
+            if board[y][x] is not None:
+                return y, x
 
     def can_be_blocked_at(self, jp_coord, d_coord):
         """
         Using the jumped Piece coordinate, we return all the squares between the cannon and its destination
         that are not the jumped pieces square.
         """
+        return [coord for coord in self.get_line_to(d_coord) or () if coord != jp_coord]
+
+    def generate_pseudo_moves(self, board):
+        """
+        Slides outward along each of the 4 ORTHOGONAL_RAYS until we find a piece to jump. Cannons can't jump other
+        cannons. After the jump we can land on any empty square up to the next piece, which we can capture if it is an
+        enemy that is not a cannon. Inside a palace the cannon can also jump from corner to corner over the center.
+        """
+        o_coord = self.get_coordinates()
+        moves = [o_coord]
+        for ray in ORTHOGONAL_RAYS[o_coord]:
+            jumped = False
+            for y, x in ray:
+                if not jumped:
+                    if board[y][x] is not None:
+                        if board[y][x].get_piece_type() == CANNON:
+                            break
+                        jumped = True
+                elif board[y][x] is None:
+                    moves.append((y, x))
+                else:
+                    if board[y][x].get_piece_type() != CANNON and \
+                            board[y][x].get_color_code() != self.get_color_code():
+                        moves.append((y, x))
+                    break
+
+        for d_coord, between in PALACE_DIAGONALS[o_coord].items():
+            target = board[d_coord[0]][d_coord[1]]
+            if len(between) == 1 and board[between[0][0]][between[0][1]] is not None and \
+                    (target is None or (target.get_piece_type() != CANNON and
+                                        target.get_color_code() != self.get_color_code())):
+                moves.append(d_coord)
+        return moves
+
+    def generate_attacks(self, board):
+        """
+        Attacks along each ray past the first piece (if it is not a cannon) up to and including the next piece (if it
+        is not a cannon), and corner to corner over an occupied palace center unless the far corner holds a cannon
+        """
+        o_coord = self.get_coordinates()
+        attacked = []
+        for ray in ORTHOGONAL_RAYS[o_coord]:
+            jumped = False
+            for y, x in ray:
+                if not jumped:
+                    if board[y][x] is not None:
+                        if board[y][x].get_piece_type() == CANNON:
+                            break
+                        jumped = True
+                elif board[y][x] is None:
+                    attacked.append((y, x))
+                else:
+                    if board[y][x].get_piece_type() != CANNON:
+                        attacked.append((y, x))
+                    break
 
-        square_list = []
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        if x_dif == 0 and y_dif < 0:
-            for y in range(-1, y_dif, -1):
-                if ((self.get_coordinates()[0] + y), self.get_coordinates()[1]) != jp_coord:
-                    square_list.append((self.get_coordinates()[0] + y, self.get_coordinates()[1]))
-
-        elif x_dif == 0 and y_dif > 0:
-            for y in range(1, y_dif):
-                if ((self.get_coordinates()[0] + y), self.get_coordinates()[1]) != jp_coord:
-                    square_list.append((self.get_coordinates()[0] + y, self.get_coordinates()[1]))
-
-        elif y_dif == 0 and x_dif > 0:
-            for x in range(1, x_dif):
-                if ((self.get_coordinates()[0]), self.get_coordinates()[1] + x) != jp_coord:
-                    square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + x))
-
-        elif y_dif == 0 and x_dif < 0:
-            for x in range(-1, x_dif, -1):
-                if ((self.get_coordinates()[0]), self.get_coordinates()[1] + x) != jp_coord:
-                    square_list.append((self.get_coordinates()[0], self.get_coordinates()[1] + x))
-
-        return square_list
+        for d_coord, between in PALACE_DIAGONALS[o_coord].items():
+            if len(between) == 1:
+                target = board[d_coord[0]][d_coord[1]]
+                if board[between[0][0]][between[0][1]] is not None and (target is None or
+                                                                      target.get_piece_type() != CANNON):
+                    attacked.append(d_coord)
+        return attacked
 
 
 class Soldier(Game_Piece):
@@ -684,6 +795,9 @@ class Soldier(Game_Piece):
     one space.
     """
 
+    __slots__ = ()
+    PIECE_TYPE = SOLDIER
+
     def __init__(self, player_color, coordinate):
         """
         Calls super constructor
@@ -696,72 +810,74 @@ class Soldier(Game_Piece):
         """
         return self.get_player_color() + " soldier"
 
-    def palace_moves(self, d_coord, y_dif, x_dif):
-        """
-        If were in center of the red or blue palace, and our destination is somewhere else in the red or blue palace,
-        it must be a valid move.
-        """
-        if self.get_coordinates() == (2, 5):
-            return True
-        if self.get_coordinates() == (9, 5):
-            return True
-
-        if self.get_coordinates() == (1, 4) or self.get_coordinates() == (1, 6) or self.get_coordinates() == (3, 4) \
-                or self.get_coordinates() == (3, 6):
-            if d_coord == (2, 5):
-                return True
-
-        if self.get_coordinates() == (8, 4) or self.get_coordinates() == (8, 6) or self.get_coordinates() == (10, 4) \
-                or self.get_coordinates() == (10, 6):
-            if d_coord == (9, 5):
-                return True
-
-        if self.get_player_color() == "blue":
-            if y_dif == 1 and x_dif == 0:
-                return True
-        else:
-            if y_dif == -1 and x_dif == 0:
-                return True
-
-        return False
-
     def has_path_to(self, d_coord, board):  # [y][x]
         """
         Detects if the passed piece has a path to the destination
         any direction except backwards. Soldiers can move 1 space freely within the palace like Guards and Generals.
+        SOLDIER_STEPS holds every square a soldier of our color can step to from its square.
         """
         # If we select the same square, we are moving to our own square,
         # which means we have path to because we can "pass"
-        if self.get_coordinates()[0] == d_coord[0] and self.get_coordinates()[1] == d_coord[1]:
+        o_coord = self.get_coordinates()
+        if o_coord == d_coord:
             return True
+        return d_coord in SOLDIER_STEPS[self.get_player_color()][o_coord]
 
-        player_color = self.get_player_color()
-        # This lets us know which way is "forwards"
-        if player_color == "blue":
-            y_multiplier = -1
-        else:
-            y_multiplier = 1
+    def generate_pseudo_moves(self, board):
+        """
+        Lists the squares the Soldier can reach from SOLDIER_STEPS, which already holds its palace moves.
+        """
+        o_coord = self.get_coordinates()
+        moves = [o_coord]
+        for d_coord in SOLDIER_STEPS[self.get_player_color()][o_coord]:
+            if self.is_open_to(d_coord, board):
+                moves.append(d_coord)
+        return moves
+
+    def generate_attacks(self, board):
+        """
+        Attacks every step in SOLDIER_STEPS, nothing can get in the way
+        """
+        return list(SOLDIER_STEPS[self.get_player_color()][self.get_coordinates()])
 
-        y_dif = d_coord[0] - self.get_coordinates()[0]
-        x_dif = d_coord[1] - self.get_coordinates()[1]
-        # print(y_dif, " ", x_dif)
-        p_moves = False
 
-        if self.in_the_blue_palace(self.get_coordinates()) and self.in_the_blue_palace(d_coord):
-            p_moves = self.palace_moves(d_coord, y_dif, x_dif)
+def build_zobrist_keys():
+    """
+    Zobrist keys for position hashing, one random 64 bit number per piece type, color and square, indexed by piece
+    code then coordinate. The seed is fixed so the same position hashes to the same number in every process.
+    """
+    generator = random.Random(20210225)
+    keys = []
+    for piece_type in range(len(TYPE_NAMES)):
+        for color in (BLUE, RED):
+            keys.append(dict((coord, generator.getrandbits(64)) for coord in ALL_SQUARES))
+    return keys, generator.getrandbits(64)
 
-        if self.in_the_red_palace(self.get_coordinates()) and self.in_the_red_palace(d_coord):
-            p_moves = self.palace_moves(d_coord, y_dif, x_dif)
 
-        if p_moves is True:
-            return True
+# ZOBRIST_RED_TO_MOVE is mixed into the hash whenever it is red's turn
+ZOBRIST_PIECE_KEYS, ZOBRIST_RED_TO_MOVE = build_zobrist_keys()
 
-        if y_dif == 0 and (x_dif == 1 or x_dif == -1):
-            return True
-        elif y_dif == 1 * y_multiplier and x_dif == 0:
-            return True
-        else:
-            return False
+# Piece classes indexed by type code
+PIECE_CLASSES = (General, Guard, Horse, Elephant, Chariot, Cannon, Soldier)
+
+# Game states indexed by their code in the binary snapshot format. DRAW_BY_REPETITION ends a game with a repetition
+# limit set once a position has come up that many times.
+GAME_STATES = ("UNFINISHED", "BLUE_WON", "RED_WON", "DRAW_BY_REPETITION")
+
+# Position notation letters indexed by type code, blue pieces in upper case and red in lower case:
+# K general, A guard (advisor), H horse, E elephant, R chariot, C cannon, P soldier (pawn)
+FEN_LETTERS = "KAHERCP"
+
+# An empty board. Row 0 and column 0 are never used, they are only there so board[y][x] takes a coordinate as is.
+# The labels and the turn banner are not part of the board, render_board adds them.
+EMPTY_BOARD = [[None] * 10 for y in range(11)]
+
+# Width print_board and render_board pad every cell to
+CELL_WIDTH = 15
+
+# What a clone built by JanggiGame.clone (a SharedJanggiGame) leaves out until it needs it
+CLONE_LAZY_ATTRIBUTES = frozenset("_JanggiGame__" + name for name in (
+    "board", "blue_active_pieces", "red_active_pieces", "piece_indexes", "undo_stack", "position_counts"))
 
 
 class JanggiGame:
@@ -773,17 +889,225 @@ class JanggiGame:
        is checkmated. Is Janggi, Korean Chess!
     """
 
-    def __init__(self):
+    def __init__(self, set_up=True, repetition_limit=None):
         """
-        Dresses the board, sets game state, sets player's turn
+        Dresses the board, sets game state, sets player's turn. With set_up False the board is left empty (no
+        set_up_board), for from_fen and from_bytes to fill in. See set_repetition_limit for repetition_limit.
         """
-        self.__board = [[None for i in range(10)] for j in range(11)]
+        # Lazy cloning, see clone. A clone that has not built its board yet holds the position it was cloned in as
+        # __clone_snapshot, None once it has its own board and pieces.
+        self.__clone_snapshot = None
+        self.__board = [row[:] for row in EMPTY_BOARD]
         self.__blue_active_pieces = []
         self.__red_active_pieces = []
+        # Where each active piece sits in its color's list, so a captured piece comes out of the list in O(1)
+        self.__piece_indexes = {}
+        # One (o_coord, d_coord, captured, captured_index, position_hash, game_state) record per move
+        # made with push_move, popped by pop_move to take the move back
+        self.__undo_stack = []
+        # Piece square values the running score is kept with, see set_square_values. None keeps no score.
+        self.__square_values = None
+        self.__square_score = 0
+        if set_up:
+            self.set_up_board()
+        self.__game_state = "UNFINISHED"
+        self.__color_turn = "blue"
+        self.__position_hash = self.compute_position_hash()
+        # How many times each position hash has come up in this game, the current position included. push_move and
+        # pop_move keep it up to date, so repetition_count is a single dictionary lookup.
+        self.__position_counts = {self.__position_hash: 1}
+        self.__repetition_limit = None
+        if repetition_limit is not None:
+            self.set_repetition_limit(repetition_limit)
+
+    def clone(self):
+        """
+        Returns an independent copy of this game. The copy takes the turn, game state, position hash and running score
+        straight away, but only an immutable snapshot of the pieces (their codes and squares, in active pieces list
+        order): the first time the copy's board or pieces are used it builds them from the snapshot. Until then the
+        copy costs nothing to keep around and this game owes it nothing, moves made here never touch it. The copy's
+        undo stack starts empty.
+        """
+        twin = SharedJanggiGame.__new__(SharedJanggiGame)
+        snapshot = self.__clone_snapshot
+        if snapshot is None:
+            snapshot = (tuple((piece.get_piece_code(), piece.get_coordinates()) for piece in self.__blue_active_pieces),
+                        tuple((piece.get_piece_code(), piece.get_coordinates()) for piece in self.__red_active_pieces))
+        twin.__clone_snapshot = snapshot
+        twin.__color_turn = self.__color_turn
+        twin.__game_state = self.__game_state
+        twin.__position_hash = self.__position_hash
+        twin.__repetition_limit = self.__repetition_limit
+        twin.__square_values = self.__square_values
+        twin.__square_score = self.__square_score
+        return twin
+
+    def materialize(self):
+        """
+        Builds a clone's board, active pieces lists and empty undo stack from the snapshot clone took, and turns it
+        into a plain JanggiGame. Like the undo stack, the clone's position history starts over at the position it was
+        cloned in.
+        """
+        snapshot = self.__clone_snapshot
+        if snapshot is None:
+            return
+        board = [row[:] for row in EMPTY_BOARD]
+        piece_indexes = {}
+        active_pieces = ([], [])
+        for color_code in (BLUE, RED):
+            color = COLOR_NAMES[color_code]
+            pieces = active_pieces[color_code]
+            for piece_code, coord in snapshot[color_code]:
+                piece = PIECE_CLASSES[piece_code // 2](color, coord)
+                board[coord[0]][coord[1]] = piece
+                piece_indexes[piece] = len(pieces)
+                pieces.append(piece)
+        self.__board = board
+        self.__blue_active_pieces = active_pieces[BLUE]
+        self.__red_active_pieces = active_pieces[RED]
+        self.__piece_indexes = piece_indexes
+        self.__undo_stack = []
+        self.__position_counts = {self.__position_hash: 1}
+        self.__clone_snapshot = None
+        self.__class__ = JanggiGame
+
+    def reset(self):
+        """
+        Puts this game back to the starting position, blue to move, with an empty undo stack and position history.
+        The repetition limit is kept. Lets a long running process (ex: a replay or self-play worker) reuse one game
+        object for game after game.
+        """
+        for row in self.__board:
+            for x in range(len(row)):
+                row[x] = None
+        del self.__blue_active_pieces[:]
+        del self.__red_active_pieces[:]
+        self.__piece_indexes.clear()
+        del self.__undo_stack[:]
         self.set_up_board()
         self.__game_state = "UNFINISHED"
         self.__color_turn = "blue"
-        self.__board[0][0] = (self.get_player_turn() + "'s turn").upper()
+        self.__position_hash = self.compute_position_hash()
+        self.__position_counts = {self.__position_hash: 1}
+        self.__square_score = self.compute_square_score()
+
+    def to_fen(self):
+        """
+        Returns the position in our FEN style notation: the ranks from row 1 to row 10 separated by "/", each going
+        from column a to i with a FEN_LETTERS letter per piece (blue upper case, red lower case) and a digit for a run
+        of empty squares, then "b" or "r" for the side to move and the game state, ex:
+        reha1aehr/4k4/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/4K4/REHA1AEHR b UNFINISHED
+        """
+        ranks = []
+        for y in range(1, 11):
+            rank = ""
+            empty = 0
+            for x in range(1, 10):
+                piece = self.__board[y][x]
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[piece.get_piece_type()]
+                if piece.get_color_code() == RED:
+                    letter = letter.lower()
+                rank += letter
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+        return "/".join(ranks) + " " + self.get_player_turn()[0] + " " + self.get_game_state()
+
+    @staticmethod
+    def from_fen(fen):
+        """
+        Builds a new game straight from a to_fen string, without set_up_board or replaying moves. The undo stack
+        starts empty. Raises ValueError if the string is not a valid position.
+        """
+        fields = fen.split()
+        if len(fields) != 3 or fields[1] not in ("b", "r") or fields[2] not in GAME_STATES:
+            raise ValueError("invalid position: " + fen)
+        ranks = fields[0].split("/")
+        if len(ranks) != 10:
+            raise ValueError("invalid position: " + fen)
+        codes = []
+        for rank in ranks:
+            row = []
+            for letter in rank:
+                if letter.isdigit():
+                    row.extend([None] * int(letter))
+                elif letter.upper() in FEN_LETTERS:
+                    row.append(FEN_LETTERS.index(letter.upper()) * 2 + (RED if letter.islower() else BLUE))
+                else:
+                    raise ValueError("invalid position: " + fen)
+            if len(row) != 9:
+                raise ValueError("invalid position: " + fen)
+            codes.extend(row)
+        return JanggiGame.from_codes(codes, COLOR_NAMES[fields[1] == "r"], fields[2])
+
+    def to_bytes(self):
+        """
+        Returns the position as 92 bytes: one per square from a1 to i10 (0 for empty, otherwise piece code + 1),
+        then the side to move (BLUE or RED) and the game state's index in GAME_STATES.
+        """
+        data = bytearray(92)
+        for piece in self.__blue_active_pieces + self.__red_active_pieces:
+            y, x = piece.get_coordinates()
+            data[(y - 1) * 9 + x - 1] = piece.get_piece_code() + 1
+        data[90] = COLOR_CODES[self.get_player_turn()]
+        data[91] = GAME_STATES.index(self.get_game_state())
+        return bytes(data)
+
+    @staticmethod
+    def from_bytes(data):
+        """
+        Builds a new game straight from a to_bytes snapshot. Raises ValueError if the data is not a valid position.
+        """
+        if len(data) != 92 or data[90] > RED or data[91] >= len(GAME_STATES):
+            raise ValueError("invalid position snapshot")
+        codes = []
+        for square in range(90):
+            if data[square] == 0:
+                codes.append(None)
+            elif data[square] <= len(PIECE_CLASSES) * 2:
+                codes.append(data[square] - 1)
+            else:
+                raise ValueError("invalid position snapshot")
+        return JanggiGame.from_codes(codes, COLOR_NAMES[data[90]], GAME_STATES[data[91]])
+
+    @staticmethod
+    def from_codes(codes, color_turn, game_state):
+        """
+        Shared by from_fen and from_bytes, builds a game from 90 piece codes (or None) in a1 to i10 order. Each color
+        needs exactly one general, which goes to [0] of its active pieces list.
+        """
+        game = JanggiGame(False)
+        board = game.__board
+        generals = [[], []]
+        others = [[], []]
+        for square in range(90):
+            code = codes[square]
+            if code is None:
+                continue
+            coord = ALL_SQUARES[square]
+            piece = PIECE_CLASSES[code // 2](COLOR_NAMES[code % 2], coord)
+            board[coord[0]][coord[1]] = piece
+            if code // 2 == GENERAL:
+                generals[code % 2].append(piece)
+            else:
+                others[code % 2].append(piece)
+        if len(generals[BLUE]) != 1 or len(generals[RED]) != 1:
+            raise ValueError("a position needs exactly one general of each color")
+        for piece in generals[BLUE] + others[BLUE]:
+            game.add_to_blue_active_pieces(piece)
+        for piece in generals[RED] + others[RED]:
+            game.add_to_red_active_pieces(piece)
+        game.__color_turn = color_turn
+        game.__game_state = game_state
+        game.__position_hash = game.compute_position_hash()
+        game.__position_counts = {game.__position_hash: 1}
+        return game
 
     def get_blue_active_pieces(self):
         """
@@ -801,40 +1125,58 @@ class JanggiGame:
         """
         Appends pass object to blue active pieces
         """
+        self.__piece_indexes[item] = len(self.__blue_active_pieces)
         self.__blue_active_pieces.append(item)
 
     def add_to_red_active_pieces(self, item):
         """
         Appends passed object to red active pieces
         """
+        self.__piece_indexes[item] = len(self.__red_active_pieces)
         self.__red_active_pieces.append(item)
 
     def delete_from_blue_active_pieces(self, item):
         """
-        Deletes passed object from blue active pieces
+        Deletes passed object from blue active pieces, see remove_active_piece
         """
-        self.__blue_active_pieces.remove(item)
+        self.remove_active_piece(self.__blue_active_pieces, item)
 
     def delete_from_red_active_pieces(self, item):
         """
-        Deletes passed object from red active pieces
+        Deletes passed object from red active pieces, see remove_active_piece
         """
-        self.__red_active_pieces.remove(item)
+        self.remove_active_piece(self.__red_active_pieces, item)
 
-    def set_up_board(self):
+    def remove_active_piece(self, pieces, item):
         """
-        Initiates game piece objects on the board and in their respective active pieces list
+        Removes item from the passed active pieces list in O(1): the last piece of the list takes its slot. Returns the
+        index item was removed from so restore_active_piece can put it back exactly. The general at [0] is never
+        removed, so it stays at [0].
         """
-        # Set up column letters
-        self.set_piece(0, 1, "a"), self.set_piece(0, 2, "b"), self.set_piece(0, 3, "c"), self.set_piece(0, 4, "d"),
-        self.set_piece(0, 5, "e"), self.set_piece(0, 6, "f"), self.set_piece(0, 7, "g"), self.set_piece(0, 8, "h"),
-        self.set_piece(0, 9, "i")
+        index = self.__piece_indexes.pop(item)
+        last = pieces.pop()
+        if last is not item:
+            pieces[index] = last
+            self.__piece_indexes[last] = index
+        return index
 
-        # Set up row numbers
-        self.set_piece(1, 0, "1"), self.set_piece(2, 0, "2"), self.set_piece(3, 0, "3"), self.set_piece(4, 0, "4"),
-        self.set_piece(5, 0, "5"), self.set_piece(6, 0, "6"), self.set_piece(7, 0, "7"), self.set_piece(8, 0, "8"),
-        self.set_piece(9, 0, "9"), self.set_piece(10, 0, "10")
+    def restore_active_piece(self, pieces, item, index):
+        """
+        Reverses remove_active_piece, putting item back at index and the piece that took its slot back at the end
+        """
+        if index < len(pieces):
+            moved = pieces[index]
+            self.__piece_indexes[moved] = len(pieces)
+            pieces.append(moved)
+            pieces[index] = item
+        else:
+            pieces.append(item)
+        self.__piece_indexes[item] = index
 
+    def set_up_board(self):
+        """
+        Initiates game piece objects on the board and in their respective active pieces list
+        """
         # place red pieces on the board, add them to red_active_pieces_list
         self.set_piece(2, 5, General("red", (2, 5))), self.add_to_red_active_pieces(self.get_piece(2, 5))
         self.set_piece(1, 1, Chariot("red", (1, 1))), self.add_to_red_active_pieces(self.get_piece(1, 1))
@@ -883,21 +1225,43 @@ class JanggiGame:
         """
         return self.__board[y_coord][x_coord]
 
-    def print_board(self):
+    def get_banner(self):
+        """
+        Returns the banner shown above the row numbers: whose turn it is while the game is on (ex: "BLUE'S TURN"),
+        otherwise the game state (ex: "RED WON")
         """
-        Loops through every variable present in the board and prints it to screen in board format
+        if self.__game_state == "UNFINISHED":
+            return (self.__color_turn + "'s turn").upper()
+        return self.__game_state.replace("_", " ")
+
+    def get_frame_cells(self):
         """
-        for x in self.get_board():
-            for y in x:
-                if isinstance(y, str):
-                    print(y.ljust(15, " "), end='')
-                elif y is not None:
-                    st = y.get_name() + " "
-                    print(st.ljust(15, " "), end='')
+        Returns the text of every cell print_board shows as an 11x10 list of strings: the banner in the corner, the
+        column letters across row 0, the row numbers down column 0 and each square's piece name or "None"
+        """
+        cells = [[self.get_banner()] + list("abcdefghi")]
+        for y in range(1, 11):
+            row = [str(y)]
+            for piece in self.__board[y][1:]:
+                if piece is not None:
+                    row.append(piece.get_name() + " ")
                 else:
-                    st = str(y) + " "
-                    print(st.ljust(15, " "), end='')
-            print()
+                    row.append("None ")
+            cells.append(row)
+        return cells
+
+    def render_board(self):
+        """
+        Returns the whole board print_board shows as one string, every cell padded to CELL_WIDTH and a newline after
+        each row
+        """
+        return "".join("".join(cell.ljust(CELL_WIDTH) for cell in row) + "\n" for row in self.get_frame_cells())
+
+    def print_board(self):
+        """
+        Prints the board to screen in board format, in a single write
+        """
+        sys.stdout.write(self.render_board())
 
     def get_player_turn(self):
         """
@@ -913,10 +1277,197 @@ class JanggiGame:
 
     def set_player_turn(self, new_color):
         """
-        Sets players color
+        Sets players color, keeping the side to move part of the position hash up to date
          """
+        if new_color != self.__color_turn:
+            self.__position_hash ^= ZOBRIST_RED_TO_MOVE
         self.__color_turn = new_color
 
+    def position_hash(self):
+        """
+        Returns the 64 bit Zobrist key of the current position, covering every piece on its square and the side to
+        move. It is updated as pieces move rather than rebuilt, so this is free to call.
+        """
+        return self.__position_hash
+
+    def get_book_moves(self, book):
+        """
+        Looks the current position up in an opening book (a JanggiBook.OpeningBook) and returns its book moves as a
+        list of ((o_coord, d_coord), games) pairs, most played first. Empty when the position is not in the book.
+        """
+        return book.get_moves(self.__position_hash)
+
+    def compute_position_hash(self):
+        """
+        Builds the Zobrist key of the current position from scratch by going over both active pieces lists. Only
+        needed when the board was edited directly with set_piece, push_move keeps the hash current otherwise.
+        """
+        position_hash = 0
+        for piece in self.get_blue_active_pieces() + self.get_red_active_pieces():
+            position_hash ^= ZOBRIST_PIECE_KEYS[piece.get_piece_code()][piece.get_coordinates()]
+        if self.get_player_turn() == "red":
+            position_hash ^= ZOBRIST_RED_TO_MOVE
+        return position_hash
+
+    def get_square_values(self):
+        """
+        Returns the piece square values the running score is kept with, None if the game keeps no score
+        """
+        return self.__square_values
+
+    def set_square_values(self, square_values):
+        """
+        Sets the piece square values the game keeps a running score with: a list indexed by piece code of
+        dictionaries giving the value of a piece of that type and color on each square, blue pieces counting up and
+        red pieces down (see JanggiEvaluation). The score is counted up once here, then push_move and pop_move keep
+        it current with a couple of lookups per move. None stops keeping a score.
+        """
+        self.__square_values = square_values
+        self.__square_score = self.compute_square_score()
+
+    def get_square_score(self):
+        """
+        Returns the running score, the sum of the square values of every piece on the board (0 without square values)
+        """
+        return self.__square_score
+
+    def compute_square_score(self):
+        """
+        Adds the square values of every piece up from scratch. Like compute_position_hash, only needed when the board
+        was edited directly with set_piece.
+        """
+        square_values = self.__square_values
+        if square_values is None:
+            return 0
+        score = 0
+        for piece in self.get_blue_active_pieces() + self.get_red_active_pieces():
+            score += square_values[piece.get_piece_code()][piece.get_coordinates()]
+        return score
+
+    def push_move(self, o_coord, d_coord):
+        """
+        Moves the piece at o_coord to d_coord and hands the turn to the other player, updating the board, the piece's
+        coordinates, the active pieces lists, the position hash and the running score. Does not check if the move is
+        valid. An undo record goes on the undo stack so pop_move can take the move back exactly. Moving a piece onto
+        its own square (passing) only changes the turn.
+        """
+        board = self.__board
+        captured = None
+        captured_index = None
+        position_hash = self.__position_hash
+        if o_coord != d_coord:
+            mover = board[o_coord[0]][o_coord[1]]
+            captured = board[d_coord[0]][d_coord[1]]
+            if captured is not None:
+                if captured.get_color_code() == RED:
+                    captured_index = self.remove_active_piece(self.__red_active_pieces, captured)
+                else:
+                    captured_index = self.remove_active_piece(self.__blue_active_pieces, captured)
+                self.__position_hash ^= ZOBRIST_PIECE_KEYS[captured.get_piece_code()][d_coord]
+            mover_keys = ZOBRIST_PIECE_KEYS[mover.get_piece_code()]
+            self.__position_hash ^= mover_keys[o_coord] ^ mover_keys[d_coord]
+            square_values = self.__square_values
+            if square_values is not None:
+                mover_values = square_values[mover.get_piece_code()]
+                self.__square_score += mover_values[d_coord] - mover_values[o_coord]
+                if captured is not None:
+                    self.__square_score -= square_values[captured.get_piece_code()][d_coord]
+            board[o_coord[0]][o_coord[1]] = None
+            board[d_coord[0]][d_coord[1]] = mover
+            mover.set_coordinates(d_coord)
+        self.__undo_stack.append((o_coord, d_coord, captured, captured_index, position_hash, self.__game_state))
+        if self.__color_turn == "blue":
+            self.__color_turn = "red"
+        else:
+            self.__color_turn = "blue"
+        self.__position_hash ^= ZOBRIST_RED_TO_MOVE
+        position_counts = self.__position_counts
+        position_counts[self.__position_hash] = position_counts.get(self.__position_hash, 0) + 1
+        return captured
+
+    def pop_move(self):
+        """
+        Takes back the last move made with push_move, putting any captured piece back in its old slot of the active
+        pieces list and restoring the turn, position hash and game state. The running score is not saved with the move
+        but taken back with the current square values, so it stays right if set_square_values was called since.
+        Returns the (o_coord, d_coord) of the move.
+        """
+        o_coord, d_coord, captured, captured_index, position_hash, game_state = self.__undo_stack.pop()
+        position_counts = self.__position_counts
+        if position_counts[self.__position_hash] == 1:
+            del position_counts[self.__position_hash]
+        else:
+            position_counts[self.__position_hash] -= 1
+        if o_coord != d_coord:
+            board = self.__board
+            mover = board[d_coord[0]][d_coord[1]]
+            board[o_coord[0]][o_coord[1]] = mover
+            board[d_coord[0]][d_coord[1]] = captured
+            mover.set_coordinates(o_coord)
+            if captured is not None:
+                if captured.get_color_code() == RED:
+                    self.restore_active_piece(self.__red_active_pieces, captured, captured_index)
+                else:
+                    self.restore_active_piece(self.__blue_active_pieces, captured, captured_index)
+            square_values = self.__square_values
+            if square_values is not None:
+                mover_values = square_values[mover.get_piece_code()]
+                self.__square_score += mover_values[o_coord] - mover_values[d_coord]
+                if captured is not None:
+                    self.__square_score += square_values[captured.get_piece_code()][d_coord]
+        if self.__color_turn == "blue":
+            self.__color_turn = "red"
+        else:
+            self.__color_turn = "blue"
+        self.__position_hash = position_hash
+        self.__game_state = game_state
+        return o_coord, d_coord
+
+    def get_move_count(self):
+        """
+        Returns the number of moves on the undo stack
+        """
+        return len(self.__undo_stack)
+
+    def repetition_count(self, position_hash=None):
+        """
+        Returns how many times the current position (or the position with the passed hash) has come up in this game,
+        counting the current position itself, so a position seen for the first time counts 1. Positions before a
+        reset, or before the game was cloned or built from FEN or bytes, are not counted.
+        """
+        if position_hash is None:
+            position_hash = self.__position_hash
+        return self.__position_counts.get(position_hash, 0)
+
+    def get_repetition_limit(self):
+        """
+        Returns the repetition limit, None if there is none
+        """
+        return self.__repetition_limit
+
+    def set_repetition_limit(self, limit):
+        """
+        Sets how many times a position may come up before make_move ends the game as DRAW_BY_REPETITION, ex: 3 for
+        threefold repetition. None (the default) turns the rule off. Passing moves make shuffling back and forth
+        easy, so games between computer players should set one to be sure to end.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("the repetition limit must be at least 1")
+        self.__repetition_limit = limit
+
+    def get_attackers(self, coord, color):
+        """
+        Returns the passed color's pieces with a path to coord, in active pieces list order. Only the pieces that
+        REACHABLE_SQUARES says could ever get there from their square are asked with has_path_to.
+        """
+        if color == "blue":
+            pieces = self.get_blue_active_pieces()
+        else:
+            pieces = self.get_red_active_pieces()
+        board = self.__board
+        return [piece for piece in pieces if coord in REACHABLE_SQUARES[piece.get_piece_code()][piece.get_coordinates()]
+                and piece.has_path_to(coord, board)]
+
     def get_game_state(self):
         """
         returns gamestate, indicating if the game is finished or if a player has won
@@ -933,111 +1484,132 @@ class JanggiGame:
     def str_coord(coord_string):
         """
         Takes a coordinate string, checks if its valid, converts it into y x coordinate tupple.
-        If invalid, we return false. Static because no reason for it not to be.
+        If invalid, we return false. Static because no reason for it not to be. Every valid string is a key of the
+        STRING_COORDS table, so this is one dictionary lookup.
         """
-        valid = False
-        letter = coord_string[0]
-        number = coord_string[1:]
-
-        if letter == "a" or letter == "b" or letter == "c" or letter == "d" or letter == "i" \
-                or letter == "f" or letter == "g" or letter == "h" or letter == "i" or letter == "e":
-            if number == "1" or number == "2" or number == "3" or number == "4" or number == "5" \
-                    or number == "6" or number == "7" or number == "8" or number == "9" or number == "10":
-                valid = True
+        return STRING_COORDS.get(coord_string, (False, False))
 
-        if not valid:
-            return False, False
-        else:
-            y_coord = int(number)
-            if letter == "a":
-                x_coord = 1
-            elif letter == "b":
-                x_coord = 2
-            elif letter == "c":
-                x_coord = 3
-            elif letter == "d":
-                x_coord = 4
-            elif letter == "e":
-                x_coord = 5
-            elif letter == "f":
-                x_coord = 6
-            elif letter == "g":
-                x_coord = 7
-            elif letter == "h":
-                x_coord = 8
-            elif letter == "i":
-                x_coord = 9
-
-            return y_coord, x_coord
-
-    def make_move(self, origin, destination):
+    def make_move(self, origin, destination, detect_checkmate=True):
         """
         Converts coordinates and checks if they are valid. Checks if it's the correct players turn, checks if there
         is a piece at the location. Checks if the proposed move is a valid move. If it is a valid move we
         will update the board and pieces lists as needed. Once turn has been made we toggle the color turn variable
          to the other player's color. Finally, we check if we put the other player in check, if we did, we then
-         check to see if we put them in checkmate, if so, toggle gamestate and the game is finished.
+         check to see if we put them in checkmate, if so, toggle gamestate and the game is finished. Callers that
+         already know the game goes on (ex: replaying a recorded game) can pass detect_checkmate=False to skip that
+         last step and call detect_checkmate themselves when it matters. With a repetition limit set, a move that
+         brings a position up for the limit'th time ends the game as DRAW_BY_REPETITION, unless it is checkmate.
+        """
+        if self.get_game_state() != "UNFINISHED":
+            return False
+        coords = self.parse_move(origin, destination)
+        if coords is None:
+            return False
+        return self.play_coords(coords[0], coords[1], detect_checkmate)
+
+    def make_move_sq(self, origin, destination, detect_checkmate=True):
+        """
+        make_move for callers that already have numbers: origin and destination are square indexes (0-89, a1 is 0,
+        i1 is 8 and i10 is 89) or (y, x) coordinate tuples, no strings are built or parsed. Returns False for a
+        square that is off the board and otherwise behaves exactly like make_move.
         """
         if self.get_game_state() != "UNFINISHED":
             return False
+        o_coord = SQUARE_COORDS.get(origin)
+        d_coord = SQUARE_COORDS.get(destination)
+        if o_coord is None or d_coord is None:
+            return False
+        return self.play_coords(o_coord, d_coord, detect_checkmate)
+
+    def play_coords(self, o_coord, d_coord, detect_checkmate=True):
+        """
+        The rest of make_move and make_move_sq once the squares are known: checks the move, makes it and settles
+        checkmate and repetition
+        """
+        if not self.is_valid_turn_move(o_coord, d_coord):
+            return False
+        self.apply_move(o_coord, d_coord)
+        if detect_checkmate:
+            self.detect_checkmate()
+        self.apply_repetition_limit()
+        return True
+
+    # make_move's steps, one method each so JanggiInstrument can time them without a copy of make_move
+
+    def parse_move(self, origin, destination):
+        """
+        Converts make_move's coordinate strings, returning (o_coord, d_coord) or None if either is invalid
+        """
         o_coord = self.str_coord(origin)
         d_coord = self.str_coord(destination)
         if o_coord[0] == False or o_coord[1] == False \
                 or d_coord[0] == False or d_coord[1] == False:
             # print("invalid input")
-            return False
-        # We know input is valid, we have an origin coordinate and a destination coordinate
-        # Now we will check if there is a piece at the origin, if so, we will check if its that players turn, if so we
-        # pass the origin and destination coordinates to its valid_move function to see if it returns true, signifying
-        # that we can make the move, then we make the move, change turn, return true, and we are done.
+            return None
+        return o_coord, d_coord
+
+    def is_valid_turn_move(self, o_coord, d_coord):
+        """
+        We know input is valid, we have an origin coordinate and a destination coordinate
+        Now we will check if there is a piece at the origin, if so, we will check if its that players turn, if so we
+        pass the origin and destination coordinates to its valid_move function to see if it returns true, signifying
+        that we can make the move.
+        """
         if self.get_piece(o_coord[0], o_coord[1]) is None:
             return False
         else:
             team_color = self.get_piece(o_coord[0], o_coord[1]).get_player_color()
         if team_color != self.get_player_turn():
             return False
+        return self.is_valid_move(o_coord, d_coord)
 
-        is_valid = self.is_valid_move(o_coord, d_coord)
-        # print("Move was valid = ", is_valid)
-        # If the move is valid, we make the move
-        if is_valid:
-            o_temp = self.get_piece(o_coord[0], o_coord[1])
-            # If were capturing a piece, we need to handle its deletion from the game
-            d_temp = None
-            if self.get_piece(d_coord[0], d_coord[1]) is not None and self.get_piece(d_coord[0], d_coord[1]) != \
-                    self.get_piece(o_coord[0], o_coord[1]):
-                d_temp = self.get_piece(d_coord[0], d_coord[1])
-            # set old origin location to empty
-            self.set_piece(o_coord[0], o_coord[1], None)
-            if d_temp is not None:
-                if team_color == "red":
-                    self.delete_from_blue_active_pieces(d_temp)
-                else:
-                    self.delete_from_red_active_pieces(d_temp)
-            o_temp.set_coordinates(d_coord)
-            self.set_piece(d_coord[0], d_coord[1], o_temp)
-            # valid move made, toggle turn
-            if self.get_player_turn() == "blue":
-                self.set_player_turn("red")
-            else:
-                self.set_player_turn("blue")
+    def apply_move(self, o_coord, d_coord):
+        """
+        Makes a move already found valid. push_move handles removing a captured piece from the game and toggles the
+        turn.
+        """
+        self.push_move(o_coord, d_coord)
 
-            self.set_piece(0, 0, ((self.get_player_turn() + "'s turn").upper()))
+    def apply_repetition_limit(self):
+        """
+        Ends an unfinished game as DRAW_BY_REPETITION once the current position has come up as many times as the
+        repetition limit allows
+        """
+        if self.__repetition_limit is not None and self.get_game_state() == "UNFINISHED" and \
+                self.__position_counts[self.__position_hash] >= self.__repetition_limit:
+            self.set_game_state("DRAW_BY_REPETITION")
 
-            if team_color == "blue":
-                if self.is_in_check("red"):
-                    if self.in_checkmate("red"):
-                        self.set_game_state("BLUE_WON")
-                        self.set_piece(0, 0, "BLUE WON")
-            else:
-                if self.is_in_check("blue"):
-                    if self.in_checkmate("blue"):
-                        self.set_game_state("RED_WON")
-                        self.set_piece(0, 0, "RED WON")
+    def detect_checkmate(self):
+        """
+        Checks whether the player to move has been put in checkmate, if so the game state is set to the other
+        player's win. make_move calls this after every move unless told not to, in which case it can be called later
+        when the result is actually needed. Returns the game state.
+        """
+        if self.is_in_check(self.get_player_turn()):
+            self.settle_checkmate()
+        return self.get_game_state()
 
-            return True
+    def settle_checkmate(self):
+        """
+        Called once the player to move is known to be in check, runs in_checkmate and if they are checkmated sets the
+        game state to the other player's win
+        """
+        if self.get_player_turn() == "red":
+            if self.in_checkmate("red"):
+                self.set_game_state("BLUE_WON")
         else:
+            if self.in_checkmate("blue"):
+                self.set_game_state("RED_WON")
+
+    def undo_move(self):
+        """
+        Takes back the last move made with make_move, checkmates included, and gives the turn back to the player who
+        made it. Returns False if there is no move to take back.
+        """
+        if not self.__undo_stack:
             return False
+        self.pop_move()
+        return True
 
     def is_valid_move(self, o_coord, d_coord):
         """
@@ -1060,42 +1632,52 @@ class JanggiGame:
             return False
 
         if self.get_piece(o_coord[0], o_coord[1]).has_path_to(d_coord, self.get_board()):
-            d_temp = None
-            o_temp = self.get_piece(o_coord[0], o_coord[1])
-            if self.get_piece(d_coord[0], d_coord[1]) is not None:
-                d_temp = self.get_piece(d_coord[0], d_coord[1])
-                if o_temp != d_temp:
-                    if d_temp.get_player_color() == "red":
-                        self.delete_from_red_active_pieces(d_temp)
-                    else:
-                        self.delete_from_blue_active_pieces(d_temp)
-            self.set_piece(o_coord[0], o_coord[1], None)
-            self.set_piece(d_coord[0], d_coord[1], o_temp)
-            o_temp.set_coordinates(d_coord)
-
-            in_check = self.is_in_check(o_temp.get_player_color())
-            self.set_piece(d_coord[0], d_coord[1], d_temp)
-            self.set_piece(o_coord[0], o_coord[1], o_temp)
-            o_temp.set_coordinates(o_coord)
-
-            if d_temp is not None:
-                if d_temp != o_temp:
-                    if d_temp.get_player_color() == "red":
-                        self.add_to_red_active_pieces(d_temp)
-                    else:
-                        self.add_to_blue_active_pieces(d_temp)
-            if in_check:
-                return False
-            else:
-                return True
+            return self.is_safe_move(o_coord, d_coord)
         else:
             return False
 
+    def is_safe_move(self, o_coord, d_coord):
+        """
+        Second half of is_valid_move, called once we already know the piece at o_coord has a path to d_coord and is not
+        attacking a teammate. We "make" the move with push_move, see if it leaves the mover's general in check, then
+        put everything back the way it was with pop_move. Returns True if the general is safe after the move.
+        """
+        color = self.get_piece(o_coord[0], o_coord[1]).get_player_color()
+        self.push_move(o_coord, d_coord)
+        in_check = self.is_in_check(color)
+        self.pop_move()
+        if in_check:
+            return False
+        else:
+            return True
+
+    def generate_legal_moves(self, color):
+        """
+        Returns every legal move for the passed color as a list of (origin, destination) coordinate tuples, pass moves
+        included. Each piece only lists the squares it can actually reach, so we only need the trial move check from
+        is_safe_move on those instead of calling is_valid_move on every square of the board.
+        """
+        if color == "blue":
+            pieces = self.get_blue_active_pieces()
+        else:
+            pieces = self.get_red_active_pieces()
+
+        moves = []
+        # Trial captures re-order the enemy's list, so walk a copy of ours to be safe
+        for piece in list(pieces):
+            o_coord = piece.get_coordinates()
+            for d_coord in piece.generate_pseudo_moves(self.get_board()):
+                if self.is_safe_move(o_coord, d_coord):
+                    moves.append((o_coord, d_coord))
+        return moves
+
     def is_in_check(self, defending_color):
         """
         We detect check by getting the attacking teams active_pieces list, and seeing if any of their pieces has a path
-        to the defending generals coordinates. The defending generals will always be at [0] of the active pieces list
-        because that specific piece is never deleted and re-added in any manner by valid_move.
+        to the defending generals coordinates. REACHABLE_SQUARES lets us skip the pieces that could not reach the
+        general from their square even on an empty board without calling has_path_to. The defending generals will
+        always be at [0] of the active pieces list because that specific piece is never deleted and re-added in any
+        manner by valid_move.
          """
 
         if defending_color == "red":
@@ -1105,8 +1687,10 @@ class JanggiGame:
             attacker_list = self.get_red_active_pieces()
             defending_general_coord = self.get_blue_active_pieces()[0].get_coordinates()
 
+        board = self.__board
         for x in attacker_list:
-            if x.has_path_to(defending_general_coord, self.get_board()):
+            if defending_general_coord in REACHABLE_SQUARES[x.get_piece_code()][x.get_coordinates()] and \
+                    x.has_path_to(defending_general_coord, board):
                 return True
 
         return False
@@ -1133,22 +1717,12 @@ class JanggiGame:
 
     def get_checkers(self, defending_color):
         """
-        Let checkers be pieces threatening check on the opposing general. Loops through attacking active pieces,
-        and returns all pieces with a path to the defending general.
+        Let checkers be pieces threatening check on the opposing general. Returns the attacking pieces with a path to
+        the defending general, in active pieces list order.
         """
-        checkers = []
         if defending_color == "red":
-            attacker_list = self.get_blue_active_pieces()
-            defending_general_coord = self.get_red_active_pieces()[0].get_coordinates()
-        else:
-            attacker_list = self.get_red_active_pieces()
-            defending_general_coord = self.get_blue_active_pieces()[0].get_coordinates()
-
-        for x in attacker_list:
-            if x.has_path_to(defending_general_coord, self.get_board()):
-                checkers.append(x)
-
-        return checkers
+            return self.get_attackers(self.get_red_active_pieces()[0].get_coordinates(), "blue")
+        return self.get_attackers(self.get_blue_active_pieces()[0].get_coordinates(), "red")
 
     def in_checkmate(self, defending_color):
         """
@@ -1156,60 +1730,188 @@ class JanggiGame:
         color to this function to see if they have beaten their opponent, and if the game is over. The first thing
         we do is check if the threatened general has any valid moves within his own palace, if so, he is not in
         checkmate. Moving on, we check if the opponent's pieces attacking the general can be blocked by a valid
-        move of any of the defending teams pieces or if they can be captured. Finally, we must also check
-        if we are being attacked by a Cannon, if the Piece the Cannon is jumping is our own, and if we can block said
-        Cannon by moving our piece such that the Cannon can no longer jump over it.
+        move of any of the defending teams pieces or if they can be captured, asking get_attackers which defenders
+        can reach each of those squares. A cannon jumping an enemy piece can also be stopped by capturing that piece.
+        Finally, we must also check if we are being attacked by a Cannon, if the Piece the Cannon is jumping is our
+        own, and if we can block said Cannon by moving our piece such that the Cannon can no longer jump over it.
         This implementation avoids the quadratic solution of checking every valid move for every square for
-        every defending piece.
+        every defending piece. The general and the cannon's screen only try the squares their own move generation
+        gives them, each with a single trial move, and we stop at the first one that gets us out of check.
         """
         if defending_color == "blue":
-            defending_list = self.get_blue_active_pieces()
             defending_general_coord = self.get_blue_active_pieces()[0].get_coordinates()
             checkers = self.get_checkers("blue")
-            palace_squares = self.get_blue_palace_squares()
         else:
-            defending_list = self.get_red_active_pieces()
             defending_general_coord = self.get_red_active_pieces()[0].get_coordinates()
             checkers = self.get_checkers("red")
-            palace_squares = self.get_red_palace_squares()
 
-        for x in palace_squares:
-            if self.is_valid_move(defending_general_coord, x):
-                return False
+        if self.piece_can_move(defending_general_coord):
+            return False
 
         coords_to_block_checkers = []
         jumped_pieces_coords = []
         for x in checkers:
-            if "cannon" in x.get_name():
+            if x.get_piece_type() == CANNON:
                 jumped_pieces_coords.append(x.get_jumped_piece_coord(defending_general_coord, self.get_board()))
                 coords_to_block_checkers = coords_to_block_checkers + \
                                            x.can_be_blocked_at(jumped_pieces_coords[-1], defending_general_coord)
                 coords_to_block_checkers.append(x.get_coordinates())
+                # An enemy screen can be captured, which takes the cannon's jump away unless the capturer is a
+                # screen too
+                jp = self.get_piece(jumped_pieces_coords[-1][0], jumped_pieces_coords[-1][1])
+                if jp.get_player_color() != defending_color:
+                    coords_to_block_checkers.append(jumped_pieces_coords[-1])
             else:
                 coords_to_block_checkers = coords_to_block_checkers + x.can_be_blocked_at(defending_general_coord)
                 coords_to_block_checkers.append(x.get_coordinates())
 
-        for defender in defending_list:
-            # print("defender is", defender.get_name())
-            for square in coords_to_block_checkers:
-                # print("attempting move for defender at", defender.get_coordinates(), "moving to", square)
+        # Only defenders with a path to a square can move there
+        for square in coords_to_block_checkers:
+            for defender in self.get_attackers(square, defending_color):
                 if self.is_valid_move(defender.get_coordinates(), square):
-                    # print("it was valid")
                     return False
 
-        # Worst case scenario we have an enemy cannon jumping our piece to attack our general, costly solution
-        # of checking every single square on the board. (to see if we can block cannon by moving out of its jump)
-        #  This check can occur twice if two cannons are checking us
+        # Last we have an enemy cannon jumping our piece to attack our general, see if that piece can step out of its
+        # jump. This check can occur twice if two cannons are checking us
         # (of which im not sure is even possible, but implemented just in case)
         for jp_coord in jumped_pieces_coords:
             jp = self.get_piece(jp_coord[0], jp_coord[1])
             if jp.get_player_color() == defending_color:
-                for x in range(1, 10):
-                    for y in range(1, 11):
-                        if self.is_valid_move(jp_coord, (y, x)):
-                            return False
+                if self.piece_can_move(jp_coord):
+                    return False
         return True
 
+    def piece_can_move(self, coord):
+        """
+        Returns True if the piece at coord has at least one valid move other than passing. Only the squares the
+        piece's own move generation reaches are tried, each with one trial move, stopping at the first that is safe.
+        """
+        piece = self.get_piece(coord[0], coord[1])
+        board = self.get_board()
+        color = piece.get_player_color()
+        for square in piece.generate_attacks(board):
+            target = board[square[0]][square[1]]
+            if (target is None or target.get_player_color() != color) and self.is_safe_move(coord, square):
+                return True
+        return False
+
+    def has_legal_move(self, color, passing=True):
+        """
+        Returns True if the passed color has any legal move, stopping at the first one found. Passing is legal
+        whenever we are not in check, with passing False only real moves count.
+        """
+        if passing and not self.is_in_check(color):
+            return True
+        if color == "blue":
+            pieces = self.get_blue_active_pieces()
+        else:
+            pieces = self.get_red_active_pieces()
+        # Trial captures re-order the enemy's list, so walk a copy of ours to be safe
+        for piece in list(pieces):
+            if self.piece_can_move(piece.get_coordinates()):
+                return True
+        return False
+
+    def in_stalemate(self, color):
+        """
+        Returns True if the passed color is not in check but has no legal move except passing. Janggi lets them pass,
+        so the game goes on, but a player (or a rules variant) that does not allow passing would be stalemated.
+        """
+        return not self.is_in_check(color) and not self.has_legal_move(color, False)
+
+    def static_exchange(self, square, color):
+        """
+        Static exchange evaluation. Returns the material the passed color wins (negative if it loses material) by
+        starting a capture sequence on square: the two sides take turns capturing on the square with their least
+        valuable piece that has a path to it, and after the first capture either side stops as soon as going on would
+        cost it. Values come from PIECE_VALUES. Returns 0 if square does not hold an enemy piece or the color cannot
+        capture it, so a result above 0 means the piece on square is hanging.
+        Nothing is moved through push_move. The captures are played straight on the board and taken back before we
+        return, and each step asks has_path_to again, so a piece lined up behind a capturer (a chariot behind a
+        chariot, a cannon that only gets its screen once a piece moves onto the line), a horse or elephant leg freed
+        by a capturer leaving it, and a cannon that cannot take a cannon standing on the square are all accounted
+        for. Pins and checks are not: a general only captures when nothing can take it back, every other piece may
+        capture even if that leaves its own general in check.
+        """
+        board = self.get_board()
+        target = board[square[0]][square[1]]
+        color_code = COLOR_CODES[color]
+        if target is None or target.get_color_code() == color_code:
+            return 0
+
+        # Pieces that could ever reach the square, least valuable first and generals last
+        candidates = ([], [])
+        for piece in self.get_blue_active_pieces() + self.get_red_active_pieces():
+            if square in REACHABLE_SQUARES[piece.get_piece_code()][piece.get_coordinates()]:
+                candidates[piece.get_color_code()].append(piece)
+        for pieces in candidates:
+            if len(pieces) > 1:
+                pieces.sort(key=exchange_order)
+
+        gains = [PIECE_VALUES[target.get_piece_type()]]
+        captured = []
+        side = color_code
+        try:
+            while True:
+                attacker = self.least_valuable_attacker(candidates[side], square)
+                if attacker is None:
+                    break
+                o_coord = attacker.get_coordinates()
+                board[o_coord[0]][o_coord[1]] = None
+                board[square[0]][square[1]] = attacker
+                if attacker.get_piece_type() == GENERAL and \
+                        self.least_valuable_attacker(candidates[1 - side], square) is not None:
+                    # The general can't capture onto a square the enemy can take back
+                    board[o_coord[0]][o_coord[1]] = attacker
+                    board[square[0]][square[1]] = captured[-1] if captured else target
+                    break
+                candidates[side].remove(attacker)
+                if captured:
+                    gains.append(PIECE_VALUES[captured[-1].get_piece_type()] - gains[-1])
+                captured.append(attacker)
+                side = 1 - side
+        finally:
+            # Put every capturer back where it came from and the target back on its square
+            for piece in captured:
+                o_coord = piece.get_coordinates()
+                board[o_coord[0]][o_coord[1]] = piece
+            board[square[0]][square[1]] = target
+
+        if not captured:
+            return 0
+        # Work back from the end of the sequence, letting each side stop instead of capturing when that is better
+        for depth in range(len(gains) - 1, 0, -1):
+            gains[depth - 1] = min(gains[depth - 1], -gains[depth])
+        return gains[0]
+
+    def least_valuable_attacker(self, candidates, square):
+        """
+        Static exchange helper, returns the first piece of the candidates list (least valuable first) that has a path
+        to square on the board as it stands, or None if none of them does
+        """
+        board = self.get_board()
+        for piece in candidates:
+            if piece.has_path_to(square, board):
+                return piece
+        return None
+
+
+class SharedJanggiGame(JanggiGame):
+    """
+    A clone made by JanggiGame.clone that has not built its position yet. It has no board or pieces of its own until
+    one of them is first looked at, then materialize builds them from its snapshot and turns it into a plain
+    JanggiGame. Kept as its own class so the __getattr__ hook below does not slow attribute access on normal games.
+    """
+
+    def __getattr__(self, name):
+        """
+        Only called for attributes that are missing, builds the board and pieces the first time one of them is used
+        """
+        if name in CLONE_LAZY_ATTRIBUTES:
+            self.materialize()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
 
 def main():
     game = JanggiGame()
@@ -0,0 +1,242 @@
+"""
+Opt-in instrumentation for Janggi Korean Chess
+Counts the calls that decide how long a move takes and times make_move phase by phase, so a slow move can be told
+apart from a fast one: has_path_to calls per piece class, is_valid_move calls and the trial moves (is_safe_move)
+they and generate_legal_moves make, is_in_check and in_checkmate calls, and how many pieces in_checkmate asks for
+an evasion (piece_can_move, the general and the screen of a checking cannon).
+
+Nothing is measured until enable() is called. enable() wraps the measured methods of JanggiGame and the piece classes
+with counting and timing versions, and disable() puts the originals back, so a disabled process runs the exact same
+code as one that never imported this module. make_move and make_move_sq share the make_move totals. Each of their
+phases is timed by wrapping the method make_move calls for it, and only calls made straight from make_move count, not
+the ones a phase makes itself (the is_in_check calls of the trial moves behind is_valid_turn_move, say):
+    parse      turning the coordinate strings into coordinates (parse_move, make_move only)
+    validate   the turn, piece and move checks (is_valid_turn_move)
+    apply      making the move (apply_move)
+    check      looking for check on the side to move (is_in_check)
+    mate       the checkmate search, only for moves that give check (settle_checkmate)
+
+Run from the console, ex: python JanggiInstrument.py games.txt --output stats.json
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+from JanggiGame import JanggiGame, PIECE_CLASSES
+
+MAKE_MOVE_PHASES = ("parse", "validate", "apply", "check", "mate")
+# JanggiGame methods timed as make_move phases, by the phase they are timed under
+TIMED_METHODS = {"parse_move": "parse", "is_valid_turn_move": "validate", "apply_move": "apply",
+                 "is_in_check": "check", "settle_checkmate": "mate"}
+
+# JanggiGame methods that are only counted, by the counter name they go under
+COUNTED_METHODS = {"is_valid_move": "is_valid_move", "is_safe_move": "trial_moves", "is_in_check": "is_in_check",
+                   "in_checkmate": "in_checkmate", "piece_can_move": "evasion_searches"}
+
+counters = {}
+has_path_to_counts = {}
+phase_times = {}
+make_move_times = {}
+# (class, name, what the class's own __dict__ held, None if the method was inherited) for every wrapped method
+originals = []
+# "make_move" while a timed make_move runs with a phase pushed on top while that phase runs, so a phase method only
+# times the calls make_move makes itself
+call_stack = []
+
+
+def reset():
+    """
+    Zeroes every counter and timing
+    """
+    for name in COUNTED_METHODS.values():
+        counters[name] = 0
+    for piece_class in PIECE_CLASSES:
+        has_path_to_counts[piece_class.__name__] = 0
+    for phase in MAKE_MOVE_PHASES:
+        phase_times[phase] = [0, 0.0, 0.0]
+    make_move_times.clear()
+    make_move_times.update(calls=0, accepted=0, seconds=0.0, max_seconds=0.0)
+
+
+def counting(function, counts, name):
+    """
+    Returns a version of function that adds one to counts[name] on every call
+    """
+    def counted(*args, **kwargs):
+        counts[name] += 1
+        return function(*args, **kwargs)
+    counted.__name__ = function.__name__
+    counted.__doc__ = function.__doc__
+    return counted
+
+
+def add_time(phase, seconds):
+    """
+    Adds one timing to a make_move phase's [calls, total seconds, longest] entry
+    """
+    entry = phase_times[phase]
+    entry[0] += 1
+    entry[1] += seconds
+    if seconds > entry[2]:
+        entry[2] = seconds
+
+
+def timing_make_move(function):
+    """
+    Returns a version of make_move (or make_move_sq) that adds each call's total time to the make_move totals
+    """
+    def timed(self, origin, destination, detect_checkmate=True):
+        call_stack.append("make_move")
+        start = time.perf_counter()
+        try:
+            accepted = function(self, origin, destination, detect_checkmate)
+        finally:
+            seconds = time.perf_counter() - start
+            call_stack.pop()
+        make_move_times["calls"] += 1
+        make_move_times["accepted"] += accepted
+        make_move_times["seconds"] += seconds
+        if seconds > make_move_times["max_seconds"]:
+            make_move_times["max_seconds"] = seconds
+        return accepted
+    timed.__name__ = function.__name__
+    timed.__doc__ = function.__doc__
+    return timed
+
+
+def timing_phase(function, phase):
+    """
+    Returns a version of a JanggiGame method that adds its time to a make_move phase when make_move calls it directly,
+    and is a plain call otherwise
+    """
+    def timed(*args, **kwargs):
+        if not call_stack or call_stack[-1] != "make_move":
+            return function(*args, **kwargs)
+        call_stack.append(phase)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            add_time(phase, time.perf_counter() - start)
+            call_stack.pop()
+    timed.__name__ = function.__name__
+    timed.__doc__ = function.__doc__
+    return timed
+
+
+def replace_method(owner, name, replacement):
+    """
+    Puts replacement in place of owner's method name, remembering what to put back
+    """
+    originals.append((owner, name, owner.__dict__.get(name)))
+    setattr(owner, name, replacement)
+
+
+def is_enabled():
+    """
+    Returns True while instrumentation is enabled
+    """
+    return bool(originals)
+
+
+def enable():
+    """
+    Starts counting and timing, from zero if nothing has been recorded since the last reset. Calling it while
+    already enabled does nothing.
+    """
+    if originals:
+        return
+    if not counters:
+        reset()
+    for method_name, counter_name in COUNTED_METHODS.items():
+        replace_method(JanggiGame, method_name, counting(getattr(JanggiGame, method_name), counters, counter_name))
+    for piece_class in PIECE_CLASSES:
+        replace_method(piece_class, "has_path_to",
+                       counting(piece_class.has_path_to, has_path_to_counts, piece_class.__name__))
+    for method_name, phase in TIMED_METHODS.items():
+        replace_method(JanggiGame, method_name, timing_phase(getattr(JanggiGame, method_name), phase))
+    replace_method(JanggiGame, "make_move", timing_make_move(JanggiGame.make_move))
+    replace_method(JanggiGame, "make_move_sq", timing_make_move(JanggiGame.make_move_sq))
+
+
+def disable():
+    """
+    Puts every original method back. What was recorded is kept until reset.
+    """
+    while originals:
+        owner, name, original = originals.pop()
+        if original is None:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+
+
+@contextlib.contextmanager
+def recording():
+    """
+    Context manager that enables instrumentation for the length of a with block, ex:
+        with JanggiInstrument.recording():
+            game.make_move("e7", "e6")
+        print(JanggiInstrument.snapshot())
+    """
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def snapshot():
+    """
+    Returns everything recorded so far as a dictionary of plain numbers, ready for json.dumps
+    """
+    if not counters:
+        reset()
+    phases = {}
+    for phase in MAKE_MOVE_PHASES:
+        calls, seconds, max_seconds = phase_times[phase]
+        phases[phase] = {"calls": calls, "seconds": seconds, "max_seconds": max_seconds}
+    result = dict(counters)
+    result["has_path_to"] = dict(has_path_to_counts)
+    result["make_move"] = dict(make_move_times, phases=phases)
+    result["enabled"] = is_enabled()
+    return result
+
+
+def dump_json(destination=None):
+    """
+    Writes the snapshot as JSON to a file path or an open file (default: standard output)
+    """
+    if destination is None:
+        destination = sys.stdout
+    if isinstance(destination, str):
+        with open(destination, "w") as output_file:
+            json.dump(snapshot(), output_file, indent=2)
+            output_file.write("\n")
+    else:
+        json.dump(snapshot(), destination, indent=2)
+        destination.write("\n")
+
+
+def main():
+    from JanggiReplay import replay_file
+
+    parser = argparse.ArgumentParser(description="Replay Janggi game files with instrumentation enabled")
+    parser.add_argument("paths", nargs="+", help='game files, one game per line ("-" for standard input)')
+    parser.add_argument("--output", default=None, help="write the JSON snapshot here instead of standard output")
+    args = parser.parse_args()
+
+    games = 0
+    with recording():
+        for path in args.paths:
+            for result in replay_file(path, fast=False):
+                games += 1
+    print("%d games replayed" % games, file=sys.stderr)
+    dump_json(args.output)
+
+
+if __name__ == "__main__":
+    main()
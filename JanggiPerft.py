@@ -0,0 +1,172 @@
+"""
+Perft (performance test) for Janggi Korean Chess
+Walks the full tree of legal moves from a position down to a fixed depth and counts the nodes, captures, checks and
+checkmates found at every depth, along with the wall time and nodes per second. The counts give us a repeatable
+correctness check for move generation (two move generators must produce the same numbers) and the timing gives us a
+throughput number for the has_path_to / is_valid_move / in_checkmate stack to compare between releases.
+
+Run from the console, ex: python JanggiPerft.py 3 --position middlegame
+"""
+
+import argparse
+import time
+
+from JanggiGame import JanggiGame
+
+# Positions are saved as the move list that reaches them from the set_up_board start position, in the same
+# "origin destination" format make_move accepts.
+SAVED_POSITIONS = {
+    "start": [],
+    "middlegame": ["i10 i9", "f1 e1", "i9 g9", "e1 f1", "g9 h9", "e2 f3", "e7 f7", "a4 a5", "e9 d9", "f3 f2",
+                   "d10 e10", "h1 i3", "i7 i6", "g4 g5", "h9 g9", "d1 d2", "g7 h7", "a5 a6", "c7 b7", "a6 a7",
+                   "a10 a7", "a1 a7", "g9 g5", "i4 h4"],
+    "open_files": ["a10 a8", "d1 e1", "i7 h7", "h1 i3", "i10 i4", "e2 f2", "i4 i3", "i1 i3", "h10 i8", "i3 i8",
+                   "a7 b7", "i8 h8", "a8 a4", "c4 b4", "a4 b4", "h8 b8", "b4 a4", "a1 a4", "c10 b8", "b3 b8",
+                   "g10 i7", "a4 a3", "i7 g4", "e4 d4"],
+    "in_check": ["e9 f8", "i4 i5", "h10 i8", "c1 d3", "c7 c6", "d3 f4", "i7 i6", "i5 i6", "c10 d8", "i1 i3",
+                 "e7 f7", "i3 i5", "a10 a9", "c4 c5", "c6 c5", "i5 c5", "b8 e8", "e2 d3", "e8 e1", "d1 e1",
+                 "d8 c10", "e1 d1", "g7 g6", "f4 g6"],
+}
+
+
+class PerftStats:
+    """
+    Holds the per depth counters of a perft run. Index 0 of every list is depth 1.
+    """
+
+    def __init__(self, depth):
+        """
+        Creates zeroed counters for every depth up to the passed depth
+        """
+        self.nodes = [0] * depth
+        self.captures = [0] * depth
+        self.checks = [0] * depth
+        self.checkmates = [0] * depth
+        self.seconds = 0.0
+
+    def get_total_nodes(self):
+        """
+        Returns the number of nodes visited over every depth
+        """
+        return sum(self.nodes)
+
+    def get_nodes_per_second(self):
+        """
+        Returns nodes visited per second of wall time
+        """
+        if self.seconds == 0:
+            return 0.0
+        return self.get_total_nodes() / self.seconds
+
+    def report(self):
+        """
+        Returns the counters as a printable table
+        """
+        lines = ["depth".ljust(8) + "nodes".rjust(14) + "captures".rjust(12) + "checks".rjust(10) +
+                 "checkmates".rjust(12)]
+        for ply in range(len(self.nodes)):
+            lines.append(str(ply + 1).ljust(8) + str(self.nodes[ply]).rjust(14) + str(self.captures[ply]).rjust(12) +
+                         str(self.checks[ply]).rjust(10) + str(self.checkmates[ply]).rjust(12))
+        lines.append("time %.3fs, %d nodes, %.0f nodes/s" % (self.seconds, self.get_total_nodes(),
+                                                             self.get_nodes_per_second()))
+        return "\n".join(lines)
+
+
+def load_position(name):
+    """
+    Returns a new JanggiGame with the named saved position reached by replaying its moves with make_move.
+    """
+    game = JanggiGame()
+    for move in SAVED_POSITIONS[name]:
+        origin, destination = move.split()
+        if not game.make_move(origin, destination):
+            raise ValueError("saved position " + name + " has an invalid move: " + move)
+    return game
+
+
+def brute_force_moves(game, color):
+    """
+    The reference move generator, tries is_valid_move from every piece to every square of the board. Slow, but it
+    is the original definition of a legal move so faster generators can be checked against it.
+    """
+    if color == "blue":
+        pieces = game.get_blue_active_pieces()
+    else:
+        pieces = game.get_red_active_pieces()
+    moves = []
+    for piece in list(pieces):
+        o_coord = piece.get_coordinates()
+        for y in range(1, 11):
+            for x in range(1, 10):
+                if game.is_valid_move(o_coord, (y, x)):
+                    moves.append((o_coord, (y, x)))
+    return moves
+
+
+def opponent(color):
+    """
+    Returns the other player's color
+    """
+    if color == "blue":
+        return "red"
+    return "blue"
+
+
+def perft(game, depth, brute_force=False):
+    """
+    Walks every legal move sequence of the passed depth from the game's current position and returns the filled in
+    PerftStats. A move that checkmates ends its branch, just like it ends the game in make_move. The game is returned
+    to its starting position afterwards.
+    """
+    stats = PerftStats(depth)
+    start = time.perf_counter()
+    if depth > 0:
+        count_moves(game, depth, 0, stats, brute_force)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def count_moves(game, depth, ply, stats, brute_force):
+    """
+    Recursive helper for perft, counts the moves at ply and below.
+    """
+    color = game.get_player_turn()
+    enemy = opponent(color)
+    if brute_force:
+        moves = brute_force_moves(game, color)
+    else:
+        moves = game.generate_legal_moves(color)
+    for o_coord, d_coord in moves:
+        stats.nodes[ply] += 1
+        captured = game.push_move(o_coord, d_coord)
+        if captured is not None:
+            stats.captures[ply] += 1
+        checkmated = False
+        if game.is_in_check(enemy):
+            stats.checks[ply] += 1
+            if game.in_checkmate(enemy):
+                stats.checkmates[ply] += 1
+                checkmated = True
+        if ply + 1 < depth and not checkmated:
+            count_moves(game, depth, ply + 1, stats, brute_force)
+        game.pop_move()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Janggi perft node counts and nodes per second")
+    parser.add_argument("depth", type=int, nargs="?", default=2, help="number of plies to walk")
+    parser.add_argument("--position", choices=sorted(SAVED_POSITIONS), action="append",
+                        help="saved position to start from, may be repeated (default: every saved position)")
+    parser.add_argument("--brute-force", action="store_true",
+                        help="generate moves by calling is_valid_move on every square instead of generate_legal_moves")
+    args = parser.parse_args()
+
+    for name in args.position or sorted(SAVED_POSITIONS):
+        game = load_position(name)
+        print("position:", name, "(" + game.get_player_turn() + " to move)")
+        print(perft(game, args.depth, args.brute_force).report())
+        print()
+
+
+if __name__ == "__main__":
+    main()
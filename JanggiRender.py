@@ -0,0 +1,125 @@
+"""
+Terminal board renderer for Janggi Korean Chess
+Draws JanggiGame boards in the layout print_board uses, building each frame as one string that goes out in a single
+write. In incremental mode a renderer remembers the last frame it drew and only sends the cells that changed since,
+each one placed with an ANSI cursor move, so following a game costs a few dozen bytes per move instead of a full
+board. A renderer draws its board at a fixed row and column of the screen, so one terminal can follow many games with
+one renderer per board.
+
+Run from the console, ex: python JanggiRender.py games.txt --game 3 --delay 0.5
+"""
+
+import argparse
+import sys
+import time
+
+from JanggiGame import JanggiGame, CELL_WIDTH
+from JanggiReplay import read_games
+
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_TO_END_OF_LINE = "\x1b[K"
+
+
+def cursor_to(row, column):
+    """
+    Returns the ANSI sequence that moves the cursor to a 1 based screen row and column
+    """
+    return "\x1b[%d;%dH" % (row, column)
+
+
+class BoardRenderer:
+    """
+    Draws one board at a fixed place on the screen. Not incremental, every frame is the whole board as print_board
+    shows it. Incremental, the first frame (and the first after reset) is the whole board placed row by row with
+    cursor moves and later frames only hold the cells that changed.
+    """
+
+    def __init__(self, stream=None, incremental=True, top=1, left=1):
+        """
+        Creates a renderer writing to stream (default: standard output) with the board's top left corner at the 1
+        based screen row top and column left
+        """
+        self.__stream = stream
+        self.__incremental = incremental
+        self.__top = top
+        self.__left = left
+        self.__last_cells = None
+
+    def reset(self):
+        """
+        Forgets the last frame, so the next one is drawn in full (ex: after the screen was cleared)
+        """
+        self.__last_cells = None
+
+    def render(self, game):
+        """
+        Returns the next frame for game as one string, and remembers it as the last frame drawn
+        """
+        if not self.__incremental:
+            return game.render_board()
+        cells = game.get_frame_cells()
+        last = self.__last_cells
+        self.__last_cells = cells
+        parts = []
+        for y in range(len(cells)):
+            if last is None or (y == 0 and cells[0] != last[0]):
+                # row 0 holds the banner, which can be wider than a cell, so it is always written as a whole line
+                parts.append(cursor_to(self.__top + y, self.__left))
+                parts.append("".join(cell.ljust(CELL_WIDTH) for cell in cells[y]))
+                parts.append(CLEAR_TO_END_OF_LINE)
+                continue
+            if y == 0:
+                continue
+            for x in range(1, len(cells[y])):
+                if cells[y][x] != last[y][x]:
+                    parts.append(cursor_to(self.__top + y, self.__left + x * CELL_WIDTH))
+                    parts.append(cells[y][x].ljust(CELL_WIDTH))
+        if parts:
+            # leave the cursor under the board
+            parts.append(cursor_to(self.__top + len(cells), 1))
+        return "".join(parts)
+
+    def draw(self, game):
+        """
+        Writes the next frame for game in a single write and flushes it. Returns the number of characters written.
+        """
+        stream = self.__stream
+        if stream is None:
+            stream = sys.stdout
+        frame = self.render(game)
+        stream.write(frame)
+        stream.flush()
+        return len(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Janggi game on the terminal")
+    parser.add_argument("path", help='game file, one game per line ("-" for standard input)')
+    parser.add_argument("--game", type=int, default=1, help="which game of the file to show, 1 for the first")
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds between moves")
+    parser.add_argument("--full", action="store_true", help="redraw the whole board every move")
+    args = parser.parse_args()
+
+    if args.path == "-":
+        records = list(read_games(sys.stdin))
+    else:
+        with open(args.path) as game_file:
+            records = list(read_games(game_file))
+    if not 1 <= args.game <= len(records):
+        raise ValueError("the file has %d games" % len(records))
+    moves = records[args.game - 1][1]
+
+    game = JanggiGame()
+    renderer = BoardRenderer(incremental=not args.full)
+    sys.stdout.write(CLEAR_SCREEN)
+    written = renderer.draw(game)
+    for origin, destination in moves:
+        if destination is None or not game.make_move(origin, destination):
+            break
+        time.sleep(args.delay)
+        written += renderer.draw(game)
+    print("%s, %d characters written" % (game.get_game_state(), written), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Game record validator and replayer for Janggi Korean Chess
+Reads a game file one line at a time and replays each game on a single reused JanggiGame, reporting the ply count, the
+first illegal move (if any) and the final game state. Nothing but the game being replayed is held in memory, so a file
+of millions of games is checked in constant memory.
+
+A game file has one game per line, each move an "origin destination" pair in the format make_move accepts, ex:
+    e7 e6 c1 d3 i7 i6
+Commas between moves are allowed, blank lines and lines starting with # are skipped.
+
+By default games are replayed on the fast path: make_move is told not to run the checkmate search after every
+checking move. If the checked player makes another legal move the game clearly went on, so the search is only run
+when a checking move is the last one of the game, or the move after it does not go through. The reports are the same
+as replaying with plain make_move calls (--slow).
+
+Run from the console, ex: python JanggiReplay.py games.txt --json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from JanggiGame import JanggiGame
+
+
+class ReplayResult:
+    """
+    Outcome of replaying one game record. illegal_ply is the 1 based ply of the first move make_move refused (None if
+    every move went through) and illegal_move that move as written in the record.
+    """
+
+    def __init__(self, line_number, plies, illegal_ply, illegal_move, game_state):
+        """
+        Sets the result fields
+        """
+        self.line_number = line_number
+        self.plies = plies
+        self.illegal_ply = illegal_ply
+        self.illegal_move = illegal_move
+        self.game_state = game_state
+
+    def is_valid(self):
+        """
+        Returns True if every move of the record was legal
+        """
+        return self.illegal_ply is None
+
+    def to_dict(self):
+        """
+        Returns the result as a dictionary, ready for json.dumps
+        """
+        return {"line": self.line_number, "plies": self.plies, "illegal_ply": self.illegal_ply,
+                "illegal_move": self.illegal_move, "game_state": self.game_state}
+
+
+def read_games(lines):
+    """
+    Lazily turns an iterable of game file lines into (line number, moves) pairs, moves being a list of
+    (origin, destination) strings. A record with an odd number of squares ends in a half move with None as destination.
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        squares = line.replace(",", " ").split()
+        moves = []
+        for index in range(0, len(squares), 2):
+            if index + 1 < len(squares):
+                moves.append((squares[index], squares[index + 1]))
+            else:
+                moves.append((squares[index], None))
+        yield line_number, moves
+
+
+def replay_game(game, moves, line_number=None, fast=True):
+    """
+    Resets game and replays moves on it, returning a ReplayResult. Replay stops at the first move make_move refuses.
+    With fast set, the checkmate search only runs when its result can change the report.
+    """
+    game.reset()
+    pending_check = False
+    plies = 0
+    for origin, destination in moves:
+        if destination is None:
+            accepted = False
+        else:
+            accepted = game.make_move(origin, destination, not fast)
+        if not accepted:
+            if pending_check:
+                game.detect_checkmate()
+            return ReplayResult(line_number, plies, plies + 1, origin + " " + (destination or ""),
+                                game.get_game_state())
+        plies += 1
+        if fast:
+            pending_check = game.is_in_check(game.get_player_turn())
+    if pending_check:
+        game.detect_checkmate()
+    return ReplayResult(line_number, plies, None, None, game.get_game_state())
+
+
+def replay_lines(lines, fast=True):
+    """
+    Replays every game of an iterable of game file lines, yielding a ReplayResult per game. One JanggiGame is reused
+    for all of them.
+    """
+    game = JanggiGame()
+    for line_number, moves in read_games(lines):
+        yield replay_game(game, moves, line_number, fast)
+
+
+def replay_file(path, fast=True):
+    """
+    Replays every game of the file at path ("-" for standard input), yielding a ReplayResult per game.
+    """
+    if path == "-":
+        for result in replay_lines(sys.stdin, fast):
+            yield result
+        return
+    with open(path) as game_file:
+        for result in replay_lines(game_file, fast):
+            yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and replay Janggi game records")
+    parser.add_argument("paths", nargs="+", help='game files, one game per line ("-" for standard input)')
+    parser.add_argument("--slow", action="store_true", help="run the checkmate search after every checking move")
+    parser.add_argument("--json", action="store_true", help="print a JSON line per game instead of illegal games only")
+    args = parser.parse_args()
+
+    games = 0
+    plies = 0
+    illegal = 0
+    states = {}
+    start = time.perf_counter()
+    for path in args.paths:
+        for result in replay_file(path, not args.slow):
+            games += 1
+            plies += result.plies
+            states[result.game_state] = states.get(result.game_state, 0) + 1
+            if not result.is_valid():
+                illegal += 1
+            if args.json:
+                print(json.dumps(dict(result.to_dict(), file=path)))
+            elif not result.is_valid():
+                print("%s:%d: illegal move %d (%s), %s after %d plies" % (path, result.line_number, result.illegal_ply,
+                                                                         result.illegal_move, result.game_state,
+                                                                         result.plies))
+    seconds = time.perf_counter() - start
+    summary = "%d games, %d plies, %d with illegal moves, %s in %.3fs" % (
+        games, plies, illegal, ", ".join("%s %d" % (state, states[state]) for state in sorted(states)), seconds)
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Self-play simulator for Janggi Korean Chess
+Plays N games between two move choosing policies over a pool of worker processes and streams one JSON line per
+finished game to standard output. Every worker builds a single JanggiGame when it starts and resets it between games
+instead of constructing a new one, so a worker's cost per game is just the moves. Games are drawn once a position
+comes up for the third time (--repetition-limit), so two policies passing back and forth cannot play on for ever.
+
+Policies are named on the command line, only the engine takes an argument after a colon:
+    random       a random legal move
+    capture      a random capture if there is one, otherwise a random legal move
+    engine:N     JanggiEngine searching N plies (default 2), playing from the --book opening book if one is given
+
+Run from the console, ex: python JanggiSelfPlay.py 1000 --blue engine:2 --red random --processes 32 > games.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from JanggiGame import JanggiGame
+from JanggiEngine import JanggiEngine, coord_to_string
+from JanggiBook import OpeningBook
+
+
+class RandomPolicy:
+    """
+    Picks a random legal move
+    """
+
+    def new_game(self):
+        """
+        Called before every game, nothing to forget
+        """
+        pass
+
+    def choose_move(self, game, generator):
+        """
+        Returns an (origin, destination) pair of strings for make_move, or None if there is no legal move
+        """
+        moves = game.generate_legal_moves(game.get_player_turn())
+        if not moves:
+            return None
+        o_coord, d_coord = generator.choice(moves)
+        return coord_to_string(o_coord), coord_to_string(d_coord)
+
+
+class CapturePolicy:
+    """
+    Picks a random capture when there is one, otherwise a random legal move
+    """
+
+    def new_game(self):
+        """
+        Called before every game, nothing to forget
+        """
+        pass
+
+    def choose_move(self, game, generator):
+        """
+        Returns an (origin, destination) pair of strings for make_move, or None if there is no legal move
+        """
+        moves = game.generate_legal_moves(game.get_player_turn())
+        if not moves:
+            return None
+        captures = [(o_coord, d_coord) for o_coord, d_coord in moves
+                    if o_coord != d_coord and game.get_piece(d_coord[0], d_coord[1]) is not None]
+        o_coord, d_coord = generator.choice(captures or moves)
+        return coord_to_string(o_coord), coord_to_string(d_coord)
+
+
+class EnginePolicy:
+    """
+    Picks the move JanggiEngine finds at a fixed depth, or the opening book's move while the game is in the book.
+    One engine is kept per policy, its tables are cleared before every game so a game only depends on its seed.
+    """
+
+    def __init__(self, depth=2, book=None):
+        """
+        Creates the engine
+        """
+        self.__depth = depth
+        self.__engine = JanggiEngine(table_megabytes=4, book=book)
+
+    def new_game(self):
+        """
+        Called before every game, clears the engine's tables
+        """
+        self.__engine.new_game()
+
+    def choose_move(self, game, generator):
+        """
+        Returns an (origin, destination) pair of strings for make_move, or None if there is no legal move
+        """
+        return self.__engine.search(game, self.__depth)
+
+
+POLICIES = {"random": RandomPolicy, "capture": CapturePolicy, "engine": EnginePolicy}
+
+
+def make_policy(spec, book=None):
+    """
+    Builds a policy from its command line spec, ex: "random" or "engine:3". The opening book only goes to engines.
+    Raises ValueError for a spec that does not name a policy, or passes an argument to a policy that takes none.
+    """
+    name, _, argument = spec.partition(":")
+    if name not in POLICIES or (argument and (name != "engine" or not argument.isdigit() or int(argument) < 1)):
+        raise ValueError("unknown policy: " + spec)
+    if name == "engine":
+        return EnginePolicy(int(argument or 2), book)
+    return POLICIES[name]()
+
+
+def play_game(game, policies, generator, max_plies):
+    """
+    Resets game and plays it out between the (blue, red) policies, stopping once the game is over (checkmate or a
+    draw by repetition) or after max_plies. Returns the moves played as "origin destination" strings.
+    """
+    game.reset()
+    for policy in policies:
+        policy.new_game()
+    moves = []
+    while game.get_game_state() == "UNFINISHED" and len(moves) < max_plies:
+        if game.get_player_turn() == "blue":
+            move = policies[0].choose_move(game, generator)
+        else:
+            move = policies[1].choose_move(game, generator)
+        if move is None or not game.make_move(move[0], move[1]):
+            break
+        moves.append(move[0] + " " + move[1])
+    return moves
+
+
+# Per worker process state, set up once by init_worker
+worker_game = None
+worker_policies = None
+worker_max_plies = None
+
+
+def init_worker(blue_spec, red_spec, max_plies, repetition_limit=None, book_path=None):
+    """
+    Pool initializer, builds the worker's one JanggiGame and its policies. The opening book is mapped rather than
+    read, so every worker shares the one copy in the page cache.
+    """
+    global worker_game, worker_policies, worker_max_plies
+    worker_game = JanggiGame(repetition_limit=repetition_limit)
+    book = None
+    if book_path is not None:
+        book = OpeningBook(book_path)
+    worker_policies = (make_policy(blue_spec, book), make_policy(red_spec, book))
+    worker_max_plies = max_plies
+
+
+def run_game(task):
+    """
+    Pool task, plays game number game_id with the passed seed on the worker's game and returns its JSON line
+    """
+    game_id, seed, record_moves = task
+    start = time.perf_counter()
+    moves = play_game(worker_game, worker_policies, random.Random(seed), worker_max_plies)
+    result = {"game": game_id, "seed": seed, "plies": len(moves), "game_state": worker_game.get_game_state(),
+              "seconds": round(time.perf_counter() - start, 4), "worker": os.getpid()}
+    if record_moves:
+        result["moves"] = moves
+    return json.dumps(result)
+
+
+def self_play(games, blue_spec="random", red_spec="random", processes=None, max_plies=200, seed=0,
+              record_moves=True, chunksize=4, repetition_limit=3, book_path=None):
+    """
+    Plays games games over a pool of processes (default: one per CPU), yielding each game's JSON line as it finishes.
+    Game i is played with seed + i, so a run can be repeated exactly. A game is drawn when a position comes up
+    repetition_limit times (None to never draw). Engine policies play from the opening book at book_path, if given.
+    """
+    tasks = ((game_id, seed + game_id, record_moves) for game_id in range(games))
+    with multiprocessing.Pool(processes, init_worker,
+                              (blue_spec, red_spec, max_plies, repetition_limit, book_path)) as pool:
+        for line in pool.imap_unordered(run_game, tasks, chunksize):
+            yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Janggi self-play over a pool of worker processes")
+    parser.add_argument("games", type=int, help="number of games to play")
+    parser.add_argument("--blue", default="random", help="blue's policy (random, capture, engine:N)")
+    parser.add_argument("--red", default="random", help="red's policy (random, capture, engine:N)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-plies", type=int, default=200, help="plies after which a game is stopped unfinished")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, game i uses seed + i")
+    parser.add_argument("--no-moves", action="store_true", help="leave the move list out of the JSON lines")
+    parser.add_argument("--repetition-limit", type=int, default=3,
+                        help="draw a game when a position comes up this many times (0 for never)")
+    parser.add_argument("--book", default=None, help="opening book file for the engine policies (see JanggiBook.py)")
+    args = parser.parse_args()
+
+    if args.repetition_limit < 0:
+        parser.error("the repetition limit must be 0 or more")
+    # check the policy specs here rather than in every worker
+    for spec in (args.blue, args.red):
+        try:
+            make_policy(spec)
+        except ValueError as error:
+            parser.error(str(error))
+    start = time.perf_counter()
+    for line in self_play(args.games, args.blue, args.red, args.processes, args.max_plies, args.seed,
+                          not args.no_moves, repetition_limit=args.repetition_limit or None, book_path=args.book):
+        print(line, flush=True)
+    print("%d games in %.3fs" % (args.games, time.perf_counter() - start), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Multi-game server for Janggi Korean Chess
+An asyncio server holding any number of JanggiGame instances keyed by game ID, spoken to over a local TCP or Unix
+socket with line delimited JSON: every request is one JSON object on one line and gets exactly one JSON object line
+back, in order. Requests carry an "op" and, apart from "new" and "list", the "game" they are about. An "id" field, if
+present, is copied into the response so clients can match them up.
+    {"op": "new"}                                   new game from the start position, ex: {"ok": true, "game": "1"}
+    {"op": "new", "game": "g7", "fen": "...", "repetition_limit": 3}
+    {"op": "move", "game": "1", "origin": "e7", "destination": "e6"}
+    {"op": "state", "game": "1"}                    game state, side to move and move count
+    {"op": "board", "game": "1"}                    the position as FEN (see JanggiGame.to_fen)
+    {"op": "moves", "game": "1"}                    the legal moves of the side to move
+    {"op": "undo", "game": "1"}
+    {"op": "close", "game": "1"}
+    {"op": "list"}
+Errors come back as {"ok": false, "error": "..."}, a refused move as {"ok": true, "accepted": false, ...}.
+
+make_move runs on the event loop with its checkmate search switched off. When the move gives check, the search runs
+on an executor instead, by default a process pool fed the game's 92 byte to_bytes snapshot, so one slow in_checkmate
+does not hold up every other game. Requests to the same game wait their turn on a per game lock, other games carry on.
+
+Run from the console, ex: python JanggiServer.py --port 8765 or python JanggiServer.py --unix /tmp/janggi.sock
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import sys
+
+from JanggiGame import JanggiGame
+from JanggiEngine import coord_to_string
+
+
+def checkmate_state(snapshot):
+    """
+    Executor task, rebuilds a game from its to_bytes snapshot and returns the game state after the checkmate search
+    """
+    return JanggiGame.from_bytes(snapshot).detect_checkmate()
+
+
+class RequestError(Exception):
+    """
+    Raised while handling a request that cannot be carried out, its message goes back to the client
+    """
+    pass
+
+
+class GameServer:
+    """
+    The games and the request handlers. Each op of the protocol is handled by the op_ method of the same name.
+    """
+
+    def __init__(self, executor=None):
+        """
+        Creates a server with no games. Checkmate searches run on the passed executor, None for the loop's default
+        executor.
+        """
+        self.__games = {}
+        self.__locks = {}
+        self.__executor = executor
+        self.__game_ids = itertools.count(1)
+        self.__handlers = {"new": self.op_new, "move": self.op_move, "state": self.op_state,
+                           "board": self.op_board, "moves": self.op_moves, "undo": self.op_undo,
+                           "close": self.op_close, "list": self.op_list}
+
+    def get_game_count(self):
+        """
+        Returns the number of games being hosted
+        """
+        return len(self.__games)
+
+    async def handle_client(self, reader, writer):
+        """
+        Serves one connection, answering its request lines one at a time until it closes
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.handle_line(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_line(self, line):
+        """
+        Decodes one request line and returns the response dictionary
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"ok": False, "error": "invalid JSON"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "a request must be a JSON object"}
+        try:
+            op = request.get("op")
+            handler = None
+            # only strings can be looked up, a list or object op would not hash
+            if isinstance(op, str):
+                handler = self.__handlers.get(op)
+            if handler is None:
+                raise RequestError("unknown op: %s" % op)
+            response = await handler(request)
+        except RequestError as error:
+            response = {"ok": False, "error": str(error)}
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def get_game(self, request):
+        """
+        Returns the (game, lock) of the request's game ID, raising RequestError if there is no such game
+        """
+        game_id = request.get("game")
+        if not isinstance(game_id, str) or game_id not in self.__games:
+            raise RequestError("no such game: %s" % game_id)
+        return self.__games[game_id], self.__locks[game_id]
+
+    def describe(self, game_id, game):
+        """
+        Returns the response fields every game request shares
+        """
+        return {"ok": True, "game": game_id, "game_state": game.get_game_state(), "turn": game.get_player_turn(),
+                "moves_made": game.get_move_count()}
+
+    async def op_new(self, request):
+        """
+        Starts a game, from the start position or the request's "fen", under the request's "game" ID or a new one
+        """
+        game_id = request.get("game")
+        if game_id is None:
+            game_id = str(next(self.__game_ids))
+            while game_id in self.__games:
+                game_id = str(next(self.__game_ids))
+        elif not isinstance(game_id, str) or game_id in self.__games:
+            raise RequestError("game IDs must be new strings: %s" % game_id)
+        try:
+            if "fen" in request:
+                game = JanggiGame.from_fen(request["fen"])
+            else:
+                game = JanggiGame()
+            game.set_repetition_limit(request.get("repetition_limit"))
+        except (ValueError, TypeError, AttributeError) as error:
+            raise RequestError(str(error))
+        self.__games[game_id] = game
+        self.__locks[game_id] = asyncio.Lock()
+        return self.describe(game_id, game)
+
+    async def op_move(self, request):
+        """
+        Makes the request's move. The checkmate search, if the move gives check, runs on the executor while only this
+        game's requests wait for it.
+        """
+        game, lock = self.get_game(request)
+        origin = request.get("origin")
+        destination = request.get("destination")
+        if not isinstance(origin, str) or not isinstance(destination, str) or not origin or not destination:
+            raise RequestError("a move needs origin and destination squares, ex: e7 and e6")
+        async with lock:
+            accepted = game.make_move(origin, destination, False)
+            if accepted and game.is_in_check(game.get_player_turn()):
+                state = await asyncio.get_running_loop().run_in_executor(self.__executor, checkmate_state,
+                                                                         game.to_bytes())
+                if state == "BLUE_WON" or state == "RED_WON":
+                    game.set_game_state(state)
+            return dict(self.describe(request["game"], game), accepted=accepted)
+
+    async def op_state(self, request):
+        """
+        Returns the game's state, side to move and number of moves made
+        """
+        game, lock = self.get_game(request)
+        async with lock:
+            return self.describe(request["game"], game)
+
+    async def op_board(self, request):
+        """
+        Returns the game's position as FEN
+        """
+        game, lock = self.get_game(request)
+        async with lock:
+            return dict(self.describe(request["game"], game), fen=game.to_fen())
+
+    async def op_moves(self, request):
+        """
+        Returns the legal moves of the side to move as "origin destination" strings, none once the game is over
+        """
+        game, lock = self.get_game(request)
+        async with lock:
+            legal_moves = []
+            if game.get_game_state() == "UNFINISHED":
+                legal_moves = [coord_to_string(o_coord) + " " + coord_to_string(d_coord)
+                               for o_coord, d_coord in game.generate_legal_moves(game.get_player_turn())]
+            return dict(self.describe(request["game"], game), legal_moves=legal_moves)
+
+    async def op_undo(self, request):
+        """
+        Takes back the game's last move
+        """
+        game, lock = self.get_game(request)
+        async with lock:
+            accepted = game.undo_move()
+            return dict(self.describe(request["game"], game), accepted=accepted)
+
+    async def op_close(self, request):
+        """
+        Drops the game
+        """
+        game, lock = self.get_game(request)
+        async with lock:
+            # a close that was waiting on the lock behind this one finds the game already gone
+            self.__games.pop(request["game"], None)
+            self.__locks.pop(request["game"], None)
+            return {"ok": True, "game": request["game"]}
+
+    async def op_list(self, request):
+        """
+        Returns the IDs of every game being hosted
+        """
+        return {"ok": True, "games": list(self.__games)}
+
+
+async def serve(server, host="127.0.0.1", port=8765, unix_path=None):
+    """
+    Serves GameServer requests on a TCP port, or a Unix socket when unix_path is passed, until cancelled
+    """
+    if unix_path is not None:
+        listener = await asyncio.start_unix_server(server.handle_client, unix_path)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print("serving on " + addresses, file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Janggi multi-game server speaking line delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="checkmate search processes (default: one per CPU)")
+    parser.add_argument("--threads", action="store_true", help="run checkmate searches on threads, not processes")
+    args = parser.parse_args()
+
+    if args.threads:
+        executor = concurrent.futures.ThreadPoolExecutor(args.workers)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(args.workers)
+    try:
+        asyncio.run(serve(GameServer(executor), args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
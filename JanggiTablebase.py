@@ -0,0 +1,494 @@
+"""
+Endgame tablebases for Janggi Korean Chess
+Solves every position of a small material set, ex: general and chariot against general and guard, by retrograde
+analysis and saves the result as a compact file that probe(game) reads through mmap.
+
+A material set is named by its FEN_LETTERS, blue's pieces then red's separated by a dash, ex: "KR-KA". Every position
+of a set gets an index: each piece takes one of the squares it can stand on (generals and guards their own palace,
+every other piece the whole board), the indexes of the squares in those lists are combined in mixed radix and the
+side to move is the lowest digit. Identical pieces of a color only count in increasing square order, so each position
+has exactly one index.
+
+Solving a set first solves every set one capture away from it. Then every position is set up with
+JanggiGame.from_codes and its legal moves are generated with the piece classes' own rules, giving the position's
+successors. Captures lead into an already solved smaller set, other moves stay in this set and are recorded as
+predecessor links. Starting from the checkmated positions the results are passed back along those links, shortest
+wins and longest losses first. Whatever is never reached is a draw, which includes the endless passing that stops
+a side from forcing mate.
+
+A tablebase file is a 24 byte header, TABLEBASE_MAGIC, the material set name padded to 16 bytes and the position
+count as a little endian uint32, then one little endian uint16 per position:
+    0         not a legal position (the side that just moved is in check, two pieces on a square, ...)
+    1         draw
+    2 + n     mate in n plies with best play, the side to move wins when n is odd and loses when n is even
+
+Run from the console, ex: python JanggiTablebase.py KR-KA KR-K --directory tablebases
+"""
+
+import argparse
+import array
+import heapq
+import mmap
+import os
+import struct
+import sys
+import time
+
+from JanggiGame import JanggiGame, ALL_SQUARES, BLUE_PALACE_SQUARES, RED_PALACE_SQUARES, BLUE, RED, COLOR_NAMES, \
+    GENERAL, GUARD, FEN_LETTERS
+from JanggiEngine import coord_to_string
+
+TABLEBASE_MAGIC = b"JTB1"
+HEADER = struct.Struct("<4s16sI")
+VALUE = struct.Struct("<H")
+DEFAULT_DIRECTORY = "tablebases"
+
+ILLEGAL = 0
+DRAW = 1
+# Stored value of a position that is mate in 0 plies, ie. the side to move is checkmated
+MATED = 2
+
+SQUARE_INDEXES = dict((coord, index) for index, coord in enumerate(ALL_SQUARES))
+PALACE_DOMAINS = (tuple(sorted(SQUARE_INDEXES[coord] for coord in BLUE_PALACE_SQUARES)),
+                  tuple(sorted(SQUARE_INDEXES[coord] for coord in RED_PALACE_SQUARES)))
+BOARD_DOMAIN = tuple(range(90))
+
+
+def parse_material(name):
+    """
+    Turns a material set name (ex: "KR-KA") into its tuple of piece codes, blue's then red's, each color sorted by
+    type. Raises ValueError if the name is not valid, each side needs exactly one general.
+    """
+    sides = name.upper().split("-")
+    if len(sides) != 2:
+        raise ValueError("a material set is written blue-red, ex: KR-KA")
+    material = []
+    for color, letters in ((BLUE, sides[0]), (RED, sides[1])):
+        if any(letter not in FEN_LETTERS for letter in letters) or letters.count("K") != 1:
+            raise ValueError("invalid material set: " + name)
+        material.extend(sorted(FEN_LETTERS.index(letter) * 2 + color for letter in letters))
+    return tuple(material)
+
+
+def material_name(material):
+    """
+    Returns the name of a tuple of piece codes, the reverse of parse_material
+    """
+    blue = "".join(FEN_LETTERS[code // 2] for code in material if code % 2 == BLUE)
+    red = "".join(FEN_LETTERS[code // 2] for code in material if code % 2 == RED)
+    return blue + "-" + red
+
+
+def piece_domain(code):
+    """
+    Returns the sorted square indexes a piece with the passed code can stand on
+    """
+    if code // 2 == GENERAL or code // 2 == GUARD:
+        return PALACE_DOMAINS[code % 2]
+    return BOARD_DOMAIN
+
+
+def position_game_material(game):
+    """
+    Returns (material, squares) for the pieces of a game: the sorted tuple of piece codes and their square indexes in
+    the same order, identical pieces in increasing square order
+    """
+    pieces = sorted(((piece.get_piece_code(), SQUARE_INDEXES[piece.get_coordinates()])
+                     for piece in game.get_blue_active_pieces() + game.get_red_active_pieces()),
+                    key=lambda entry: (entry[0] % 2, entry[0], entry[1]))
+    return tuple(code for code, square in pieces), [square for code, square in pieces]
+
+
+class Tablebase:
+    """
+    The solved positions of one material set, held in memory right after solve or mapped from a file by load
+    """
+
+    def __init__(self, material, values, data=None):
+        """
+        Wraps a sequence of stored values, one per position index. data is the mmap the values are read from, if any.
+        """
+        self.__material = material
+        self.__values = values
+        self.__data = data
+        domains = [piece_domain(code) for code in material]
+        self.__domain_sizes = [len(domain) for domain in domains]
+        self.__domain_indexes = []
+        for domain in domains:
+            indexes = [None] * 90
+            for position, square in enumerate(domain):
+                indexes[square] = position
+            self.__domain_indexes.append(indexes)
+        # pieces that are identical to the one before them, see the module docstring
+        self.__repeats = [index > 0 and material[index - 1] == material[index] for index in range(len(material))]
+
+    @staticmethod
+    def load(path):
+        """
+        Maps the tablebase file at path. Raises ValueError if it is not a tablebase file.
+        """
+        with open(path, "rb") as tablebase_file:
+            data = mmap.mmap(tablebase_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < HEADER.size:
+            data.close()
+            raise ValueError("not a tablebase: " + path)
+        magic, name, count = HEADER.unpack_from(data, 0)
+        if magic != TABLEBASE_MAGIC or len(data) != HEADER.size + count * VALUE.size:
+            data.close()
+            raise ValueError("not a tablebase: " + path)
+        material = parse_material(name.rstrip(b"\0").decode("ascii"))
+        if sys.byteorder == "little":
+            values = memoryview(data)[HEADER.size:].cast("H")
+        else:
+            values = array.array("H", data[HEADER.size:])
+            values.byteswap()
+        return Tablebase(material, values, data)
+
+    def save(self, path):
+        """
+        Writes the tablebase to a file
+        """
+        values = array.array("H", self.__values)
+        if sys.byteorder != "little":
+            values.byteswap()
+        with open(path, "wb") as tablebase_file:
+            tablebase_file.write(HEADER.pack(TABLEBASE_MAGIC, self.get_name().encode("ascii"), len(values)))
+            values.tofile(tablebase_file)
+
+    def close(self):
+        """
+        Unmaps the file a loaded tablebase is read from
+        """
+        if self.__data is not None:
+            self.__values.release()
+            self.__data.close()
+            self.__data = None
+
+    def get_material(self):
+        """
+        Returns the tuple of piece codes of the material set
+        """
+        return self.__material
+
+    def get_name(self):
+        """
+        Returns the name of the material set, ex: "KR-KA"
+        """
+        return material_name(self.__material)
+
+    def get_size(self):
+        """
+        Returns the number of position indexes
+        """
+        size = 2
+        for domain_size in self.__domain_sizes:
+            size *= domain_size
+        return size
+
+    def index_of(self, squares, side):
+        """
+        Returns the index of the position with the pieces on the passed square indexes (in material order) and side
+        (BLUE or RED) to move, or None if a piece is off its domain or identical pieces are out of order
+        """
+        index = 0
+        for piece, square in enumerate(squares):
+            position = self.__domain_indexes[piece][square]
+            if position is None or (self.__repeats[piece] and square <= squares[piece - 1]):
+                return None
+            index = index * self.__domain_sizes[piece] + position
+        return index * 2 + side
+
+    def squares_of(self, index):
+        """
+        Returns the (square indexes, side to move) of a position index, the reverse of index_of without the checks
+        """
+        side = index % 2
+        index //= 2
+        squares = [0] * len(self.__material)
+        for piece in range(len(self.__material) - 1, -1, -1):
+            index, position = divmod(index, self.__domain_sizes[piece])
+            squares[piece] = piece_domain(self.__material[piece])[position]
+        return squares, side
+
+    def get_value(self, index):
+        """
+        Returns the stored value of a position index (ILLEGAL, DRAW or MATED + plies to mate)
+        """
+        return self.__values[index]
+
+    def probe_squares(self, squares, side):
+        """
+        Returns the result of a position for its side to move as ("WIN" or "LOSS", plies to mate) or ("DRAW", None),
+        or None when the position is not a legal one of this set
+        """
+        index = self.index_of(squares, side)
+        if index is None:
+            return None
+        return value_result(self.__values[index])
+
+
+def value_result(value):
+    """
+    Turns a stored value into ("WIN" or "LOSS", plies to mate), ("DRAW", None) or None for ILLEGAL
+    """
+    if value == ILLEGAL:
+        return None
+    if value == DRAW:
+        return "DRAW", None
+    if (value - MATED) % 2:
+        return "WIN", value - MATED
+    return "LOSS", value - MATED
+
+
+def sub_materials(material):
+    """
+    Returns the material sets one capture away from material, every non general piece taken off in turn
+    """
+    found = []
+    for piece, code in enumerate(material):
+        if code // 2 != GENERAL:
+            smaller = material[:piece] + material[piece + 1:]
+            if smaller not in found:
+                found.append(smaller)
+    return found
+
+
+def solve(material, solved, progress=None):
+    """
+    Solves a material set by retrograde analysis and returns its Tablebase. solved maps the material of the sets
+    already solved to their Tablebase, the sets one capture away must be in it. progress, if passed, is called with
+    (positions done, positions) while the successors are being generated.
+    """
+    table = Tablebase(material, None)
+    size = table.get_size()
+    values = array.array("H", bytes(size * VALUE.size))
+    legal = bytearray(size)
+    # in set successors not solved yet, and the shortest win / longest loss reached through captures
+    unsolved = [0] * size
+    predecessors = [[] for index in range(size)]
+    queue = []
+    longest_loss = {}
+    draw_escape = bytearray(size)
+    repeats = [piece > 0 and material[piece - 1] == material[piece] for piece in range(len(material))]
+
+    for index in range(size):
+        if progress is not None and index % 8192 == 0:
+            progress(index, size)
+        squares, side = table.squares_of(index)
+        if len(set(squares)) != len(squares) or \
+                any(repeats[piece] and squares[piece] <= squares[piece - 1] for piece in range(len(squares))):
+            continue
+        codes = [None] * 90
+        for piece, square in enumerate(squares):
+            codes[square] = material[piece]
+        game = JanggiGame.from_codes(codes, COLOR_NAMES[side], "UNFINISHED")
+        if game.is_in_check(COLOR_NAMES[1 - side]):
+            continue
+        legal[index] = 1
+        moves = game.generate_legal_moves(COLOR_NAMES[side])
+        if not moves:
+            heapq.heappush(queue, (0, index))
+            continue
+        slots = dict((square, piece) for piece, square in enumerate(squares))
+        shortest_win = None
+        for o_coord, d_coord in moves:
+            child = list(squares)
+            captured = slots.get(SQUARE_INDEXES[d_coord])
+            child[slots[SQUARE_INDEXES[o_coord]]] = SQUARE_INDEXES[d_coord]
+            if captured is not None and o_coord != d_coord:
+                del child[captured]
+                smaller = material[:captured] + material[captured + 1:]
+                child_table = solved[smaller]
+                child_result = child_table.probe_squares(sort_repeats(smaller, child), 1 - side)
+                if child_result[0] == "DRAW":
+                    draw_escape[index] = 1
+                elif child_result[0] == "LOSS":
+                    if shortest_win is None or child_result[1] + 1 < shortest_win:
+                        shortest_win = child_result[1] + 1
+                else:
+                    longest_loss[index] = max(longest_loss.get(index, 0), child_result[1] + 1)
+                continue
+            child_index = table.index_of(sort_repeats(material, child), 1 - side)
+            predecessors[child_index].append(index)
+            unsolved[index] += 1
+        if shortest_win is not None:
+            heapq.heappush(queue, (shortest_win, index))
+        elif unsolved[index] == 0 and not draw_escape[index]:
+            heapq.heappush(queue, (longest_loss[index], index))
+
+    # pass results back in order of distance, so a position's first result is its shortest win and a loss is only
+    # settled once every successor is a win for the other side
+    while queue:
+        distance, index = heapq.heappop(queue)
+        if values[index]:
+            continue
+        values[index] = MATED + distance
+        for parent in predecessors[index]:
+            if values[parent]:
+                continue
+            if distance % 2 == 0:
+                heapq.heappush(queue, (distance + 1, parent))
+            else:
+                unsolved[parent] -= 1
+                if distance + 1 > longest_loss.get(parent, 0):
+                    longest_loss[parent] = distance + 1
+                if unsolved[parent] == 0 and not draw_escape[parent]:
+                    heapq.heappush(queue, (longest_loss[parent], parent))
+    for index in range(size):
+        if legal[index] and not values[index]:
+            values[index] = DRAW
+    return Tablebase(material, values)
+
+
+def sort_repeats(material, squares):
+    """
+    Puts the squares of identical pieces back in increasing order after a move, so the position has its one index
+    """
+    for piece in range(1, len(material)):
+        if material[piece] == material[piece - 1] and squares[piece] < squares[piece - 1]:
+            start = piece - 1
+            while start > 0 and material[start - 1] == material[piece]:
+                start -= 1
+            end = piece
+            while end + 1 < len(material) and material[end + 1] == material[piece]:
+                end += 1
+            squares[start:end + 1] = sorted(squares[start:end + 1])
+    return squares
+
+
+def generate(name, directory=DEFAULT_DIRECTORY, verbose=False):
+    """
+    Solves the material set name and every set it can reach by captures, writing a file per set to directory.
+    Sets that already have a file there are loaded instead of solved again. Returns the Tablebase of name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    solved = {}
+
+    def build(material):
+        if material in solved:
+            return solved[material]
+        for smaller in sub_materials(material):
+            build(smaller)
+        path = os.path.join(directory, material_name(material) + ".jtb")
+        if os.path.exists(path):
+            solved[material] = Tablebase.load(path)
+            return solved[material]
+        start = time.perf_counter()
+        table = solve(material, solved)
+        table.save(path)
+        if verbose:
+            print("%s: %d positions in %.1fs" % (material_name(material), table.get_size(),
+                                                 time.perf_counter() - start), file=sys.stderr)
+        solved[material] = table
+        return table
+
+    return build(parse_material(name))
+
+
+class Tablebases:
+    """
+    The tablebase files of a directory, each one mapped the first time a position of its material set is probed
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        """
+        Remembers the directory, nothing is opened yet
+        """
+        self.__directory = directory
+        self.__tables = {}
+
+    def get_table(self, material):
+        """
+        Returns the Tablebase of a material tuple, or None if the directory has no file for it
+        """
+        if material not in self.__tables:
+            path = os.path.join(self.__directory, material_name(material) + ".jtb")
+            if os.path.exists(path):
+                self.__tables[material] = Tablebase.load(path)
+            else:
+                self.__tables[material] = None
+        return self.__tables[material]
+
+    def probe(self, game):
+        """
+        Returns the result of game's position for the side to move, ("WIN" or "LOSS", plies to mate) or
+        ("DRAW", None), or None when its material set has no tablebase
+        """
+        material, squares = position_game_material(game)
+        table = self.get_table(material)
+        if table is None:
+            return None
+        return table.probe_squares(squares, 0 if game.get_player_turn() == "blue" else 1)
+
+    def best_move(self, game):
+        """
+        Returns the tablebase move of the side to move as an (origin, destination) pair of strings for make_move: the
+        fastest mate when winning, a move that keeps the draw when drawing and the longest defence when losing. None
+        if the position is not in the tablebases.
+        """
+        result = self.probe(game)
+        if result is None:
+            return None
+        best = None
+        best_key = None
+        for o_coord, d_coord in game.generate_legal_moves(game.get_player_turn()):
+            game.push_move(o_coord, d_coord)
+            try:
+                child_result = self.probe(game)
+            finally:
+                game.pop_move()
+            if child_result is None:
+                continue
+            # lower is better for the mover: the opponent losing soonest, then draws, then the opponent winning latest
+            if child_result[0] == "LOSS":
+                key = (0, child_result[1])
+            elif child_result[0] == "DRAW":
+                key = (1, 0)
+            else:
+                key = (2, -child_result[1])
+            if best_key is None or key < best_key:
+                best = (o_coord, d_coord)
+                best_key = key
+        if best is None:
+            return None
+        return coord_to_string(best[0]), coord_to_string(best[1])
+
+
+# Tablebases of DEFAULT_DIRECTORY, shared by the probe calls that do not pass their own
+default_tablebases = None
+
+
+def probe(game, tablebases=None):
+    """
+    Looks game's position up in the tablebases (default: the files in DEFAULT_DIRECTORY) and returns its result for
+    the side to move: ("WIN", n) or ("LOSS", n) with n the plies to mate under best play, ("DRAW", None), or None
+    when there is no tablebase for its material
+    """
+    global default_tablebases
+    if tablebases is None:
+        if default_tablebases is None:
+            default_tablebases = Tablebases()
+        tablebases = default_tablebases
+    return tablebases.probe(game)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Janggi endgame tablebases by retrograde analysis")
+    parser.add_argument("materials", nargs="+", help="material sets, blue-red in FEN letters, ex: KR-KA")
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY, help="where the tablebase files go")
+    args = parser.parse_args()
+
+    for name in args.materials:
+        table = generate(name, args.directory, True)
+        counts = {}
+        for index in range(table.get_size()):
+            result = value_result(table.get_value(index))
+            if result is not None:
+                counts[result[0]] = counts.get(result[0], 0) + 1
+        longest = max([table.get_value(index) - MATED for index in range(table.get_size())] + [0])
+        print("%s: %s, longest mate %d plies" % (table.get_name(), ", ".join(
+            "%s %d" % (result, counts[result]) for result in sorted(counts)), longest))
+
+
+if __name__ == "__main__":
+    main()
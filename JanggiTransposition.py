@@ -0,0 +1,159 @@
+"""
+Transposition table for Janggi Korean Chess
+A fixed size hash table keyed by JanggiGame.position_hash() that remembers what a search already found out about a
+position: the best move, the depth it was searched to, the score and whether that score is exact or only a bound. The
+table never grows past the memory cap it was created with. Every key maps to a bucket of two slots, a depth preferred
+slot that keeps the deepest (most expensive) result and an always replace slot that takes everything else, so fresh
+shallow results never push out deep ones and the table still keeps up with the current search.
+"""
+
+# Bound types, telling how the stored score relates to the real score of the position
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Rough size in bytes of one slot on 64 bit CPython: the key int, the entry tuple with its fields and both list slots
+ENTRY_BYTES = 144
+BUCKET_SIZE = 2
+
+
+class TranspositionTable:
+    """
+    Bounded position hash table. Entries are tuples of (depth, score, bound, best_move, generation), best_move being an
+    (o_coord, d_coord) pair as returned by JanggiGame.generate_legal_moves (or None). Slot 0 of a bucket is depth
+    preferred, slot 1 is always replace.
+    """
+
+    def __init__(self, megabytes=16):
+        """
+        Creates an empty table that holds as many buckets as fit in the passed number of megabytes
+        """
+        self.__bucket_count = max(1, int(megabytes * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SIZE))
+        self.__keys = [None] * (self.__bucket_count * BUCKET_SIZE)
+        self.__entries = [None] * (self.__bucket_count * BUCKET_SIZE)
+        self.__generation = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__overwrites = 0
+        self.__stores = 0
+
+    def get_capacity(self):
+        """
+        Returns the number of entries the table can hold
+        """
+        return len(self.__keys)
+
+    def get_generation(self):
+        """
+        Returns the generation number new entries are stamped with
+        """
+        return self.__generation
+
+    def new_search(self):
+        """
+        Starts a new generation. Depth preferred entries left over from older searches can then be replaced even by
+        shallower results, so a long running game does not fill the table with positions that can no longer occur.
+        """
+        self.__generation += 1
+
+    def clear(self):
+        """
+        Empties the table and zeroes the statistics
+        """
+        for index in range(len(self.__keys)):
+            self.__keys[index] = None
+            self.__entries[index] = None
+        self.__generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Zeroes the hit, miss, overwrite and store counters
+        """
+        self.__hits = 0
+        self.__misses = 0
+        self.__overwrites = 0
+        self.__stores = 0
+
+    def probe(self, position_hash):
+        """
+        Looks up the position, returning its (depth, score, bound, best_move, generation) entry or None if the table
+        holds nothing for it.
+        """
+        index = (position_hash % self.__bucket_count) * BUCKET_SIZE
+        keys = self.__keys
+        if keys[index] == position_hash:
+            self.__hits += 1
+            return self.__entries[index]
+        if keys[index + 1] == position_hash:
+            self.__hits += 1
+            return self.__entries[index + 1]
+        self.__misses += 1
+        return None
+
+    def get_best_move(self, position_hash):
+        """
+        Returns the stored best move of the position, or None. Does not count towards the hit and miss statistics.
+        """
+        index = (position_hash % self.__bucket_count) * BUCKET_SIZE
+        for slot in (index, index + 1):
+            if self.__keys[slot] == position_hash:
+                return self.__entries[slot][3]
+        return None
+
+    def store(self, position_hash, depth, score, bound, best_move=None):
+        """
+        Saves a search result. The depth preferred slot takes it when it already holds this position, when it is
+        empty, when its entry is from an older generation or when the new result is searched at least as deep.
+        Otherwise the always replace slot takes it. A position is never held in both slots: one moving up into the
+        depth preferred slot leaves its old always replace entry behind. A result that keeps the position but has no
+        best move keeps the previously stored move.
+        """
+        index = (position_hash % self.__bucket_count) * BUCKET_SIZE
+        keys = self.__keys
+        entries = self.__entries
+        if best_move is None:
+            best_move = self.get_best_move(position_hash)
+        deep = entries[index]
+        if keys[index] == position_hash or deep is None or deep[4] != self.__generation or depth >= deep[0]:
+            slot = index
+            if keys[index] == position_hash:
+                pass
+            elif deep is not None:
+                # the entry being pushed out of the depth preferred slot is still worth more than what the always
+                # replace slot holds, so move it down instead of losing it
+                if keys[index + 1] is not None and keys[index + 1] != position_hash:
+                    self.__overwrites += 1
+                keys[index + 1] = keys[index]
+                entries[index + 1] = deep
+            elif keys[index + 1] == position_hash:
+                # the position moves up from the always replace slot, don't keep its old entry as well
+                keys[index + 1] = None
+                entries[index + 1] = None
+        else:
+            slot = index + 1
+            if keys[slot] is not None and keys[slot] != position_hash:
+                self.__overwrites += 1
+        keys[slot] = position_hash
+        entries[slot] = (depth, score, bound, best_move, self.__generation)
+        self.__stores += 1
+
+    def get_fill(self):
+        """
+        Returns the fraction of slots in use, from 0.0 to 1.0
+        """
+        used = len(self.__keys) - self.__keys.count(None)
+        return used / len(self.__keys)
+
+    def get_stats(self):
+        """
+        Returns the table's counters as a dictionary: hits, misses, hit rate, stores, overwrites (stores that pushed
+        out a different position), capacity and generation.
+        """
+        probes = self.__hits + self.__misses
+        if probes == 0:
+            hit_rate = 0.0
+        else:
+            hit_rate = self.__hits / probes
+        return {"hits": self.__hits, "misses": self.__misses, "hit_rate": hit_rate, "stores": self.__stores,
+                "overwrites": self.__overwrites, "capacity": self.get_capacity(), "generation": self.__generation}
@@ -0,0 +1,48 @@
+"""
+Seeded random games shared by the tests. Every position comes from legal play, so the tests see the kind of positions
+(checks, captures, passes, cannon screens) that real games reach.
+"""
+
+import random
+
+from JanggiEngine import coord_to_string
+from JanggiGame import JanggiGame
+
+
+def random_game(seed, max_plies=120, capture_bias=0.5):
+    """
+    Plays a random game from the start position and returns the moves as "origin destination" strings. Captures are
+    preferred with probability capture_bias so games reach checkmate and thin endgames more often. Stops at checkmate
+    or after max_plies.
+    """
+    generator = random.Random(seed)
+    game = JanggiGame()
+    moves = []
+    while game.get_game_state() == "UNFINISHED" and len(moves) < max_plies:
+        legal_moves = game.generate_legal_moves(game.get_player_turn())
+        captures = [(o_coord, d_coord) for o_coord, d_coord in legal_moves
+                    if o_coord != d_coord and game.get_piece(d_coord[0], d_coord[1]) is not None]
+        if captures and generator.random() < capture_bias:
+            o_coord, d_coord = generator.choice(captures)
+        else:
+            o_coord, d_coord = generator.choice(legal_moves)
+        move = (coord_to_string(o_coord), coord_to_string(d_coord))
+        if not game.make_move(move[0], move[1]):
+            raise AssertionError("generated move refused: %s %s" % move)
+        moves.append(move[0] + " " + move[1])
+    return moves
+
+
+def random_positions(seed, count, max_plies=120):
+    """
+    Yields count (game, moves) pairs, each game left at a random point of a random game
+    """
+    generator = random.Random(seed)
+    for index in range(count):
+        moves = random_game(generator.getrandbits(32), max_plies)
+        moves = moves[:generator.randint(0, len(moves))]
+        game = JanggiGame()
+        for move in moves:
+            origin, destination = move.split()
+            game.make_move(origin, destination)
+        yield game, moves
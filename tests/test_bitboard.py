@@ -0,0 +1,67 @@
+"""
+Bitboard backend tests: JanggiBitboardGame must agree with JanggiGame on every position of a set of random games
+"""
+
+import random
+import unittest
+
+from JanggiBitboard import JanggiBitboardGame
+from JanggiEngine import coord_to_string
+from JanggiGame import JanggiGame, ALL_SQUARES, COLOR_NAMES
+from random_games import random_game
+
+
+class BitboardTest(unittest.TestCase):
+
+    def assertSamePosition(self, game, bitboard_game, moves):
+        position = " ".join(moves)
+        self.assertEqual(bitboard_game.get_player_turn(), game.get_player_turn(), position)
+        self.assertEqual(bitboard_game.get_game_state(), game.get_game_state(), position)
+        for y, x in ALL_SQUARES:
+            piece = game.get_piece(y, x)
+            name = None
+            if piece is not None:
+                name = piece.get_name()
+            self.assertEqual(bitboard_game.get_piece_name(y, x), name, position)
+        for color in COLOR_NAMES:
+            in_check = game.is_in_check(color)
+            self.assertEqual(bitboard_game.is_in_check(color), in_check, position)
+            self.assertEqual(sorted(bitboard_game.generate_legal_moves(color)),
+                             sorted(game.generate_legal_moves(color)), position)
+            if in_check:
+                self.assertEqual(bitboard_game.in_checkmate(color), game.in_checkmate(color), position)
+
+    def test_random_games(self):
+        for seed in range(12):
+            game = JanggiGame()
+            bitboard_game = JanggiBitboardGame()
+            moves = []
+            self.assertSamePosition(game, bitboard_game, moves)
+            for move in random_game(seed, max_plies=300, capture_bias=0.9):
+                origin, destination = move.split()
+                self.assertTrue(game.make_move(origin, destination))
+                self.assertTrue(bitboard_game.make_move(origin, destination), move)
+                moves.append(move)
+                self.assertSamePosition(game, bitboard_game, moves)
+
+    def test_refused_moves(self):
+        # random squares are almost never a legal move, both backends must refuse the same ones
+        generator = random.Random(5)
+        for seed in range(5):
+            game = JanggiGame()
+            for move in random_game(seed, max_plies=40):
+                game.make_move(*move.split())
+            for _ in range(300):
+                origin = coord_to_string(generator.choice(ALL_SQUARES))
+                destination = coord_to_string(generator.choice(ALL_SQUARES))
+                bitboard_game = JanggiBitboardGame(game)
+                twin = game.clone()
+                self.assertEqual(bitboard_game.make_move(origin, destination), twin.make_move(origin, destination),
+                                 origin + " " + destination)
+        bitboard_game = JanggiBitboardGame()
+        for origin, destination in (("z1", "a1"), ("a0", "a1"), ("a11", "a10"), ("", "")):
+            self.assertFalse(bitboard_game.make_move(origin, destination))
+
+
+if __name__ == "__main__":
+    unittest.main()
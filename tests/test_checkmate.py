@@ -0,0 +1,77 @@
+"""
+Checkmate tests: in_checkmate, has_legal_move and in_stalemate take shortcuts (only trying the general, the squares
+that block or capture a checker, and a cannon's screen), so they are checked against the full legal move list on every
+position of a set of random games, the checkmates they end in included
+"""
+
+import unittest
+
+from JanggiBitboard import JanggiBitboardGame
+from JanggiGame import JanggiGame, COLOR_NAMES
+from random_games import random_game
+
+# Blue is in check from the red cannon on e5 jumping the red soldier on e7, the only way out is b7 capturing the soldier
+CANNON_SCREEN_CAPTURE = "9/4k4/9/9/4c4/9/1CP1p4/3E1E3/3EKE3/3EEE3 b UNFINISHED"
+
+# The seeds below 49 of random games (max_plies=300, capture_bias=0.95) that end in checkmate
+MATE_SEEDS = (8, 10, 22, 26, 47, 48)
+
+
+def game_positions(seeds):
+    """
+    Yields (game, moves) for every position of the random games played from seeds, the same game object moved on a
+    ply at a time
+    """
+    for seed in seeds:
+        game = JanggiGame()
+        moves = []
+        yield game, moves
+        for move in random_game(seed, max_plies=300, capture_bias=0.95):
+            origin, destination = move.split()
+            game.make_move(origin, destination)
+            moves.append(move)
+            yield game, moves
+
+
+class CheckmateTest(unittest.TestCase):
+
+    def test_shortcuts_match_legal_moves(self):
+        checks = 0
+        mates = 0
+        for game, moves in game_positions(range(49)):
+            for color in COLOR_NAMES:
+                in_check = game.is_in_check(color)
+                real_moves = [move for move in game.generate_legal_moves(color) if move[0] != move[1]]
+                position = "%s after %s" % (color, " ".join(moves))
+                self.assertEqual(in_check, bool(game.get_checkers(color)), position)
+                self.assertEqual(game.has_legal_move(color, False), bool(real_moves), position)
+                self.assertEqual(game.has_legal_move(color), bool(real_moves) or not in_check, position)
+                self.assertEqual(game.in_stalemate(color), not in_check and not real_moves, position)
+                if in_check:
+                    checks += 1
+                    mates += not real_moves
+                    self.assertEqual(game.in_checkmate(color), not real_moves, position)
+        # the positions must include enough checks for the comparison to mean something
+        self.assertGreater(checks, 50)
+        self.assertEqual(mates, len(MATE_SEEDS))
+
+    def test_capture_enemy_cannon_screen(self):
+        game = JanggiGame.from_fen(CANNON_SCREEN_CAPTURE)
+        self.assertTrue(game.is_in_check("blue"))
+        self.assertEqual(game.generate_legal_moves("blue"), [((7, 2), (7, 5))])
+        self.assertFalse(game.in_checkmate("blue"))
+        self.assertFalse(JanggiBitboardGame(game).in_checkmate("blue"))
+
+        # the same check given by a move has to leave the game going on both backends
+        before = CANNON_SCREEN_CAPTURE.replace("9/1CP1p4", "4p4/1CP6").replace(" b ", " r ")
+        game = JanggiGame.from_fen(before)
+        bitboard_game = JanggiBitboardGame(game)
+        self.assertTrue(game.make_move("e6", "e7"))
+        self.assertTrue(bitboard_game.make_move("e6", "e7"))
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        self.assertEqual(bitboard_game.get_game_state(), "UNFINISHED")
+        self.assertTrue(game.make_move("b7", "e7"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Running evaluation tests: the score push_move and pop_move keep up to date must always equal count_score, the sum
+JanggiEvaluation adds up from scratch
+"""
+
+import unittest
+
+from JanggiEvaluation import SQUARE_VALUES, count_score, evaluate
+from JanggiGame import JanggiGame
+from random_games import random_game
+
+
+class EvaluationTest(unittest.TestCase):
+
+    def test_start_position_is_even(self):
+        game = JanggiGame()
+        game.set_square_values(SQUARE_VALUES)
+        self.assertEqual(game.get_square_score(), 0)
+        self.assertEqual(evaluate(game, "blue"), count_score(game))
+
+    def test_running_score_through_moves_and_undo(self):
+        for seed in range(10):
+            game = JanggiGame()
+            game.set_square_values(SQUARE_VALUES)
+            moves = random_game(seed, capture_bias=0.8)
+            for move in moves:
+                game.make_move(*move.split())
+                self.assertEqual(game.get_square_score(), count_score(game))
+            while game.undo_move():
+                self.assertEqual(game.get_square_score(), count_score(game))
+            self.assertEqual(game.get_square_score(), 0)
+
+    def test_undo_after_setting_values(self):
+        # moves pushed before the game had square values must come off with the values it has now
+        for seed in range(10):
+            game = JanggiGame()
+            for move in random_game(seed, capture_bias=0.8)[:30]:
+                game.make_move(*move.split())
+            game.set_square_values(SQUARE_VALUES)
+            while game.undo_move():
+                self.assertEqual(game.get_square_score(), count_score(game))
+
+        game = JanggiGame()
+        game.make_move("e7", "e6")
+        game.make_move("c1", "d3")
+        game.set_square_values(SQUARE_VALUES)
+        game.undo_move()
+        self.assertEqual(game.get_square_score(), count_score(game))
+
+    def test_evaluate_without_values(self):
+        game = JanggiGame()
+        for move in random_game(3, capture_bias=0.8)[:40]:
+            game.make_move(*move.split())
+        self.assertIsNone(game.get_square_values())
+        self.assertEqual(evaluate(game, "blue"), count_score(game))
+        self.assertEqual(evaluate(game, "red"), -count_score(game))
+
+
+if __name__ == "__main__":
+    unittest.main()
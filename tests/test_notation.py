@@ -0,0 +1,58 @@
+"""
+Round trip tests for the position formats: FEN style notation, 92 byte snapshots and clones
+"""
+
+import unittest
+
+from JanggiGame import JanggiGame
+from random_games import random_positions
+
+START_FEN = "reha1aehr/4k4/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/4K4/REHA1AEHR b UNFINISHED"
+
+
+class NotationTest(unittest.TestCase):
+
+    def assertSamePosition(self, game, copy):
+        self.assertEqual(copy.to_fen(), game.to_fen())
+        self.assertEqual(copy.position_hash(), game.position_hash())
+        self.assertEqual(copy.get_player_turn(), game.get_player_turn())
+        self.assertEqual(copy.get_game_state(), game.get_game_state())
+        color = game.get_player_turn()
+        self.assertEqual(sorted(copy.generate_legal_moves(color)), sorted(game.generate_legal_moves(color)))
+
+    def test_start_position(self):
+        game = JanggiGame()
+        self.assertEqual(game.to_fen(), START_FEN)
+        self.assertEqual(JanggiGame.from_fen(START_FEN).to_bytes(), game.to_bytes())
+        self.assertEqual(len(game.to_bytes()), 92)
+
+    def test_round_trips(self):
+        for game, moves in random_positions(13, 40):
+            with self.subTest(moves=" ".join(moves)):
+                self.assertSamePosition(game, JanggiGame.from_fen(game.to_fen()))
+                self.assertSamePosition(game, JanggiGame.from_bytes(game.to_bytes()))
+                self.assertSamePosition(game, game.clone())
+
+    def test_clone_is_independent(self):
+        game = JanggiGame()
+        game.make_move("e7", "e6")
+        fen = game.to_fen()
+        twin = game.clone()
+        game.make_move("c1", "d3")
+        self.assertEqual(twin.to_fen(), fen)
+        twin.make_move("a1", "a2")
+        self.assertNotEqual(twin.to_fen(), game.to_fen())
+        game.undo_move()
+        self.assertEqual(game.to_fen(), fen)
+
+    def test_invalid_input(self):
+        for fen in ("", "9/9 b UNFINISHED", START_FEN.replace("4k4", "9"), START_FEN.replace("reha1aehr", "rehaaehr"),
+                    START_FEN.replace("reha1aehr", "reha1aexr")):
+            with self.subTest(fen=fen):
+                self.assertRaises(ValueError, JanggiGame.from_fen, fen)
+        self.assertRaises(ValueError, JanggiGame.from_bytes, bytes(91))
+        self.assertRaises(ValueError, JanggiGame.from_bytes, bytes(90) + b"\x02\x00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Perft regression tests. The node, capture, check and checkmate counts of the saved positions were worked out with the
+original is_valid_move based move generator, any change to move generation or check detection that changes a legal
+move shows up here.
+"""
+
+import unittest
+
+from JanggiPerft import SAVED_POSITIONS, load_position, perft, brute_force_moves
+
+# (nodes, captures, checks, checkmates) per depth, depth 1 first
+REFERENCE_COUNTS = {
+    "start": [(47, 0, 0, 0), (2209, 0, 0, 0), (104906, 111, 16, 0)],
+    "middlegame": [(60, 3, 2, 0), (2883, 121, 56, 0), (164793, 8128, 5289, 0)],
+    "open_files": [(37, 0, 0, 0), (1668, 1, 37, 0), (59284, 155, 67, 0)],
+    "in_check": [(4, 0, 0, 0), (274, 7, 12, 0), (11103, 78, 248, 0)],
+}
+
+
+class PerftTest(unittest.TestCase):
+
+    def test_reference_counts(self):
+        for name in sorted(REFERENCE_COUNTS):
+            with self.subTest(position=name):
+                stats = perft(load_position(name), len(REFERENCE_COUNTS[name]))
+                counts = list(zip(stats.nodes, stats.captures, stats.checks, stats.checkmates))
+                self.assertEqual(counts, REFERENCE_COUNTS[name])
+
+    def test_every_saved_position_has_counts(self):
+        self.assertEqual(sorted(SAVED_POSITIONS), sorted(REFERENCE_COUNTS))
+
+    def test_generator_matches_brute_force(self):
+        for name in sorted(SAVED_POSITIONS):
+            with self.subTest(position=name):
+                game = load_position(name)
+                color = game.get_player_turn()
+                self.assertEqual(sorted(game.generate_legal_moves(color)), sorted(brute_force_moves(game, color)))
+
+    def test_perft_leaves_the_game_unchanged(self):
+        game = load_position("middlegame")
+        fen = game.to_fen()
+        position_hash = game.position_hash()
+        perft(game, 2)
+        self.assertEqual(game.to_fen(), fen)
+        self.assertEqual(game.position_hash(), position_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
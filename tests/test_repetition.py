@@ -0,0 +1,81 @@
+"""
+Repetition tests: the position counter push_move and pop_move keep, and the optional draw by repetition
+"""
+
+import unittest
+
+from JanggiGame import JanggiGame
+
+# Both sides move a horse out and back, which brings the start position back every four plies
+HORSE_SHUFFLE = [("c10", "d8"), ("c1", "d3"), ("d8", "c10"), ("d3", "c1")]
+
+
+def shuffle(game, times):
+    """
+    Plays HORSE_SHUFFLE times times on game, returning False as soon as a move is refused
+    """
+    for _ in range(times):
+        for origin, destination in HORSE_SHUFFLE:
+            if not game.make_move(origin, destination):
+                return False
+    return True
+
+
+class RepetitionTest(unittest.TestCase):
+
+    def test_counts(self):
+        game = JanggiGame()
+        start_hash = game.position_hash()
+        self.assertEqual(game.repetition_count(), 1)
+        self.assertTrue(shuffle(game, 3))
+        self.assertEqual(game.repetition_count(), 4)
+        game.make_move("c10", "d8")
+        self.assertEqual(game.repetition_count(), 4)
+        self.assertEqual(game.repetition_count(start_hash), 4)
+        game.undo_move()
+        game.undo_move()
+        self.assertEqual(game.repetition_count(), 3)
+        game.reset()
+        self.assertEqual(game.repetition_count(), 1)
+
+    def test_draw_at_limit(self):
+        game = JanggiGame(repetition_limit=3)
+        self.assertTrue(shuffle(game, 1))
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        for origin, destination in HORSE_SHUFFLE[:-1]:
+            self.assertTrue(game.make_move(origin, destination))
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        self.assertTrue(game.make_move(*HORSE_SHUFFLE[-1]))
+        self.assertEqual(game.get_game_state(), "DRAW_BY_REPETITION")
+        self.assertFalse(game.make_move(*HORSE_SHUFFLE[0]))
+
+        # taking the move back takes the draw back with it
+        self.assertTrue(game.undo_move())
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        self.assertEqual(game.repetition_count(), 2)
+
+    def test_no_limit(self):
+        game = JanggiGame()
+        self.assertIsNone(game.get_repetition_limit())
+        self.assertTrue(shuffle(game, 5))
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        self.assertEqual(game.repetition_count(), 6)
+
+    def test_limit_is_kept(self):
+        game = JanggiGame(repetition_limit=2)
+        game.reset()
+        self.assertEqual(game.get_repetition_limit(), 2)
+        self.assertEqual(game.clone().get_repetition_limit(), 2)
+        game.set_repetition_limit(None)
+        self.assertIsNone(game.get_repetition_limit())
+
+    def test_invalid_limit(self):
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                JanggiGame(repetition_limit=limit)
+            with self.assertRaises(ValueError):
+                JanggiGame().set_repetition_limit(limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+JanggiReplay tests: the fast path, which only runs the checkmate search when its result can change the report, must
+report exactly what replaying with the search after every move reports
+"""
+
+import unittest
+
+from JanggiReplay import replay_lines
+from random_games import random_game
+
+# Seeds of random games (max_plies=300, capture_bias=0.95) that end in checkmate
+MATE_SEEDS = (8, 10, 22, 26, 47, 48)
+
+
+class ReplayTest(unittest.TestCase):
+
+    def game_lines(self):
+        lines = []
+        for seed in range(20):
+            moves = random_game(seed, capture_bias=0.8)
+            lines.append(" ".join(moves))
+            # the same game with an illegal move after a few plies, and cut off half way through a move
+            lines.append(" ".join(moves[:seed % 7] + ["a1 i10"] + moves[seed % 7:]))
+            lines.append(" ".join(moves[:seed % 5] + ["e7"]))
+        for seed in MATE_SEEDS:
+            moves = random_game(seed, max_plies=300, capture_bias=0.95)
+            lines.append(" ".join(moves))
+            # a move after checkmate is refused, the report must still show the game as won
+            lines.append(" ".join(moves + ["e1 e2"]))
+            # stopping one ply early leaves the side to move in check without being mated
+            lines.append(" ".join(moves[:-1] + ["a1 i10"]))
+        return lines
+
+    def test_fast_matches_slow(self):
+        lines = self.game_lines()
+        fast = [result.to_dict() for result in replay_lines(lines, fast=True)]
+        slow = [result.to_dict() for result in replay_lines(lines, fast=False)]
+        self.assertEqual(len(fast), len(lines))
+        self.assertEqual(fast, slow)
+
+    def test_mated_games(self):
+        lines = [" ".join(random_game(seed, max_plies=300, capture_bias=0.95)) for seed in MATE_SEEDS]
+        for result in replay_lines(lines):
+            self.assertTrue(result.is_valid())
+            self.assertIn(result.game_state, ("BLUE_WON", "RED_WON"))
+
+    def test_reports(self):
+        results = list(replay_lines(["e7 e6 c1 d3", "e7 e6 e6 e4", "# comment", "", "e7"]))
+        self.assertEqual([result.line_number for result in results], [1, 2, 5])
+        self.assertTrue(results[0].is_valid())
+        self.assertEqual((results[0].plies, results[0].game_state), (2, "UNFINISHED"))
+        self.assertEqual((results[1].plies, results[1].illegal_ply, results[1].illegal_move), (1, 2, "e6 e4"))
+        self.assertEqual((results[2].plies, results[2].illegal_ply, results[2].illegal_move), (0, 1, "e7 "))
+
+
+if __name__ == "__main__":
+    unittest.main()
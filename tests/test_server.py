@@ -0,0 +1,77 @@
+"""
+JanggiServer tests: requests go through GameServer.handle_line, and over a real socket for the connection handling
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import unittest
+
+from JanggiServer import GameServer
+
+# Checkmate searches run on a thread, so the tests need no worker processes
+EXECUTOR = concurrent.futures.ThreadPoolExecutor(1)
+
+
+def request(server, **fields):
+    """
+    Sends one request to server as a JSON line and returns the decoded response
+    """
+    return asyncio.run(server.handle_line(json.dumps(fields).encode()))
+
+
+class ServerTest(unittest.TestCase):
+
+    def test_game_requests(self):
+        server = GameServer(EXECUTOR)
+        response = request(server, op="new", id=7)
+        self.assertEqual(response, {"ok": True, "game": "1", "game_state": "UNFINISHED", "turn": "blue",
+                                    "moves_made": 0, "id": 7})
+        response = request(server, op="move", game="1", origin="e7", destination="e6")
+        self.assertTrue(response["accepted"])
+        self.assertEqual(response["turn"], "red")
+        response = request(server, op="move", game="1", origin="e7", destination="e6")
+        self.assertFalse(response["accepted"])
+        self.assertEqual(request(server, op="undo", game="1")["moves_made"], 0)
+        self.assertEqual(len(request(server, op="moves", game="1")["legal_moves"]), 47)
+        self.assertEqual(request(server, op="list")["games"], ["1"])
+        self.assertTrue(request(server, op="close", game="1")["ok"])
+        self.assertEqual(server.get_game_count(), 0)
+
+    def test_bad_requests(self):
+        server = GameServer(EXECUTOR)
+        self.assertEqual(asyncio.run(server.handle_line(b"{")), {"ok": False, "error": "invalid JSON"})
+        self.assertFalse(asyncio.run(server.handle_line(b"[1, 2]"))["ok"])
+        for op in ("jump", None, [], ["move"], {"op": "new"}, 3):
+            response = request(server, op=op, id=1)
+            self.assertFalse(response["ok"])
+            self.assertTrue(response["error"].startswith("unknown op"))
+            self.assertEqual(response["id"], 1)
+        self.assertFalse(request(server, op="state", game=["1"])["ok"])
+        self.assertFalse(request(server, op="new", fen="not a position")["ok"])
+        self.assertFalse(request(server, op="new", repetition_limit=0)["ok"])
+        request(server, op="new")
+        self.assertFalse(request(server, op="move", game="1", origin=["e7"], destination="e6")["ok"])
+
+    def test_connection_survives_bad_requests(self):
+        async def session():
+            server = GameServer(EXECUTOR)
+            listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for line in ('{"op": []}', '{"op": {}}', "nonsense", '{"op": "new"}'):
+                writer.write(line.encode() + b"\n")
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            return responses
+
+        responses = asyncio.run(session())
+        self.assertEqual([response["ok"] for response in responses], [False, False, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Transposition table tests, on a table of one bucket so every key competes for the same two slots
+"""
+
+import random
+import unittest
+
+from JanggiTransposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+MOVE = ((7, 5), (6, 5))
+OTHER_MOVE = ((10, 2), (8, 3))
+
+
+class TranspositionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.table = TranspositionTable(0)
+
+    def test_store_and_probe(self):
+        table = self.table
+        self.assertEqual(table.get_capacity(), 2)
+        self.assertIsNone(table.probe(11))
+        table.store(11, 3, 40, EXACT, MOVE)
+        self.assertEqual(table.probe(11), (3, 40, EXACT, MOVE, 0))
+        self.assertEqual(table.get_best_move(11), MOVE)
+        self.assertEqual(table.get_fill(), 0.5)
+        stats = table.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+
+    def test_depth_preferred(self):
+        table = self.table
+        table.store(1, 5, 10, EXACT, MOVE)
+        # shallower results of other positions only ever take the always replace slot
+        table.store(2, 2, 20, LOWER_BOUND)
+        table.store(3, 1, 30, UPPER_BOUND)
+        self.assertEqual(table.probe(1)[0], 5)
+        self.assertIsNone(table.probe(2))
+        self.assertEqual(table.probe(3)[1], 30)
+        self.assertEqual(table.get_stats()["overwrites"], 1)
+
+        # a deeper result takes the depth preferred slot and moves the old entry down
+        table.store(4, 6, 40, EXACT)
+        self.assertEqual(table.probe(4)[0], 6)
+        self.assertEqual(table.probe(1)[0], 5)
+        self.assertIsNone(table.probe(3))
+
+    def test_new_search_frees_old_entries(self):
+        table = self.table
+        table.store(1, 8, 10, EXACT)
+        table.new_search()
+        table.store(2, 1, 20, EXACT)
+        self.assertEqual(table.probe(2), (1, 20, EXACT, None, 1))
+        self.assertEqual(table.probe(1)[0], 8)
+        self.assertEqual(table.get_generation(), 1)
+
+    def test_best_move_is_kept(self):
+        table = self.table
+        table.store(1, 2, 10, EXACT, MOVE)
+        table.store(1, 3, 15, LOWER_BOUND)
+        self.assertEqual(table.probe(1), (3, 15, LOWER_BOUND, MOVE, 0))
+        table.store(1, 4, 5, EXACT, OTHER_MOVE)
+        self.assertEqual(table.get_best_move(1), OTHER_MOVE)
+
+    def test_position_moving_up_is_held_once(self):
+        table = self.table
+        table.store(1, 5, 10, EXACT)
+        table.store(2, 2, 20, EXACT)
+        table.store(2, 6, 25, EXACT)
+        self.assertEqual(table.probe(2)[:2], (6, 25))
+        self.assertEqual(table.probe(1)[:2], (5, 10))
+        self.assertEqual(table.get_fill(), 1.0)
+
+    def test_no_position_in_both_slots(self):
+        # two used slots must always hold two different positions, whatever order results come in
+        generator = random.Random(3)
+        table = self.table
+        for _ in range(5000):
+            if generator.random() < 0.05:
+                table.new_search()
+            table.store(generator.randint(1, 3), generator.randint(0, 6), 0, EXACT)
+            held = [key for key in (1, 2, 3) if table.get_best_move(key) is not None or table.probe(key)]
+            self.assertEqual(len(held), round(table.get_fill() * 2))
+
+    def test_clear(self):
+        table = self.table
+        table.store(1, 5, 10, EXACT, MOVE)
+        table.new_search()
+        table.probe(1)
+        table.clear()
+        self.assertEqual(table.get_fill(), 0.0)
+        self.assertIsNone(table.probe(1))
+        stats = table.get_stats()
+        self.assertEqual((stats["hits"], stats["stores"], stats["generation"]), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Undo tests: undo_move and pop_move must put back exactly the position, turn, hash, state and active pieces lists that
+were there before the move
+"""
+
+import unittest
+
+from JanggiGame import JanggiGame
+from random_games import random_game
+
+
+def snapshot(game):
+    """
+    Returns everything about game's position an undo has to restore
+    """
+    pieces = [(piece.get_name(), piece.get_coordinates())
+              for piece in game.get_blue_active_pieces() + game.get_red_active_pieces()]
+    return game.to_fen(), game.position_hash(), game.compute_position_hash(), game.repetition_count(), pieces
+
+
+class UndoTest(unittest.TestCase):
+
+    def test_undo_random_games(self):
+        for seed in (8, 26, 0, 1, 2):
+            game = JanggiGame()
+            history = [snapshot(game)]
+            for move in random_game(seed, max_plies=300, capture_bias=0.95):
+                self.assertTrue(game.make_move(*move.split()))
+                history.append(snapshot(game))
+            self.assertEqual(game.get_move_count(), len(history) - 1)
+            while history:
+                self.assertEqual(snapshot(game), history.pop())
+                if history:
+                    self.assertTrue(game.undo_move())
+            self.assertFalse(game.undo_move())
+            self.assertEqual(game.get_player_turn(), "blue")
+
+    def test_undo_checkmate(self):
+        game = JanggiGame()
+        moves = random_game(8, max_plies=300, capture_bias=0.95)
+        for move in moves:
+            game.make_move(*move.split())
+        self.assertIn(game.get_game_state(), ("BLUE_WON", "RED_WON"))
+        winner = game.get_game_state()
+        game.undo_move()
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        self.assertTrue(game.make_move(*moves[-1].split()))
+        self.assertEqual(game.get_game_state(), winner)
+
+    def test_undo_pass(self):
+        game = JanggiGame()
+        before = snapshot(game)
+        self.assertTrue(game.make_move("e9", "e9"))
+        self.assertEqual(game.get_player_turn(), "red")
+        self.assertTrue(game.undo_move())
+        self.assertEqual(snapshot(game), before)
+        self.assertEqual(game.get_player_turn(), "blue")
+
+    def test_push_and_pop(self):
+        game = JanggiGame()
+        for move in random_game(4, max_plies=20):
+            game.make_move(*move.split())
+        before = snapshot(game)
+        legal_moves = game.generate_legal_moves(game.get_player_turn())
+        for o_coord, d_coord in legal_moves:
+            game.push_move(o_coord, d_coord)
+            self.assertEqual(game.pop_move(), (o_coord, d_coord))
+            self.assertEqual(snapshot(game), before)
+        self.assertEqual(game.generate_legal_moves(game.get_player_turn()), legal_moves)
+
+
+if __name__ == "__main__":
+    unittest.main()